@@ -0,0 +1,97 @@
+#  Copyright (c) 2018 5GTANGO, QUOBIS
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the 5GTANGO, QUOBIS
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number  through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the 5GTANGO
+# partner consortium (www.5gtango.eu).
+
+"""
+Measures the overhead of checking the validator configuration in service
+validation requests of the REST service, using the Flask test client, and
+the mean latency of the requests.
+
+Usage: python benchmarks/bench_assert_configuration.py [--requests N]
+"""
+
+import argparse
+import cProfile
+import os
+import pstats
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# importing the package sets up the REST service cache
+os.environ.setdefault('VAPI_CACHE_TYPE', 'simple')
+
+from tngsdk.validation.rest import app  # noqa: E402
+
+SAMPLE_NSD = os.path.join(os.path.dirname(__file__), '..', 'src', 'tngsdk',
+                          'validation', 'samples', 'services', 'valid-son',
+                          'valid.yml')
+
+
+def validate(client):
+    r = client.post('/api/v1/validations?sync=true&syntax=true&'
+                    'service=true&source=local&path=' + SAMPLE_NSD)
+    assert r.status_code == 200
+    # do not answer the next request from the cache
+    client.delete('/api/v1/validations')
+    client.delete('/api/v1/resources')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    args = parser.parse_args()
+
+    app.config['TESTING'] = True
+    client = app.test_client()
+    # warm up the schema and descriptor caches
+    validate(client)
+
+    start = time.perf_counter()
+    for _ in range(args.requests):
+        validate(client)
+    elapsed = time.perf_counter() - start
+
+    profile = cProfile.Profile()
+    profile.enable()
+    for _ in range(args.requests):
+        validate(client)
+    profile.disable()
+    stats = pstats.Stats(profile).stats
+    calls, cumtime = 0, 0.0
+    for (filename, line, name), stat in stats.items():
+        if name == '_assert_configuration':
+            calls += stat[1]
+            cumtime += stat[3]
+
+    print("{} requests".format(args.requests))
+    print("request latency:        {:>8.3f} ms"
+          .format(elapsed / args.requests * 1000))
+    print("_assert_configuration:  {:>8.3f} ms per call ({} calls, "
+          "profiled)".format(cumtime / max(calls, 1) * 1000, calls))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,135 @@
+#  Copyright (c) 2018 5GTANGO, QUOBIS
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the 5GTANGO, QUOBIS
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number  through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the 5GTANGO
+# partner consortium (www.5gtango.eu).
+
+"""
+Measures the validation of a synthetic service chaining copies of the
+sample tcpdump VNF, validating its functions serially and with parallel
+jobs, and checks that both runs report the same events.
+
+Usage: python benchmarks/bench_function_validation.py [--vnfs N] [--jobs N]
+"""
+
+import argparse
+import copy
+import os
+import shutil
+import sys
+import tempfile
+import time
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# importing the package sets up the REST service cache
+os.environ.setdefault('VAPI_CACHE_TYPE', 'simple')
+
+from tngsdk.validation.validator import Validator  # noqa: E402
+
+SAMPLE_VNFD = os.path.join(os.path.dirname(__file__), '..', 'src', 'tngsdk',
+                           'validation', 'samples', 'functions',
+                           'valid-son', 'tcpdump-vnfd.yml')
+
+
+def synthetic_service(path, num_vnfs):
+    """
+    Writes a service chaining the given number of copies of the sample
+    VNF with E-Line links, with their management interfaces in an E-LAN
+    bridge.
+    :return: tuple (service descriptor filename, functions directory)
+    """
+    with open(SAMPLE_VNFD) as _f:
+        sample = yaml.safe_load(_f)
+    functions_path = os.path.join(path, 'functions')
+    os.makedirs(functions_path)
+    nsd = {'descriptor_schema': sample['descriptor_schema'].replace(
+               'function-descriptor/vnfd-schema.yml',
+               'service-descriptor/nsd-schema.yml'),
+           'vendor': 'eu.5gtango',
+           'name': 'bench-ns', 'version': '0.1', 'author': 'bench',
+           'description': 'Chain of {} VNFs'.format(num_vnfs),
+           'connection_points': [
+               {'id': cp, 'interface': 'ipv4', 'type': 'external'}
+               for cp in ('mgmt', 'input', 'output')],
+           'network_functions': [], 'virtual_links': []}
+    for i in range(num_vnfs):
+        vnfd = copy.deepcopy(sample)
+        vnfd['name'] = 'vnf{}'.format(i)
+        with open(os.path.join(functions_path,
+                               'vnf{}.yml'.format(i)), 'w') as _f:
+            yaml.dump(vnfd, _f)
+        nsd['network_functions'].append(
+            {'vnf_id': 'vnf{}'.format(i), 'vnf_vendor': vnfd['vendor'],
+             'vnf_name': vnfd['name'], 'vnf_version': vnfd['version']})
+    chain = ['input'] + ['vnf{}:{}'.format(i, cp) for i in range(num_vnfs)
+                         for cp in ('input', 'output')] + ['output']
+    for i in range(0, len(chain), 2):
+        nsd['virtual_links'].append(
+            {'id': 'link{}'.format(i // 2), 'connectivity_type': 'E-Line',
+             'connection_points_reference': chain[i:i + 2]})
+    nsd['virtual_links'].append(
+        {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+         'connection_points_reference':
+             ['mgmt'] + ['vnf{}:mgmt'.format(i) for i in range(num_vnfs)]})
+    nsd_file = os.path.join(path, 'nsd.yml')
+    with open(nsd_file, 'w') as _f:
+        yaml.dump(nsd, _f)
+    return nsd_file, functions_path
+
+
+def validate(nsd_file, functions_path, jobs):
+    validator = Validator()
+    validator.configure(syntax=True, integrity=True, topology=True,
+                        dpath=functions_path, jobs=jobs)
+    start = time.perf_counter()
+    validator.validate_service(nsd_file)
+    elapsed = time.perf_counter() - start
+    return elapsed, (validator.errors, validator.warnings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vnfs', type=int, default=60)
+    parser.add_argument('--jobs', type=int, default=0,
+                        help="parallel jobs (default: one per CPU)")
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        nsd_file, functions_path = synthetic_service(path, args.vnfs)
+        # warm up the descriptor and schema caches
+        validate(nsd_file, functions_path, None)
+        serial, serial_events = validate(nsd_file, functions_path, None)
+        parallel, parallel_events = validate(nsd_file, functions_path,
+                                             args.jobs)
+        print("{} VNFs, {} CPUs".format(args.vnfs, os.cpu_count()))
+        print("serial:           {:>8.3f} s".format(serial))
+        print("parallel (jobs={}): {:>6.3f} s".format(args.jobs, parallel))
+        print("same events: {}".format(serial_events == parallel_events))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
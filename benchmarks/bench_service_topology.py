@@ -0,0 +1,182 @@
+#  Copyright (c) 2018 5GTANGO, QUOBIS
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the 5GTANGO, QUOBIS
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number  through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the 5GTANGO
+# partner consortium (www.5gtango.eu).
+
+"""
+Measures the VNF connection point checks of the service topology
+validation (isolated VNFs and unused connection points) on synthetic
+services, comparing the previous link scanning implementation with the
+connection point references index of tngsdk.validation.storage.Service.
+
+Usage: python benchmarks/bench_service_topology.py [--repeat N]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# importing the package sets up the REST service cache
+os.environ.setdefault('VAPI_CACHE_TYPE', 'simple')
+
+from tngsdk.validation.storage import DescriptorStorage  # noqa: E402
+
+
+def synthetic_service(path, num_vnfs, num_cps=4):
+    """
+    Writes a service chaining the given number of VNFs with E-Line links,
+    with the management interfaces of all the VNFs in an E-LAN bridge.
+    The last connection point of every VNF is left unused.
+    :return: tuple (service descriptor filename, function filenames)
+    """
+    cps = ['mgmt'] + ['cp{}'.format(i) for i in range(1, num_cps)]
+    functions = []
+    nsd = {'vendor': 'eu.5gtango', 'name': 'bench-ns', 'version': '0.1',
+           'connection_points': [{'id': 'input'}, {'id': 'output'},
+                                 {'id': 'mgmt'}],
+           'network_functions': [], 'virtual_links': []}
+    for i in range(num_vnfs):
+        vnfd = {'vendor': 'eu.5gtango', 'name': 'vnf{}'.format(i),
+                'version': '0.1',
+                'connection_points': [{'id': cp} for cp in cps]}
+        filename = os.path.join(path, 'vnf{}.yml'.format(i))
+        with open(filename, 'w') as _f:
+            yaml.dump(vnfd, _f)
+        functions.append(filename)
+        nsd['network_functions'].append(
+            {'vnf_id': 'vnf{}'.format(i), 'vnf_vendor': 'eu.5gtango',
+             'vnf_name': 'vnf{}'.format(i), 'vnf_version': '0.1'})
+
+    chain = ['input'] + ['vnf{}:{}'.format(i, cp) for i in range(num_vnfs)
+                         for cp in ('cp1', 'cp2')] + ['output']
+    for i in range(0, len(chain), 2):
+        nsd['virtual_links'].append(
+            {'id': 'link{}'.format(i // 2), 'connectivity_type': 'E-Line',
+             'connection_points_reference': chain[i:i + 2]})
+    nsd['virtual_links'].append(
+        {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+         'connection_points_reference':
+             ['mgmt'] + ['vnf{}:mgmt'.format(i) for i in range(num_vnfs)]})
+    filename = os.path.join(path, 'nsd.yml')
+    with open(filename, 'w') as _f:
+        yaml.dump(nsd, _f)
+    return filename, functions
+
+
+def load_service(nsd_file, function_files):
+    storage = DescriptorStorage()
+    service = storage.create_service(nsd_file)
+    for func in service.content['network_functions']:
+        function = storage.create_function(function_files[
+            int(func['vnf_id'][3:])])
+        function.load_connection_points()
+        service.associate_function(function, func['vnf_id'])
+    service.load_connection_points()
+    service.load_virtual_links()
+    return service
+
+
+def legacy_connection_point_usage(service):
+    """
+    Previous implementation, scanning all the links for every VNF
+    connection point.
+    """
+    isolated_vnfs = []
+    for function_name, function_id in service.vnf_id_map.items():
+        vnfd_is_isolated = True
+        for cp in service.functions[function_id].connection_points:
+            cp_extended = function_name + ":" + cp
+            for vl_id, vl in service.vlinks.items():
+                if cp_extended == vl.cpr_u or cp_extended == vl.cpr_v:
+                    vnfd_is_isolated = False
+                    break
+            if vnfd_is_isolated:
+                for vb_id, vb in service.vbridges.items():
+                    if cp_extended in vb.cp_refs:
+                        vnfd_is_isolated = False
+                        break
+        if vnfd_is_isolated:
+            isolated_vnfs.append(function_name)
+
+    unused_cps = []
+    for function_name, function_id in service.vnf_id_map.items():
+        for cp in service.functions[function_id].connection_points:
+            cp_extended = function_name + ":" + cp
+            cp_is_used = False
+            for vl_id, vl in service.vlinks.items():
+                if vl.cpr_u == cp_extended or vl.cpr_v == cp_extended:
+                    cp_is_used = True
+                    break
+            if not cp_is_used:
+                for vb_id, vb in service.vbridges.items():
+                    if cp_extended in vb.cp_refs:
+                        cp_is_used = True
+                        break
+            if not cp_is_used:
+                unused_cps.append(cp_extended)
+    return isolated_vnfs, unused_cps
+
+
+def best_time(func, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    print("{:<10} {:>8} {:>12} {:>12} {:>8}"
+          .format('VNFs', 'links', 'legacy', 'indexed', 'speedup'))
+    for num_vnfs in (10, 100, 250, 500):
+        path = tempfile.mkdtemp()
+        try:
+            service = load_service(*synthetic_service(path, num_vnfs))
+            legacy_time, expected = best_time(
+                lambda: legacy_connection_point_usage(service), args.repeat)
+            index_time, result = best_time(
+                service.connection_point_usage, args.repeat)
+            assert result == expected
+            print("{:<10} {:>8} {:>10.1f}ms {:>10.1f}ms {:>7.1f}x"
+                  .format(num_vnfs,
+                          len(service.vlinks) + len(service.vbridges),
+                          legacy_time * 1000, index_time * 1000,
+                          legacy_time / index_time))
+        finally:
+            shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
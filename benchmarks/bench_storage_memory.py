@@ -0,0 +1,158 @@
+#  Copyright (c) 2018 5GTANGO, QUOBIS
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the 5GTANGO, QUOBIS
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number  through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the 5GTANGO
+# partner consortium (www.5gtango.eu).
+
+"""
+Measures, with tracemalloc, the memory held by the storage model objects
+(connection points, units, vlinks and vbridges) of a synthetic service
+and its functions. The descriptor contents are loaded beforehand, so
+only the objects built from them are accounted.
+
+Usage: python benchmarks/bench_storage_memory.py [--vnfs N] [--vdus N]
+"""
+
+import argparse
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import yaml
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..', 'src'))
+# importing the package sets up the REST service cache
+os.environ.setdefault('VAPI_CACHE_TYPE', 'simple')
+
+from tngsdk.validation.storage import DescriptorStorage  # noqa: E402
+
+
+def synthetic_vnfd(index, num_vdus, num_cps=4):
+    """
+    Builds a VNFD whose VDUs are chained with E-Line links, with their
+    management interfaces in an E-LAN bridge.
+    """
+    cps = ['mgmt'] + ['eth{}'.format(i) for i in range(1, num_cps)]
+    vnfd = {'vendor': 'eu.5gtango', 'name': 'vnf{}'.format(index),
+            'version': '0.1',
+            'connection_points': [{'id': 'mgmt'}, {'id': 'input'},
+                                  {'id': 'output'}],
+            'virtual_deployment_units': [], 'virtual_links': []}
+    for i in range(num_vdus):
+        vnfd['virtual_deployment_units'].append(
+            {'id': 'vdu{}'.format(i), 'vm_image': 'image.qcow2',
+             'connection_points': [{'id': cp} for cp in cps]})
+    chain = ['input'] + ['vdu{}:{}'.format(i, cp) for i in range(num_vdus)
+                         for cp in ('eth1', 'eth2')] + ['output']
+    for i in range(0, len(chain), 2):
+        vnfd['virtual_links'].append(
+            {'id': 'link{}'.format(i // 2), 'connectivity_type': 'E-Line',
+             'connection_points_reference': chain[i:i + 2]})
+    vnfd['virtual_links'].append(
+        {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+         'connection_points_reference':
+             ['mgmt'] + ['vdu{}:mgmt'.format(i) for i in range(num_vdus)]})
+    return vnfd
+
+
+def synthetic_nsd(num_vnfs):
+    nsd = {'vendor': 'eu.5gtango', 'name': 'bench-ns', 'version': '0.1',
+           'connection_points': [{'id': 'input'}, {'id': 'output'},
+                                 {'id': 'mgmt'}],
+           'network_functions': [], 'virtual_links': []}
+    chain = ['input'] + ['vnf{}:{}'.format(i, cp) for i in range(num_vnfs)
+                         for cp in ('input', 'output')] + ['output']
+    for i in range(num_vnfs):
+        nsd['network_functions'].append(
+            {'vnf_id': 'vnf{}'.format(i), 'vnf_vendor': 'eu.5gtango',
+             'vnf_name': 'vnf{}'.format(i), 'vnf_version': '0.1'})
+    for i in range(0, len(chain), 2):
+        nsd['virtual_links'].append(
+            {'id': 'link{}'.format(i // 2), 'connectivity_type': 'E-Line',
+             'connection_points_reference': chain[i:i + 2]})
+    nsd['virtual_links'].append(
+        {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+         'connection_points_reference':
+             ['mgmt'] + ['vnf{}:mgmt'.format(i) for i in range(num_vnfs)]})
+    return nsd
+
+
+def write_descriptor(path, name, content):
+    filename = os.path.join(path, name)
+    with open(filename, 'w') as _f:
+        yaml.dump(content, _f)
+    return filename
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--vnfs', type=int, default=500)
+    parser.add_argument('--vdus', type=int, default=4)
+    args = parser.parse_args()
+
+    path = tempfile.mkdtemp()
+    try:
+        storage = DescriptorStorage()
+        service = storage.create_service(
+            write_descriptor(path, 'nsd.yml', synthetic_nsd(args.vnfs)))
+        functions = {}
+        for i in range(args.vnfs):
+            functions['vnf{}'.format(i)] = storage.create_function(
+                write_descriptor(path, 'vnf{}.yml'.format(i),
+                                 synthetic_vnfd(i, args.vdus)))
+
+        gc.collect()
+        tracemalloc.start()
+        start = tracemalloc.take_snapshot()
+        for vnf_id, func in functions.items():
+            func.load_connection_points()
+            func.load_units()
+            func.load_unit_connection_points()
+            func.load_virtual_links()
+            service.associate_function(func, vnf_id)
+        service.load_connection_points()
+        service.load_virtual_links()
+        gc.collect()
+        end = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+
+        stats = end.compare_to(start, 'filename')
+        total = sum(stat.size_diff for stat in stats)
+        model = sum(stat.size_diff for stat in stats
+                    if stat.traceback[0].filename.endswith('storage.py'))
+        units = sum(len(func.units) for func in functions.values())
+        links = sum(len(func.vlinks) + len(func.vbridges)
+                    for func in functions.values())
+        print("{} VNFs, {} units, {} links"
+              .format(args.vnfs, units, links + len(service.vlinks) +
+                      len(service.vbridges)))
+        print("allocated by storage.py: {:>8.1f} KiB".format(model / 1024))
+        print("allocated in total:      {:>8.1f} KiB".format(total / 1024))
+    finally:
+        shutil.rmtree(path)
+
+
+if __name__ == '__main__':
+    main()
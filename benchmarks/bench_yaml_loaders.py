@@ -0,0 +1,113 @@
+#  Copyright (c) 2018 5GTANGO, QUOBIS
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the 5GTANGO, QUOBIS
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number  through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the 5GTANGO
+# partner consortium (www.5gtango.eu).
+
+"""
+Compares the pure Python YAML loader with the LibYAML based one
+(used by tngsdk.validation.util.load_yaml when available) on the
+bundled sample descriptors and on synthetic large VNFDs.
+
+Usage: python benchmarks/bench_yaml_loaders.py [--repeat N]
+"""
+
+import argparse
+import copy
+import os
+import time
+import yaml
+
+SAMPLES_DIR = os.path.join(os.path.dirname(__file__), '..', 'src',
+                           'tngsdk', 'validation', 'samples')
+SAMPLE_VNFD = os.path.join(SAMPLES_DIR, 'functions', 'valid-syntax-tng',
+                           'default-vnfd-tng.yml')
+
+
+def synthetic_vnfd(num_vdus):
+    """
+    Builds a VNFD with the given number of VDUs, by replicating
+    the VDU of a sample descriptor.
+    """
+    with open(SAMPLE_VNFD, 'r') as _f:
+        vnfd = yaml.load(_f, Loader=yaml.SafeLoader)
+    vdu = vnfd['virtual_deployment_units'][0]
+    vnfd['virtual_deployment_units'] = []
+    for i in range(num_vdus):
+        new_vdu = copy.deepcopy(vdu)
+        new_vdu['id'] = 'vdu{}'.format(i)
+        vnfd['virtual_deployment_units'].append(new_vdu)
+    return yaml.dump(vnfd, default_flow_style=False)
+
+
+def best_time(documents, loader, repeat):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for document in documents:
+            yaml.load(document, Loader=loader)
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    if not hasattr(yaml, 'CSafeLoader'):
+        print("LibYAML is not available, nothing to compare")
+        return
+
+    samples = []
+    for root, dirs, files in os.walk(SAMPLES_DIR):
+        for filename in files:
+            if not filename.endswith('.yml'):
+                continue
+            with open(os.path.join(root, filename), 'r') as _f:
+                document = _f.read()
+            try:
+                yaml.load(document, Loader=yaml.SafeLoader)
+            except yaml.YAMLError:
+                # invalid samples are only parsed by the error path
+                continue
+            samples.append(document)
+
+    cases = [('samples ({} files)'.format(len(samples)), samples)]
+    for num_vdus in (10, 100, 500):
+        cases.append(('synthetic VNFD, {} VDUs'.format(num_vdus),
+                      [synthetic_vnfd(num_vdus)]))
+
+    print("{:<32} {:>12} {:>12} {:>8}"
+          .format('case', 'SafeLoader', 'CSafeLoader', 'speedup'))
+    for name, documents in cases:
+        py_time = best_time(documents, yaml.SafeLoader, args.repeat)
+        c_time = best_time(documents, yaml.CSafeLoader, args.repeat)
+        print("{:<32} {:>10.1f}ms {:>10.1f}ms {:>7.1f}x"
+              .format(name, py_time * 1000, c_time * 1000,
+                      py_time / c_time))
+
+
+if __name__ == '__main__':
+    main()
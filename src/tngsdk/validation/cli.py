@@ -34,6 +34,7 @@ import os
 import sys
 
 from tngsdk.validation.validator import Validator
+from tngsdk.validation.schema.validator import SchemaValidator
 from tngsdk.project.project import Project
 from tngsdk.validation.logger import TangoLogger
 
@@ -48,6 +49,16 @@ def dispatch(args, validator):
         makes topology level validation.
     """
     LOG.info("Printing all the arguments: {}\n".format(args))
+    if args.max_errors:
+        validator.configure(max_errors=args.max_errors)
+    if args.jobs is not None:
+        validator.configure(jobs=args.jobs, job_threads=args.job_threads)
+    if args.graphs_dir:
+        validator.configure(graphs_dir=args.graphs_dir,
+                            graph_levels=args.graph_levels)
+    validator.schema_validator.configure(offline=args.offline,
+                                         ttl=args.schema_ttl,
+                                         bundle=args.schema_bundle)
     if args.vnfd:
         LOG.info("VNFD validation")
         validator.schema_validator.load_schemas("VNFD")
@@ -482,6 +493,84 @@ def parse_args(input_args=None):
         required=False,
         default=None
     )
+    parser.add_argument(
+        "--all-errors",
+        help="Report all the schema errors of each descriptor, up to the "
+             "specified number (default: {}), instead of only the first one."
+             .format(SchemaValidator.DEFAULT_MAX_ERRORS),
+        dest="max_errors",
+        nargs="?",
+        type=int,
+        const=SchemaValidator.DEFAULT_MAX_ERRORS,
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        "--jobs",
+        help="Read and validate function descriptors, and the test, "
+             "slice, runtime policy and SLA descriptors of a project, with "
+             "the specified number of parallel processes (0 for one per "
+             "CPU).",
+        dest="jobs",
+        type=int,
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        "--job-threads",
+        help="Read descriptor files in threads instead of processes for "
+             "'--jobs'.",
+        dest="job_threads",
+        action="store_true",
+        required=False,
+        default=False
+    )
+    parser.add_argument(
+        "--graphs",
+        help="Write the topology graphs of the validated services as "
+             "GraphML files in the specified directory.",
+        dest="graphs_dir",
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        "--graph-levels",
+        help="Levels of the topology graphs written with '--graphs' "
+             "(default: 0 1 2 3).",
+        dest="graph_levels",
+        nargs="+",
+        type=int,
+        choices=range(0, 4),
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        "--offline",
+        help="Never fetch schemas from remote locations, use the stored "
+             "ones (or those of '--schema-bundle').",
+        action="store_true",
+        required=False,
+        default=False
+    )
+    parser.add_argument(
+        "--schema-ttl",
+        help="Use the stored schemas if they were fetched less than the "
+             "specified number of hours ago. Older schemas are used while "
+             "they are refreshed in the background.",
+        dest="schema_ttl",
+        type=float,
+        required=False,
+        default=None
+    )
+    parser.add_argument(
+        "--schema-bundle",
+        help="Load the schemas from the specified schema bundle file. They "
+             "are not fetched from remote locations, unless "
+             "'--schema-ttl' is given.",
+        dest="schema_bundle",
+        required=False,
+        default=None
+    )
     parser.add_argument(
         "--debug",
         help="Sets verbosity level to debug",
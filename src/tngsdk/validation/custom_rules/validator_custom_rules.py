@@ -3,7 +3,7 @@ from business_rules import run_all, export_rule_data
 from business_rules.variables import *
 from business_rules.actions import *
 from business_rules.fields import *
-from tngsdk.validation.util import read_descriptor_file
+from tngsdk.validation.util import read_descriptor_file, load_yaml
 from tngsdk.validation import event
 from tngsdk.validation.storage import DescriptorStorage
 from tngsdk.validation.logger import TangoLogger
@@ -180,7 +180,7 @@ def load_rules_yaml(custom_rule_file):
 
         try:
             with open(custom_rule_file, "r") as fn_custom_rule:
-                rules = yaml.load(fn_custom_rule, Loader=yaml.SafeLoader)
+                rules = load_yaml(fn_custom_rule)
         except IOError:
             LOG.error("Error opening custom rule file: "
                       "File does not appear to exist.")
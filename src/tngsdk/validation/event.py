@@ -1,6 +1,8 @@
 import yaml
 import logging
 import os
+import contextlib
+import contextvars
 import pkg_resources
 import uuid
 from tngsdk.validation.logger import TangoLogger
@@ -27,10 +29,72 @@ class EventLogger(object):
         return list(filter(lambda event: event['level'] == 'warning',
                     self._events.values()))
 
+    @contextlib.contextmanager
+    def activate(self):
+        """
+        Makes this logger the one used through 'get_logger' with its name
+        in the current context, i.e. thread or asyncio task, until the end
+        of the 'with' block.
+        """
+        token = EventLogger.manager.context(self._name).set(self)
+        try:
+            yield self
+        finally:
+            EventLogger.manager.context(self._name).reset(token)
+
     def reset(self):
         self._events.clear()
         self._eventdict = self.load_eventcfg()
 
+    def clear(self):
+        """
+        Drops the logged events, keeping the loaded events config.
+        """
+        self._events.clear()
+
+    def checkpoint(self):
+        """
+        Provides the current state of the logged events, to export only
+        the events logged afterwards (see 'export').
+        :return: number of details of each event, by key
+        """
+        return {key: len(event['detail'])
+                for key, event in self._events.items()}
+
+    def export(self, since=None):
+        """
+        Provides a copy of the logged events, in logging order, e.g. to
+        merge them into the logger of another process.
+        :param since: checkpoint (see 'checkpoint'), only the events and
+                      details logged after it are exported
+        :return: list of events
+        """
+        if since is None:
+            return [dict(event, detail=list(event['detail']))
+                    for event in self._events.values()]
+        events = []
+        for key, event in self._events.items():
+            count = since.get(key)
+            if count is None:
+                events.append(dict(event, detail=list(event['detail'])))
+            elif len(event['detail']) > count:
+                events.append(dict(event, detail=event['detail'][count:]))
+        return events
+
+    def merge(self, events):
+        """
+        Adds exported events as if they were logged in this logger: the
+        details of an already logged event are appended to it.
+        :param events: list of events (see 'export')
+        """
+        for event in events:
+            key = self.get_key(event['source_id'], event['event_code'],
+                               event['level'])
+            if key not in self._events.keys():
+                self._events[key] = dict(event, detail=list(event['detail']))
+            else:
+                self._events[key]['detail'].extend(event['detail'])
+
     def log(self, header, msg, source_id, event_code, event_id=None,
             detail_event_id=None):
         level = self._eventdict[event_code]
@@ -115,10 +179,38 @@ class EventLogger(object):
         return str(source_id) + '-' + str(event_code) + '-' + str(level)
 
 
+class ContextEventLogger(object):
+    """
+    Event logger forwarding to the logger activated in the current context
+    (see 'EventLogger.activate'), or to the process-wide logger of its name
+    if none is.
+    """
+
+    def __init__(self, name, default):
+        self._name = name
+        self._default = default
+
+    @property
+    def current(self):
+        return (EventLogger.manager.context(self._name).get() or
+                self._default)
+
+    @property
+    def default(self):
+        """
+        Process-wide logger, used outside of the activated contexts.
+        """
+        return self._default
+
+    def __getattr__(self, attr):
+        return getattr(self.current, attr)
+
+
 class LoggerManager(object):
 
     def __init__(self):
         self._loggers = dict()
+        self._contexts = dict()
 
     def get_logger(self, name):
         if name not in self._loggers.keys():
@@ -126,7 +218,14 @@ class LoggerManager(object):
         else:
             self._loggers[name].reset()
 
-        return self._loggers[name]
+        return ContextEventLogger(name, self._loggers[name])
+
+    def context(self, name):
+        """
+        Provides the context variable holding the active logger of a name.
+        """
+        return self._contexts.setdefault(
+            name, contextvars.ContextVar(name, default=None))
 
 
 EventLogger.manager = LoggerManager()
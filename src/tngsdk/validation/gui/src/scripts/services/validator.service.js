@@ -67,7 +67,7 @@ export class ValidatorService {
   }
 
   getReportTopology(id) {
-    var endpoint = 'http://localhost:5001/api/v1/validations/'.concat(id, "/topology");
+    var endpoint = 'http://localhost:5001/api/v1/validations/'.concat(id, "/topology?format=graphml");
 
     var xmlDoc;
     return this.http.get(endpoint).then(response => {
@@ -41,7 +41,9 @@ import shutil
 import subprocess
 import urllib.request as urllib2
 import urllib.parse as urlparse
-from flask import Flask, Blueprint, request
+import networkx as nx
+from networkx.readwrite import json_graph
+from flask import Flask, Blueprint, Response, request
 from flask_restplus import Resource, Api, Namespace
 from flask_restplus import fields, inputs
 from werkzeug.contrib.fixers import ProxyFix
@@ -55,7 +57,7 @@ from flask_caching import Cache, make_template_fragment_key
 from threading import Thread
 
 from tngsdk.validation import cli
-from tngsdk.validation.validator import Validator
+from tngsdk.validation.validator import Validator, ValidatorPool
 from tngsdk.validation.event import EventLogger
 from tngsdk.project.workspace import Workspace
 from tngsdk.validation.logger import TangoLogger
@@ -65,6 +67,8 @@ from tngsdk.validation.logger import TangoLogger
 
 LOG = TangoLogger.getLogger(__name__)
 
+GRAPHML_MIMETYPE = 'application/graphml+xml'
+
 
 app = Flask(__name__)
 app.config.from_pyfile('rest_settings.py')
@@ -141,6 +145,7 @@ def initialize(debug=False):
 
     os.makedirs(app.config['ARTIFACTS_DIR'], exist_ok=True)
     set_artifact(app.config['ARTIFACTS_DIR'])
+    validators.prewarm()
 
 # def dump_swagger(args):
 #     # TODO replace this with the URL of a real tng-package service
@@ -337,6 +342,8 @@ class ValidationGetNetTopology(Resource):
     @api_v1.response(200, "Successfully operation.")
     @api_v1.response(400, "Bad request: Could not get"
                           "the net topology of requested validation.")
+    @api_v1.doc(params={'format': "'graphml' to get the topology as "
+                                  "GraphML instead of node-link JSON"})
     def get(self, validationId):
         vid = get_validation(validationId)
         if (not vid):
@@ -345,6 +352,9 @@ class ValidationGetNetTopology(Resource):
         if (('net_topology' not in vid) or (vid['net_topology'] == '[]')):
             return ('Validation with id {} does not have net_topology '
                     'report'.format(validationId), 404)
+        if wants_graphml():
+            return Response(gen_graphml_net_topology(vid['net_topology']),
+                            mimetype=GRAPHML_MIMETYPE)
         return vid['net_topology']
 
 
@@ -478,6 +488,36 @@ class Watch(Resource):
         return 200
 
 
+def create_validator():
+    """
+    Creates a validator which obtains the schemas as specified in the
+    service settings.
+    """
+    validator = Validator()
+    validator.schema_validator.configure(
+        offline=app.config['SCHEMA_OFFLINE'],
+        ttl=app.config['SCHEMA_TTL'],
+        bundle=app.config['SCHEMA_BUNDLE'])
+    return validator
+
+
+# validators reused across the validation requests
+validators = ValidatorPool(maxsize=app.config['VALIDATOR_POOL_SIZE'],
+                           factory=create_validator)
+
+
+def new_validator():
+    """
+    Borrows a validator from the pool, which reads the descriptors as
+    specified in the service settings. It is given back to the pool by
+    'export_graphs' once the validation is reported.
+    """
+    validator = validators.acquire()
+    validator.configure(jobs=app.config['JOBS'],
+                        job_threads=app.config['JOB_THREADS'])
+    return validator
+
+
 def _validate_object(args, path, keypath, obj_type):
     # protect against incorrect parameters
 
@@ -560,12 +600,46 @@ def _validate_object(args, path, keypath, obj_type):
     else:
         set_resource(rid, keypath, obj_type, hashFile, vid)
 
-    if args['source'] == 'embedded':
-        LOG.info('File embedded in request')
-        # Save file passed in the request
-        descriptor_path = path
-        validator = Validator()
-        if not args['custom']:
+    validator = new_validator()
+    try:
+        if args['source'] == 'embedded':
+            LOG.info('File embedded in request')
+            # Save file passed in the request
+            descriptor_path = path
+            if not args['custom']:
+                validator.configure(syntax=(args['syntax'] or False),
+                                    integrity=(args['integrity'] or False),
+                                    topology=(args['topology'] or False),
+                                    custom=(args['custom'] or False),
+                                    cfile=(args['cfile'] or False),
+                                    dext=(args['dext'] or False),
+                                    dpath=(args['dpath'] or False),
+                                    workspace_path=(args['workspace']
+                                                    or False))
+            if args['custom']:
+                validator.configure(syntax=(args['syntax'] or False),
+                                    integrity=(args['integrity'] or False),
+                                    topology=(args['topology'] or False),
+                                    custom=(args['custom'] or False),
+                                    cfile=rules_path,
+                                    dext=(args['dext'] or False),
+                                    dpath=(args['dpath'] or False),
+                                    workspace_path=(args['workspace']
+                                                    or False))
+
+            if args['function']:
+                LOG.info("Validating Function descriptor: {}"
+                         .format(descriptor_path))
+                # TODO check if the function is a valid file path
+                validator.validate_function(descriptor_path)
+        else:
+            if (args['source'] == 'local'):
+                LOG.info('Local file')
+                path = args['path']
+            elif (args['source'] == 'url'):
+                LOG.info('URL file')
+                path = get_url(args['path'])
+
             validator.configure(syntax=(args['syntax'] or False),
                                 integrity=(args['integrity'] or False),
                                 topology=(args['topology'] or False),
@@ -573,91 +647,65 @@ def _validate_object(args, path, keypath, obj_type):
                                 cfile=(args['cfile'] or False),
                                 dext=(args['dext'] or False),
                                 dpath=(args['dpath'] or False),
-                                workspace_path=(args['workspace']
-                                                or False))
-        if args['custom']:
-            validator.configure(syntax=(args['syntax'] or False),
-                                integrity=(args['integrity'] or False),
-                                topology=(args['topology'] or False),
-                                custom=(args['custom'] or False),
-                                cfile=rules_path,
-                                dext=(args['dext'] or False),
-                                dpath=(args['dpath'] or False),
-                                workspace_path=(args['workspace']
-                                                or False))
-
-        if args['function']:
-            LOG.info("Validating Function descriptor: {}".format(descriptor_path))
-            # TODO check if the function is a valid file path
-            validator.validate_function(descriptor_path)
-    else:
-        if (args['source'] == 'local'):
-            LOG.info('Local file')
-            path = args['path']
-        elif (args['source'] == 'url'):
-            LOG.info('URL file')
-            path = get_url(args['path'])
-
-        validator = Validator()
-        validator.configure(syntax=(args['syntax'] or False),
-                            integrity=(args['integrity'] or False),
-                            topology=(args['topology'] or False),
-                            custom=(args['custom'] or False),
-                            cfile=(args['cfile'] or False),
-                            dext=(args['dext'] or False),
-                            dpath=(args['dpath'] or False),
-                            workspace_path=(args['workspace'] or None))
-
-        if args['function']:
-            LOG.info("Validating Function descriptor: {}".format(path))
-            validator.validate_function(path)
-
-        elif args['service']:
-            LOG.info("Validating Service descriptor: {}".format(path))
-            # TODO check if the function is a valid file path
-            validator.validate_service(path)
-
-        elif args['project']:
-            LOG.info("Validating Project descriptor: {}".format(path))
-            # TODO check if the function is a valid file path
-            validator.validate_project(path)
-        elif args['test']:
-            LOG.info("Validation Test descriptor: {}".format(path))
-            validator.validate_test(path)
-        elif args['sla']:
-            LOG.info("Validation SLA descriptor: {}".format(path))
-            validator.validate_sla(path)
-        elif args['slice']:
-            LOG.info("Validation Slice descriptor: {}".format(path))
-            validator.validate_slice(path)
-        elif args['policy']:
-            LOG.info("Validation Runtime Policy descriptor: {}".format(path))
-            validator.validate_runtime_policy(path)
-
-    json_result = gen_report_result(vid, validator)
-    net_topology = gen_report_net_topology(validator)
-    net_fwgraph = gen_report_net_fwgraph(validator)
-    if (obj_type == 'project'):
-        set_validation(vid, rid, path, obj_type, args['syntax'],
-                       args['integrity'], args['topology'], args['custom'],
-                       'ProjectNotHashFile', result=json_result,
-                       net_topology=net_topology,
-                       net_fwgraph=net_fwgraph,
-                       dpath=(args['dpath'] or None),
-                       dext=(args['dext'] or None))
-    elif(args['custom']):
-        set_validation(vid, rid, path, obj_type, args['syntax'],
-                       args['integrity'], args['topology'], args['custom'],
-                       hashFile, custom_rid, custom_hashFile,
-                       result=json_result, net_topology=net_topology,
-                       net_fwgraph=net_fwgraph)
-    else:
-        set_validation(vid, rid, path, obj_type, args['syntax'],
-                       args['integrity'], args['topology'], args['custom'],
-                       hashFile, result=json_result, net_topology=net_topology,
-                       net_fwgraph=net_fwgraph,
-                       dpath=(args['dpath'] or None),
-                       dext=(args['dext'] or None))
+                                workspace_path=(args['workspace'] or None))
+
+            if args['function']:
+                LOG.info("Validating Function descriptor: {}".format(path))
+                validator.validate_function(path)
+
+            elif args['service']:
+                LOG.info("Validating Service descriptor: {}".format(path))
+                # TODO check if the function is a valid file path
+                validator.validate_service(path)
+
+            elif args['project']:
+                LOG.info("Validating Project descriptor: {}".format(path))
+                # TODO check if the function is a valid file path
+                validator.validate_project(path)
+            elif args['test']:
+                LOG.info("Validation Test descriptor: {}".format(path))
+                validator.validate_test(path)
+            elif args['sla']:
+                LOG.info("Validation SLA descriptor: {}".format(path))
+                validator.validate_sla(path)
+            elif args['slice']:
+                LOG.info("Validation Slice descriptor: {}".format(path))
+                validator.validate_slice(path)
+            elif args['policy']:
+                LOG.info("Validation Runtime Policy descriptor: {}"
+                         .format(path))
+                validator.validate_runtime_policy(path)
+
+        json_result = gen_report_result(vid, validator)
+        net_topology = gen_report_net_topology(validator)
+        net_fwgraph = gen_report_net_fwgraph(validator)
+        if (obj_type == 'project'):
+            set_validation(vid, rid, path, obj_type, args['syntax'],
+                           args['integrity'], args['topology'], args['custom'],
+                           'ProjectNotHashFile', result=json_result,
+                           net_topology=net_topology,
+                           net_fwgraph=net_fwgraph,
+                           dpath=(args['dpath'] or None),
+                           dext=(args['dext'] or None))
+        elif args['custom']:
+            set_validation(vid, rid, path, obj_type, args['syntax'],
+                           args['integrity'], args['topology'], args['custom'],
+                           hashFile, custom_rid, custom_hashFile,
+                           result=json_result, net_topology=net_topology,
+                           net_fwgraph=net_fwgraph)
+        else:
+            set_validation(vid, rid, path, obj_type, args['syntax'],
+                           args['integrity'], args['topology'], args['custom'],
+                           hashFile, result=json_result,
+                           net_topology=net_topology,
+                           net_fwgraph=net_fwgraph,
+                           dpath=(args['dpath'] or None),
+                           dext=(args['dext'] or None))
+    except Exception:
+        # the validator would be lost for the pool otherwise
+        validators.release(validator)
+        raise
+    export_graphs(vid, validator)
     # update_resource_validation(rid, vid)
     validation_to_return = get_validation(vid)
     return validation_to_return, 200
@@ -757,52 +805,61 @@ def _validate_object_watcher(args, path, keypath, obj_type):
     else:
         set_resource(rid, keypath, obj_type, hashFile, vid)
 
-    validator = Validator()
-    validator.configure(syntax=(args['syntax'] or False),
-                        integrity=(args['integrity'] or False),
-                        topology=(args['topology'] or False),
-                        custom=(args['custom'] or False),
-                        cfile=(args['cfile'] or False),
-                        dext=(args['dext'] or False),
-                        dpath=(args['dpath'] or False),
-                        workspace_path=(args['workspace'] or False))
-
-    if obj_type == 'function':
-        LOG.info("Validating Function descriptor: {}".format(path))
-        # TODO check if the function is a valid file path
-        validator.validate_function(path)
-
-    elif obj_type == 'service':
-        LOG.info("Validating Service descriptor: {}".format(path))
-        # TODO check if the function is a valid file path
-        validator.validate_service(path)
-
-    elif obj_type == 'project':
-        LOG.info("Validating Project descriptor: {}".format(path))
-        # TODO check if the function is a valid file path
-        validator.validate_project(path)
-
-    json_result = gen_report_result(vid, validator)
-    net_topology = gen_report_net_topology(validator)
-    net_fwgraph = gen_report_net_fwgraph(validator)
-    if(args['custom']):
-        set_validation(vid, rid, path, obj_type, args['syntax'],
-                       args['integrity'], args['topology'], args['custom'],
-                       hashFile, custom_rid, custom_hashFile,
-                       result=json_result, net_topology=net_topology,
-                       net_fwgraph=net_fwgraph)
-    else:
-        set_validation(vid, rid, path, obj_type, args['syntax'],
-                       args['integrity'], args['topology'], args['custom'],
-                       hashFile, result=json_result, net_topology=net_topology,
-                       net_fwgraph=net_fwgraph)
+    validator = new_validator()
+    try:
+        validator.configure(syntax=(args['syntax'] or False),
+                            integrity=(args['integrity'] or False),
+                            topology=(args['topology'] or False),
+                            custom=(args['custom'] or False),
+                            cfile=(args['cfile'] or False),
+                            dext=(args['dext'] or False),
+                            dpath=(args['dpath'] or False),
+                            workspace_path=(args['workspace'] or False))
+
+        if obj_type == 'function':
+            LOG.info("Validating Function descriptor: {}".format(path))
+            # TODO check if the function is a valid file path
+            validator.validate_function(path)
+
+        elif obj_type == 'service':
+            LOG.info("Validating Service descriptor: {}".format(path))
+            # TODO check if the function is a valid file path
+            validator.validate_service(path)
+
+        elif obj_type == 'project':
+            LOG.info("Validating Project descriptor: {}".format(path))
+            # TODO check if the function is a valid file path
+            validator.validate_project(path)
+
+        json_result = gen_report_result(vid, validator)
+        net_topology = gen_report_net_topology(validator)
+        net_fwgraph = gen_report_net_fwgraph(validator)
+        if args['custom']:
+            set_validation(vid, rid, path, obj_type, args['syntax'],
+                           args['integrity'], args['topology'], args['custom'],
+                           hashFile, custom_rid, custom_hashFile,
+                           result=json_result, net_topology=net_topology,
+                           net_fwgraph=net_fwgraph)
+        else:
+            set_validation(vid, rid, path, obj_type, args['syntax'],
+                           args['integrity'], args['topology'], args['custom'],
+                           hashFile, result=json_result,
+                           net_topology=net_topology,
+                           net_fwgraph=net_fwgraph)
+    except Exception:
+        # the validator would be lost for the pool otherwise
+        validators.release(validator)
+        raise
+    # export_graphs gives the validator back to the pool
+    result = {"validation_process_uuid": "test",
+              "status": 200,
+              "error_count": validator.error_count,
+              "errors": validator.errors}
+    export_graphs(vid, validator)
     update_resource_validation(rid, vid)
 
     # return json_result
-    return {"validation_process_uuid": "test",
-            "status": 200,
-            "error_count": validator.error_count,
-            "errors": validator.errors}
+    return result
 
 
 def set_watch(path, obj_type, syntax, integrity, topology, custom):
@@ -866,41 +923,48 @@ def _validate_object_from_watch(path):
                          watch['custom'], rid, vid))
 
         set_resource(rid, path, 'function', hashFile, vid)
-        validator = Validator()
-        validator.configure(syntax=(watch['syntax'] or False),
-                            integrity=(watch['integrity'] or False),
-                            topology=(watch['topology'] or False),
-                            custom=(watch['custom'] or False))
-
-        if watch['type'] == 'function':
-            LOG.info("Validating Function descriptor: {}".format(path))
-            # TODO check if the function is a valid file path
-            validator.validate_function(path)
-
-        elif watch['type'] == 'service':
-            LOG.info("Validating Service descriptor: {}".format(path))
-            # TODO check if the function is a valid file path
-            validator.validate_service(path)
-
-        elif watch['type'] == 'project':
-            LOG.info("Validating Project descriptor: {}".format(path))
-            # TODO check if the function is a valid file path
-            validator.validate_project(path)
-
-        json_result = gen_report_result(rid, validator)
-        net_topology = gen_report_net_topology(validator)
-        net_fwgraph = gen_report_net_fwgraph(validator)
-
-        set_validation(vid, rid, path, watch['type'], watch['syntax'],
-                       watch['integrity'], watch['topology'], watch['custom'],
-                       hashFile, result=json_result,
-                       net_topology=net_topology, net_fwgraph=net_fwgraph)
-        update_resource_validation(rid, vid)
-
+        validator = new_validator()
+        try:
+            validator.configure(syntax=(watch['syntax'] or False),
+                                integrity=(watch['integrity'] or False),
+                                topology=(watch['topology'] or False),
+                                custom=(watch['custom'] or False))
+
+            if watch['type'] == 'function':
+                LOG.info("Validating Function descriptor: {}".format(path))
+                # TODO check if the function is a valid file path
+                validator.validate_function(path)
+
+            elif watch['type'] == 'service':
+                LOG.info("Validating Service descriptor: {}".format(path))
+                # TODO check if the function is a valid file path
+                validator.validate_service(path)
+
+            elif watch['type'] == 'project':
+                LOG.info("Validating Project descriptor: {}".format(path))
+                # TODO check if the function is a valid file path
+                validator.validate_project(path)
+
+            json_result = gen_report_result(rid, validator)
+            net_topology = gen_report_net_topology(validator)
+            net_fwgraph = gen_report_net_fwgraph(validator)
+
+            set_validation(vid, rid, path, watch['type'], watch['syntax'],
+                           watch['integrity'], watch['topology'],
+                           watch['custom'], hashFile, result=json_result,
+                           net_topology=net_topology,
+                           net_fwgraph=net_fwgraph)
+        except Exception:
+            # the validator would be lost for the pool otherwise
+            validators.release(validator)
+            raise
+        # export_graphs gives the validator back to the pool
         result = {"validation_process_uuid": "test",
                   "status": 200,
                   "error_count": validator.error_count,
                   "errors": validator.errors}
+        export_graphs(vid, validator)
+        update_resource_validation(rid, vid)
 
     # re-schedule watchers
     install_watchers(path, watch['type'], watch['syntax'], watch['integrity'],
@@ -971,25 +1035,63 @@ def gen_report_result(validationId, validator):
 
 
 def gen_report_net_topology(validator):
-
+    """
+    Builds the net topology report: the node-link representation of the
+    complete topology graph of the (first) validated service.
+    """
     LOG.info("Building result report net topology")
-    report = list()
     for sid, service in validator.storage.services.items():
-        graph_repr = ''
-        if not service.complete_graph:
-            return
-        for line in service.complete_graph:
-            if not line:
-                continue
-            graph_repr += line
-        report.append(graph_repr)
-
-    # TODO: temp patch for returning only the topology of the first service
-    if len(report) > 0:
-        report = report[0]
-        return report
+        # TODO: temp patch for returning only the topology of the first
+        # service
+        return service.complete_graph_data
+
+
+def gen_graphml_net_topology(net_topology):
+    """
+    Provides the GraphML representation of a net topology report.
+    """
+    if isinstance(net_topology, str):
+        # report stored as GraphML by former versions
+        return net_topology
+    graph = json_graph.node_link_graph(net_topology)
+    return '\n'.join(nx.generate_graphml(graph, encoding='utf-8',
+                                         prettyprint=True))
+
+
+def wants_graphml():
+    """
+    Indicates whether the GraphML representation of a topology was
+    requested, either with the 'format' argument or the 'Accept' header.
+    """
+    if request.args.get('format'):
+        return request.args.get('format') == 'graphml'
+    return (request.accept_mimetypes.best_match(
+        ['application/json', GRAPHML_MIMETYPE]) == GRAPHML_MIMETYPE)
+
+
+def export_graphs(vid, validator):
+    """
+    Gives the validator back to the pool and, if 'GRAPHS_DIR' is
+    configured, writes the GraphML files of its service topology graphs
+    to the '<vid>' directory in the background, so that they are not part
+    of the validation latency.
+    :return: writer thread, None if no graph is written
+    """
+    services = [service for service in validator.storage.services.values()
+                if service.graph is not None]
+    validators.release(validator)
+    if not app.config['GRAPHS_DIR'] or not services:
+        return
+    graphsdir = os.path.join(app.config['GRAPHS_DIR'], vid)
+    thread = Thread(target=_write_graphs, args=(graphsdir, services))
+    thread.daemon = True
+    thread.start()
+    return thread
+
 
-        return report
+def _write_graphs(graphsdir, services):
+    for service in services:
+        Validator.write_service_graphs(service, graphsdir)
 
 
 def gen_report_net_fwgraph(validator):
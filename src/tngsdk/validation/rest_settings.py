@@ -12,3 +12,12 @@ ARTIFACTS_DIR = os.environ.get('VAPI_ARTIFACTS_DIR') or \
 
 DEBUG = os.environ.get('VAPI_DEBUG') or False
 ENABLE_CORS = os.environ.get('ENABLE_CORS') or False
+SCHEMA_BUNDLE = os.environ.get('VAPI_SCHEMA_BUNDLE') or None
+SCHEMA_OFFLINE = (os.environ.get('VAPI_SCHEMA_OFFLINE') or '').lower() in \
+    ('1', 'true', 'yes')
+SCHEMA_TTL = float(os.environ.get('VAPI_SCHEMA_TTL') or 24)
+JOBS = int(os.environ.get('VAPI_JOBS') or 1)
+JOB_THREADS = (os.environ.get('VAPI_JOB_THREADS') or '').lower() in \
+    ('1', 'true', 'yes')
+GRAPHS_DIR = os.environ.get('VAPI_GRAPHS_DIR') or None
+VALIDATOR_POOL_SIZE = int(os.environ.get('VAPI_VALIDATOR_POOL_SIZE') or 4)
@@ -27,7 +27,13 @@
 import unittest
 import pkg_resources
 import os
+import tempfile
+import threading
+import yaml
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from unittest import mock
 from requests.exceptions import HTTPError, MissingSchema
+from tngsdk.validation.schema.validator import SchemaValidator
 from tngsdk.validation.schema.validator import load_local_schema
 from tngsdk.validation.schema.validator import load_remote_schema
 
@@ -87,3 +93,65 @@ class IntLoadSchemaTests(unittest.TestCase):
             "https://raw.githubusercontent.com/"
             "sonata-nfv/son-schema/master/package-descriptor/pd-schema.yml")
         self.assertIsInstance(schema, dict)
+
+
+class StubSchemaHandler(BaseHTTPRequestHandler):
+    """
+    Serves a minimal schema for any path, honouring If-None-Match.
+    """
+    etag = '"schema-v1"'
+
+    def do_GET(self):
+        self.server.requests.append((self.path,
+                                     self.headers.get('If-None-Match')))
+        if self.headers.get('If-None-Match') == self.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = yaml.dump({'type': 'object'}).encode()
+        self.send_response(200)
+        self.send_header('ETag', self.etag)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class IntRefreshSchemaTests(unittest.TestCase):
+
+    def setUp(self):
+        self.server = HTTPServer(('127.0.0.1', 0), StubSchemaHandler)
+        self.server.requests = []
+        threading.Thread(target=self.server.serve_forever,
+                         daemon=True).start()
+        self.schemas_dir = tempfile.TemporaryDirectory()
+        workspace = mock.Mock(log_level='info',
+                              schemas_local_master=self.schemas_dir.name)
+        self.schema_validator = SchemaValidator(workspace)
+        self.schema_validator._schemas_remote_master = \
+            'http://127.0.0.1:{}'.format(self.server.server_port)
+        self.schema_validator.config_schema_locations()
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.schemas_dir.cleanup()
+
+    def test_conditional_refresh(self):
+        sv = self.schema_validator
+        sv.load_schemas(SchemaValidator.SCHEMA_SERVICE_DESCRIPTOR)
+        self.assertEqual(len(self.server.requests), 3)
+        for schema_id in ('NSD', 'VNFD', 'TSTD'):
+            self.assertTrue(os.path.isfile(sv.get_local_schema(schema_id)))
+
+        # unchanged schemas are not downloaded nor rewritten
+        with mock.patch("tngsdk.validation.schema.validator."
+                        "write_local_schema") as m_write:
+            sv.load_schemas(SchemaValidator.SCHEMA_SERVICE_DESCRIPTOR)
+            self.assertFalse(m_write.called)
+        self.assertEqual(len(self.server.requests), 6)
+        self.assertEqual([etag for _, etag in self.server.requests[3:]],
+                         [StubSchemaHandler.etag] * 3)
+        self.assertEqual(sv.load_schema('VNFD'), {'type': 'object'})
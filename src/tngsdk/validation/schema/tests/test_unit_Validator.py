@@ -24,11 +24,21 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 
+import os
+import threading
 import unittest
+import tempfile
 from unittest import mock
+from tngsdk.validation.schema.validator import SchemaValidator
+from tngsdk.validation.schema.validator import SchemaCache
+from tngsdk.validation.schema.validator import get_schema_cache
+from tngsdk.validation.schema.validator import write_local_schema
 from tngsdk.validation.schema.validator import load_local_schema
 from tngsdk.validation.schema.validator import load_remote_schema
+from tngsdk.validation.schema.validator import read_remote_metadata
+from tngsdk.validation.schema.validator import update_remote_metadata
 from unittest.mock import patch
+from requests.exceptions import RequestException
 
 
 class UnitLoadSchemaTests(unittest.TestCase):
@@ -79,5 +89,209 @@ class UnitLoadSchemaTests(unittest.TestCase):
         return_dict = load_remote_schema("url")
         self.assertEqual(sample_dict, return_dict)
 
+
+class UnitSchemaCacheTests(unittest.TestCase):
+
+    def setUp(self):
+        self.schemas_dir = tempfile.TemporaryDirectory()
+        self.schema_file = os.path.join(self.schemas_dir.name,
+                                        'function-descriptor',
+                                        'vnfd-schema.yml')
+        write_local_schema(self.schemas_dir.name, self.schema_file,
+                           {'type': 'object'})
+
+    def tearDown(self):
+        self.schemas_dir.cleanup()
+
+    def test_schema_cache(self):
+        cache = get_schema_cache(self.schemas_dir.name)
+        digest, schema = cache.load(self.schema_file)
+        self.assertEqual(schema, {'type': 'object'})
+        self.assertTrue(os.path.isfile(
+            os.path.join(self.schemas_dir.name, SchemaCache.CACHE_FILE)))
+
+        # a new cache reads the parsed schema from the cache file
+        with patch("tngsdk.validation.schema.validator.yaml.load") as m_load:
+            self.assertEqual(SchemaCache(self.schemas_dir.name)
+                             .load(self.schema_file), (digest, schema))
+            self.assertFalse(m_load.called)
+
+        # rewriting the schema file invalidates its cached content
+        write_local_schema(self.schemas_dir.name, self.schema_file,
+                           {'type': 'array'})
+        digest2, schema = cache.load(self.schema_file)
+        self.assertNotEqual(digest, digest2)
+        self.assertEqual(schema, {'type': 'array'})
+
+        self.assertRaises(FileNotFoundError, cache.load,
+                          os.path.join(self.schemas_dir.name, 'missing.yml'))
+
+        # only the checks of cached schema contents are kept
+        cache.mark_checked(digest)
+        cache.mark_checked(digest2)
+        self.assertFalse(cache.is_checked(digest))
+        self.assertTrue(cache.is_checked(digest2))
+        self.assertEqual(SchemaCache(self.schemas_dir.name)._checked,
+                         {digest2})
+        # checks of bundled schemas are kept apart, in memory
+        cache.mark_checked('bundled', bundled=True)
+        self.assertTrue(cache.is_checked('bundled', bundled=True))
+        self.assertFalse(cache.is_checked('bundled'))
+        self.assertTrue(cache.is_checked(digest2))
+
+
+class UnitSchemaValidatorTests(unittest.TestCase):
+
+    def setUp(self):
+        self.schemas_dir = tempfile.TemporaryDirectory()
+        workspace = mock.Mock(log_level='info',
+                              schemas_local_master=self.schemas_dir.name)
+        self.schema_validator = SchemaValidator(workspace)
+        self.schema = {'type': 'object',
+                       'properties': {'name': {'type': 'string'}},
+                       'required': ['name']}
+        self.schema_validator._store_schema('VNFD', self.schema)
+
+    def tearDown(self):
+        self.schemas_dir.cleanup()
+
+    def test_validators_cache(self):
+        # the validator is compiled once and reused afterwards
+        self.assertTrue(self.schema_validator.validate({'name': 'a'}, 'VNFD'))
+        self.assertIsNone(self.schema_validator.validate({'name': 1}, 'VNFD'))
+        self.assertEqual(self.schema_validator.error_msg,
+                         "1 is not of type 'string'")
+        info = self.schema_validator.validators_cache_info
+        self.assertEqual((info['hits'], info['misses'], info['size']),
+                         (1, 1, 1))
+
+        # replacing the schema rebuilds its validator
+        self.schema_validator._store_schema('VNFD', dict(self.schema))
+        self.assertTrue(self.schema_validator.validate({'name': 'a'}, 'VNFD'))
+        self.assertEqual(
+            self.schema_validator.validators_cache_info['misses'], 2)
+
+    @patch("tngsdk.validation.schema.validator.load_remote_schema",
+           side_effect=RequestException)
+    def test_get_descriptor_type(self, m_load_remote_schema):
+        sv = self.schema_validator
+        self.assertEqual(sv.classify_descriptor(
+            {'descriptor_schema': 'https://example.com/function-descriptor/'
+                                  'vnfd-schema.yml'}), 'VNFD')
+        self.assertEqual(sv.classify_descriptor(
+            {'network_functions': []}), 'NSD')
+        # conflicting fingerprints are left undecided
+        self.assertIsNone(sv.classify_descriptor(
+            {'network_functions': [], 'phases': []}))
+
+        self.assertEqual(sv.get_descriptor_type(
+            {'name': 'a', 'virtual_deployment_units': []}), 'VNFD')
+        self.assertIsNone(sv.get_descriptor_type(
+            {'name': 1, 'virtual_deployment_units': []}))
+        self.assertEqual(sv.descriptor_type_info,
+                         {'classified': 2, 'fallbacks': 0})
+        self.assertEqual(sv.get_descriptor_type({'name': 'a'}), 'VNFD')
+        self.assertEqual(sv.descriptor_type_info['fallbacks'], 1)
+
+    def test_validate_max_errors(self):
+        sv = self.schema_validator
+        sv._store_schema('NSD', {
+            'type': 'object',
+            'properties': {'units': {'type': 'array',
+                                     'items': {'type': 'string'}}}})
+        descriptor = {'units': ['a', 1, 2, 3]}
+
+        self.assertIsNone(sv.validate(descriptor, 'NSD', max_errors=50))
+        self.assertEqual(sv.errors,
+                         [('$.units[1]', "1 is not of type 'string'"),
+                          ('$.units[2]', "2 is not of type 'string'"),
+                          ('$.units[3]', "3 is not of type 'string'")])
+        self.assertFalse(sv.errors_truncated)
+        self.assertEqual(sv.error_msg, "1 is not of type 'string'")
+
+        self.assertIsNone(sv.validate(descriptor, 'NSD', max_errors=2))
+        self.assertEqual(len(sv.errors), 2)
+        self.assertTrue(sv.errors_truncated)
+
+        # without max_errors only the error message is reported
+        self.assertIsNone(sv.validate(descriptor, 'NSD'))
+        self.assertEqual(sv.errors, [])
+
+    def test_schema_bundle(self):
+        bundle_file = os.path.join(self.schemas_dir.name, 'bundle.json')
+        with patch("tngsdk.validation.schema.validator.fetch_remote_schema",
+                   side_effect=RequestException):
+            self.assertEqual(
+                self.schema_validator.write_schema_bundle(bundle_file),
+                ['VNFD'])
+
+        workspace = mock.Mock(log_level='info',
+                              schemas_local_master=self.schemas_dir.name)
+        sv = SchemaValidator(workspace)
+        sv.configure(offline=True, bundle=bundle_file)
+        with patch("tngsdk.validation.schema.validator."
+                   "fetch_remote_schema") as m_fetch:
+            self.assertTrue(sv.validate({'name': 'a'}, 'VNFD'))
+            self.assertIsNone(sv.load_schema('NSD'))
+            self.assertFalse(m_fetch.called)
+
+        # without TTL, the bundled schemas are not fetched even online
+        sv = SchemaValidator(workspace)
+        sv.configure(bundle=bundle_file)
+        with patch("tngsdk.validation.schema.validator."
+                   "fetch_remote_schema") as m_fetch:
+            sv.load_schemas('VNFD')
+            self.assertTrue(sv.validate({'name': 'a'}, 'VNFD'))
+            self.assertFalse(m_fetch.called)
+
+    def test_schema_bundle_invalid(self):
+        sv = self.schema_validator
+        bundle_file = os.path.join(self.schemas_dir.name, 'bundle.json')
+        with open(bundle_file, 'w') as _f:
+            _f.write('{"format": ')
+        # the stored schemas are kept when the bundle can't be read
+        for filename in (bundle_file,
+                         os.path.join(self.schemas_dir.name, 'missing.json')):
+            sv.configure(offline=True, bundle=filename)
+            self.assertEqual(sv.load_schema_bundle(filename), [])
+            self.assertTrue(sv.validate({'name': 'a'}, 'VNFD'))
+
+    def test_schema_ttl(self):
+        sv = self.schema_validator
+        write_local_schema(self.schemas_dir.name, sv.get_local_schema('VNFD'),
+                           self.schema)
+        sv.configure(ttl=1)
+        with patch.object(sv, "refresh_schemas",
+                          return_value=[]) as m_refresh:
+            # fresh stored schemas are not refreshed
+            sv.load_schemas('VNFD')
+            m_refresh.assert_called_once_with([])
+
+            # stale ones are refreshed in the background
+            sv.configure(ttl=0)
+            with patch.object(sv, "schema_age", return_value=60):
+                sv.load_schemas('VNFD')
+            sv._refresh_thread.join()
+            m_refresh.assert_any_call(['VNFD'])
+
+    def test_update_remote_metadata(self):
+        root = self.schemas_dir.name
+        update_remote_metadata(root, {'a': {'etag': '1'}})
+        # concurrent updates keep the entries of each other
+        threads = [threading.Thread(target=update_remote_metadata,
+                                    args=(root, {str(idx): {'etag': 'x'}}))
+                   for idx in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        metadata = read_remote_metadata(root)
+        self.assertEqual(metadata['a'], {'etag': '1'})
+        self.assertEqual(sorted(metadata), ['0', '1', '2', '3', '4', '5',
+                                            '6', '7', 'a'])
+        self.assertFalse([name for name in os.listdir(root)
+                          if name.endswith('.tmp')])
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -24,18 +24,36 @@
 # acknowledge the contributions of their colleagues of the SONATA
 # partner consortium (www.sonata-nfv.eu).
 
+import contextlib
 import logging
 import coloredlogs
 import validators
 import os
+import errno
+import hashlib
+import json
+import pickle
+import threading
+import time
 import yaml
-import jsonschema
 import requests
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from requests.adapters import HTTPAdapter
 from requests.exceptions import RequestException
 
 from jsonschema import SchemaError
 from jsonschema import ValidationError
+from jsonschema.exceptions import best_match
+from jsonschema.validators import validator_for
 
+from tngsdk.validation.util import YAML_LOADER
+try:
+    import fcntl
+except ImportError:
+    # no file locks (e.g. Windows), only the threads of this process are
+    # synchronized
+    fcntl = None
 from tngsdk.validation.logger import TangoLogger
 LOG = TangoLogger.getLogger(__name__)
 
@@ -50,6 +68,41 @@ class SchemaValidator(object):
     SCHEMA_SLICE_DESCRIPTOR = 'NSTD'
     SCHEMA_SLA_DESCRIPTOR = 'SLAD'
     SCHEMA_RP_DESCRIPTOR = 'RPD'
+
+    SCHEMA_TEMPLATES = (SCHEMA_PACKAGE_DESCRIPTOR,
+                        SCHEMA_SERVICE_DESCRIPTOR,
+                        SCHEMA_FUNCTION_DESCRIPTOR,
+                        SCHEMA_TEST_DESCRIPTOR,
+                        SCHEMA_SLICE_DESCRIPTOR,
+                        SCHEMA_SLA_DESCRIPTOR,
+                        SCHEMA_RP_DESCRIPTOR)
+
+    # Default number of errors collected when all the schema errors of a
+    # descriptor are requested
+    DEFAULT_MAX_ERRORS = 50
+
+    # Fingerprints of each descriptor type: schema files referenced
+    # in 'descriptor_schema' and distinctive top-level keys
+    SCHEMA_FILE_FINGERPRINTS = {
+        'napd-schema.yml': SCHEMA_PACKAGE_DESCRIPTOR,
+        'nsd-schema.yml': SCHEMA_SERVICE_DESCRIPTOR,
+        'vnfd-schema.yml': SCHEMA_FUNCTION_DESCRIPTOR,
+        'test-descriptor-schema.yml': SCHEMA_TEST_DESCRIPTOR,
+        'nst-schema.yml': SCHEMA_SLICE_DESCRIPTOR,
+        'sla-template-schema.yml': SCHEMA_SLA_DESCRIPTOR,
+        'policy-schema.yml': SCHEMA_RP_DESCRIPTOR
+    }
+    SCHEMA_KEY_FINGERPRINTS = (
+        ('package_content', SCHEMA_PACKAGE_DESCRIPTOR),
+        ('network_functions', SCHEMA_SERVICE_DESCRIPTOR),
+        ('virtual_deployment_units', SCHEMA_FUNCTION_DESCRIPTOR),
+        ('cloudnative_deployment_units', SCHEMA_FUNCTION_DESCRIPTOR),
+        ('phases', SCHEMA_TEST_DESCRIPTOR),
+        ('slice_ns_subnets', SCHEMA_SLICE_DESCRIPTOR),
+        ('sla_template', SCHEMA_SLA_DESCRIPTOR),
+        ('policyRules', SCHEMA_RP_DESCRIPTOR)
+    )
+
     def __init__(self, workspace, preload=False):
         # Assign parameters
         coloredlogs.install(level=workspace.log_level)
@@ -65,13 +118,52 @@ class SchemaValidator(object):
 
         # Keep a library of loaded schemas to avoid re-loading
         self._schemas_library = dict()
+        # guards the library, which the background refresh may update
+        # while validations read it
+        self._library_lock = threading.RLock()
+
+        # Keep the compiled (metaschema checked) validator of each schema,
+        # together with the schema object it was built from
+        self._validators = dict()
+        # content hash of the local schema files loaded in the library
+        self._schemas_digest = dict()
+        self._validators_hits = 0
+        self._validators_misses = 0
+
+        self._descriptor_type_stats = {'classified': 0, 'fallbacks': 0}
+
+        # policy to obtain remote schemas: never (offline) or only when
+        # the local ones are older than the TTL (hours)
+        self._offline = False
+        self._schema_ttl = None
+        self._refresh_thread = None
+        # creation time of the bundle each bundled schema comes from
+        self._bundled = dict()
 
         self._error_msg = ''
+        self._errors = []
+        self._errors_truncated = False
 
         # if preload, load local cached schema files
         if preload:
             self.preload_local_schemas()
 
+    def configure(self, offline=None, ttl=None, bundle=None):
+        """
+        Configure how schemas are obtained.
+        :param offline: never fetch schemas from remote locations
+        :param ttl: number of hours during which stored schemas are used
+                    without refreshing them. Older schemas are still used
+                    while they are refreshed in the background
+        :param bundle: schema bundle file to load the schemas from
+        """
+        if offline is not None:
+            self._offline = offline
+        if ttl is not None:
+            self._schema_ttl = ttl
+        if bundle:
+            self.load_schema_bundle(bundle)
+
     def config_schema_locations(self):
         self._schemas = {
             self.SCHEMA_PACKAGE_DESCRIPTOR: {
@@ -125,8 +217,37 @@ class SchemaValidator(object):
     @error_msg.setter
     def error_msg(self, value):
         self._error_msg = value
+
+    @property
+    def errors(self):
+        """
+        Schema errors, as (JSON path, message) pairs, collected by the
+        last validation performed with 'max_errors'.
+        """
+        return self._errors
+
+    @property
+    def errors_truncated(self):
+        """
+        True if the last validation found more errors than collected.
+        """
+        return self._errors_truncated
+
     def schemas(self, descriptor_type):
         return self._schemas[descriptor_type]
+
+    @property
+    def validators_cache_info(self):
+        """
+        Statistics of the compiled validators cache.
+
+        :return: dictionary with the number of hits, misses and
+                 currently cached validators
+        """
+        return {'hits': self._validators_hits,
+                'misses': self._validators_misses,
+                'size': len(self._validators)}
+
     def get_remote_schema(self, descriptor):
         """
         Obtains current remote schema URL for a
@@ -154,20 +275,12 @@ class SchemaValidator(object):
         When this is invoked upon object creation, the local schema cache files
         should be erased when remote object reloading is necessary.
         """
-        schemas = [self.SCHEMA_PACKAGE_DESCRIPTOR,
-                   self.SCHEMA_SERVICE_DESCRIPTOR,
-                   self.SCHEMA_FUNCTION_DESCRIPTOR,
-                   self.SCHEMA_TEST_DESCRIPTOR,
-                   self.SCHEMA_SLICE_DESCRIPTOR,
-                   self.SCHEMA_SLA_DESCRIPTOR,
-                   self.SCHEMA_RP_DESCRIPTOR]
-
-        for schema in schemas:
+        for schema in self.SCHEMA_TEMPLATES:
             schema_file = self._schemas[schema]['local']
             if not os.path.isfile(schema_file):
                 continue
             try:
-                self._schemas_library[schema] = load_local_schema(schema_file)
+                self._load_local_schema(schema)
 
             except FileNotFoundError:
                 continue
@@ -188,7 +301,8 @@ class SchemaValidator(object):
         elif type == self.SCHEMA_FUNCTION_DESCRIPTOR:
             sch[self.SCHEMA_FUNCTION_DESCRIPTOR] = self._schemas[self.SCHEMA_FUNCTION_DESCRIPTOR]
         elif type == self.SCHEMA_TEST_DESCRIPTOR:
-            sch[self.SCHEMA_TEST_DESCRIPTOR] = self.schemas[self.SCHEMA_TEST_DESCRIPTOR]
+            sch[self.SCHEMA_TEST_DESCRIPTOR] = \
+                self._schemas[self.SCHEMA_TEST_DESCRIPTOR]
         elif type == self.SCHEMA_SLICE_DESCRIPTOR:
             sch[self.SCHEMA_SLICE_DESCRIPTOR] = self._schemas[self.SCHEMA_SLICE_DESCRIPTOR]
         elif type == self.SCHEMA_SLA_DESCRIPTOR:
@@ -207,26 +321,152 @@ class SchemaValidator(object):
         else:
             LOG.info("Schema directory '{}' found. We do not need to create it."
                   .format(self._schemas_local_master))
-        for schema_type, paths in sch.items():
-            schema_addr = paths['remote']
+        self._refresh_by_policy(list(sch))
+
+    def schema_age(self, schema_id):
+        """
+        Obtains the time elapsed since a stored schema was fetched.
+        :param schema_id: the schema template id
+        :return: age in seconds or None if the schema is not stored
+        """
+        paths = self._schemas[schema_id]
+        if os.path.isfile(paths['local']):
+            meta = read_remote_metadata(self._schemas_local_master)
+            fetched = meta.get(paths['remote'], {}).get('fetched') or \
+                os.path.getmtime(paths['local'])
+        else:
+            fetched = self._bundled.get(schema_id)
+            if fetched is None:
+                return
+        return max(0, time.time() - fetched)
+
+    def _refresh_by_policy(self, schema_ids):
+        """
+        Refreshes schemas according to the configured policy. Only the
+        schemas not stored at all are fetched synchronously, stale ones
+        are refreshed in the background. Without TTL, the schemas loaded
+        from a bundle are not refreshed.
+        :return: list of the schema ids refreshed synchronously
+        """
+        if self._offline:
+            LOG.debug("Offline mode, using the stored schemas")
+            return []
+        if self._schema_ttl is None:
+            # the schemas of a bundle are used as is, like in offline mode
+            return self.refresh_schemas([schema_id for schema_id in schema_ids
+                                         if schema_id not in self._bundled])
+
+        missing = []
+        stale = []
+        for schema_id in schema_ids:
+            age = self.schema_age(schema_id)
+            if age is None:
+                missing.append(schema_id)
+            elif age > self._schema_ttl * 3600:
+                stale.append(schema_id)
+        if stale:
+            LOG.debug("Refreshing stale schemas {} in the background"
+                      .format(stale))
+            self.refresh_schemas_background(stale)
+        return self.refresh_schemas(missing)
+
+    def refresh_schemas_background(self, schema_ids):
+        """
+        Refreshes schemas in a background thread, the stored schemas
+        are used in the meantime.
+        :param schema_ids: list of schema template ids
+        :return: the refresh thread
+        """
+        if self._refresh_thread and self._refresh_thread.is_alive():
+            return self._refresh_thread
+        self._refresh_thread = threading.Thread(target=self.refresh_schemas,
+                                                args=(list(schema_ids),),
+                                                daemon=True)
+        self._refresh_thread.start()
+        return self._refresh_thread
+
+    def refresh_schemas(self, schema_ids):
+        """
+        Refreshes schemas from their remote locations, fetching them
+        concurrently. Conditional requests, based on the ETag and
+        Last-Modified of the stored schemas, avoid downloading and
+        rewriting the unchanged ones. The stored schema is kept when
+        the remote one can't be obtained.
+
+        :param schema_ids: list of schema template ids
+        :return: list of the schema ids refreshed (updated or unchanged)
+        """
+        remote_ids = []
+        for schema_id in schema_ids:
+            schema_addr = self._schemas[schema_id]['remote']
             if validators.url(schema_addr):
-                try:
-                    LOG.debug("Loading schema '{}' from remote location '{}'"
-                              .format(schema_type, schema_addr))
-                    self._schemas_library[schema_type] = \
-                        load_remote_schema(schema_addr)
-                    # Update the corresponding local schema file
-                    write_local_schema(self._schemas_local_master,
-                                       self._schemas[schema_type]['local'],
-                                       self._schemas_library[schema_type])
-                except RequestException as e:
-                    LOG.debug("Could not load schema '{}' from remote "
-                                "location '{}', error: {}"
-                                .format(schema_type, schema_addr, e))
-                    LOG.info("There has had a problem in the connection and is not possible reload the schema."
-                          " It will be used the stored schema in {}".format(self._schemas[schema_type]['local']))
+                remote_ids.append(schema_id)
             else:
-                LOG.warning("Invalid schema URL '{}' it will be used the stored schema".format(schema_addr))
+                LOG.warning("Invalid schema URL '{}' it will be used the "
+                            "stored schema".format(schema_addr))
+        if not remote_ids:
+            return []
+
+        metadata = read_remote_metadata(self._schemas_local_master)
+        with ThreadPoolExecutor(max_workers=len(remote_ids)) as executor:
+            fetches = list(executor.map(
+                lambda schema_id: self._fetch_schema(schema_id, metadata),
+                remote_ids))
+
+        refreshed = []
+        updates = dict()
+        for schema_id, (schema, meta, error) in zip(remote_ids, fetches):
+            paths = self._schemas[schema_id]
+            if error:
+                LOG.debug("Could not load schema '{}' from remote "
+                          "location '{}', error: {}"
+                          .format(schema_id, paths['remote'], error))
+                LOG.info("There has had a problem in the connection and is "
+                         "not possible reload the schema. It will be used "
+                         "the stored schema in {}".format(paths['local']))
+                continue
+
+            if schema is None:
+                LOG.debug("Schema '{}' not modified in remote location '{}'"
+                          .format(schema_id, paths['remote']))
+                if schema_id not in self._schemas_library:
+                    try:
+                        self._load_local_schema(schema_id)
+                    except FileNotFoundError:
+                        continue
+            else:
+                with self._library_lock:
+                    self._store_schema(schema_id, schema)
+                    self._bundled.pop(schema_id, None)
+                # Update the corresponding local schema file
+                write_local_schema(self._schemas_local_master,
+                                   paths['local'], schema)
+            updates[paths['remote']] = meta
+            refreshed.append(schema_id)
+
+        update_remote_metadata(self._schemas_local_master, updates)
+        return refreshed
+
+    def _fetch_schema(self, schema_id, metadata):
+        """
+        Fetches a remote schema, conditionally if it is stored locally.
+        :return: tuple (schema or None if not modified, remote metadata,
+                 error)
+        """
+        paths = self._schemas[schema_id]
+        meta = dict()
+        if os.path.isfile(paths['local']):
+            meta = metadata.get(paths['remote'], meta)
+        LOG.debug("Loading schema '{}' from remote location '{}'"
+                  .format(schema_id, paths['remote']))
+        try:
+            schema, meta = fetch_remote_schema(paths['remote'],
+                                               etag=meta.get('etag'),
+                                               last_modified=meta.get(
+                                                   'last_modified'))
+            return schema, meta, None
+        except RequestException as e:
+            return None, None, e
 
     def load_schema(self, template, reload=False):
         """
@@ -248,28 +488,8 @@ class SchemaValidator(object):
             return self._schemas_library[template]
 
         # Load Online Schema
-        schema_addr = self._schemas[template]['remote']
-        if validators.url(schema_addr):
-            try:
-                LOG.debug("Loading schema '{}' from remote location '{}'"
-                          .format(template, schema_addr))
-
-                # Load schema from remote source
-                self._schemas_library[template] = \
-                    load_remote_schema(schema_addr)
-                # Update the corresponding local schema file
-                write_local_schema(self._schemas_local_master,
-                                   self._schemas[template]['local'],
-                                   self._schemas_library[template])
-
-                return self._schemas_library[template]
-
-            except RequestException as e:
-                LOG.warning("Could not load schema '{}' from remote "
-                            "location '{}', error: {}"
-                            .format(template, schema_addr, e))
-        else:
-            LOG.warning("Invalid schema URL '{}'".format(schema_addr))
+        if template in self._refresh_by_policy([template]):
+            return self._schemas_library[template]
 
         # Load Offline Schema
         schema_addr = self._schemas[template]['local']
@@ -278,8 +498,7 @@ class SchemaValidator(object):
                 LOG.debug("Loading schema '{}' from local file '{}'"
                           .format(template, schema_addr))
 
-                self._schemas_library[template] = \
-                    load_local_schema(schema_addr)
+                self._load_local_schema(template)
 
                 return self._schemas_library[template]
 
@@ -292,17 +511,173 @@ class SchemaValidator(object):
 
         LOG.error("Failed to load schema '{}'".format(template))
 
-    def validate(self, descriptor, schema_id):
+    def _store_schema(self, schema_id, schema, digest=None):
+        """
+        Stores a schema in the library, dropping the compiled
+        validator of the schema it replaces.
+        """
+        with self._library_lock:
+            self._schemas_library[schema_id] = schema
+            self._schemas_digest[schema_id] = digest
+            self._validators.pop(schema_id, None)
+
+    def export_schemas(self):
+        """
+        Provides the schemas of the library, e.g. to share them with the
+        schema validators of other processes.
+        :return: dictionary of (schema, digest) tuples by schema id
+        """
+        with self._library_lock:
+            return {schema_id: (schema, self._schemas_digest.get(schema_id))
+                    for schema_id, schema in self._schemas_library.items()}
+
+    def import_schemas(self, schemas):
+        """
+        Stores schemas provided by 'export_schemas' in the library.
+        :param schemas: dictionary of (schema, digest) tuples by schema id
+        """
+        for schema_id, (schema, digest) in schemas.items():
+            self._store_schema(schema_id, schema, digest)
+
+    def _load_local_schema(self, schema_id):
+        """
+        Loads the local file of a schema into the library, through the
+        parsed schemas cache of the schemas directory.
+        """
+        cache = get_schema_cache(self._schemas_local_master)
+        digest, schema = cache.load(self._schemas[schema_id]['local'])
+        self._store_schema(schema_id, schema, digest)
+
+    def get_validator(self, schema_id):
+        """
+        Obtains the compiled validator for a schema template. The
+        validator is built (and the schema checked against its metaschema)
+        only once, until the schema is reloaded.
+
+        :param schema_id: the schema template id
+        :return: the validator instance or None if the schema is not available
+        """
+        schema = self.load_schema(schema_id)
+        if not schema:
+            return
+        with self._library_lock:
+            cached = self._validators.get(schema_id)
+            if cached and cached[0] is schema:
+                self._validators_hits += 1
+                return cached[1]
+            self._validators_misses += 1
+            # the digest and origin of the loaded schema, unless it has
+            # been replaced in the meantime
+            current = self._schemas_library.get(schema_id) is schema
+            digest = self._schemas_digest.get(schema_id) if current else None
+            bundled = schema_id in self._bundled
+
+        cls = validator_for(schema)
+        # schema files already checked against their metaschema are
+        # remembered by the schemas cache
+        cache = get_schema_cache(self._schemas_local_master)
+        if not digest or not cache.is_checked(digest, bundled):
+            cls.check_schema(schema)
+            if digest:
+                cache.mark_checked(digest, bundled)
+        validator = cls(schema)
+        with self._library_lock:
+            if self._schemas_library.get(schema_id) is schema:
+                self._validators[schema_id] = (schema, validator)
+        return validator
+
+    def write_schema_bundle(self, filename):
+        """
+        Writes all the schemas to a single bundle file, along with their
+        version metadata. A bundle can be loaded with one read and
+        without any network access, e.g. in air-gapped environments.
+        :param filename: the bundle file
+        :return: list of the bundled schema ids
+        """
+        metadata = read_remote_metadata(self._schemas_local_master)
+        schemas = dict()
+        for schema_id in self.SCHEMA_TEMPLATES:
+            schema = self.load_schema(schema_id)
+            if not schema:
+                LOG.warning("Schema '{}' not available, it will not be "
+                            "included in the bundle".format(schema_id))
+                continue
+            remote = self._schemas[schema_id]['remote']
+            meta = metadata.get(remote, {})
+            schemas[schema_id] = {'remote': remote,
+                                  'version': schema.get('version'),
+                                  'etag': meta.get('etag'),
+                                  'last_modified': meta.get('last_modified'),
+                                  'schema': schema}
+        write_schema_bundle(filename, schemas)
+        return list(schemas)
+
+    def load_schema_bundle(self, filename):
+        """
+        Loads the schemas of a bundle file into the library. If the bundle
+        can't be read, the stored schemas are used instead.
+        :param filename: the bundle file
+        :return: list of the loaded schema ids
+        """
+        try:
+            bundle = read_schema_bundle(filename)
+            created = float(bundle['created'])
+            entries = [(schema_id, entry['schema'], entry['digest'])
+                       for schema_id, entry in bundle['schemas'].items()]
+        except (OSError, ValueError, KeyError, TypeError,
+                AttributeError) as e:
+            LOG.error("Could not load schema bundle '{}': {}. The stored "
+                      "schemas will be used".format(filename, e))
+            return []
+        loaded = []
+        for schema_id, schema, digest in entries:
+            if schema_id not in self._schemas:
+                LOG.warning("Ignoring unknown schema '{}' of bundle '{}'"
+                            .format(schema_id, filename))
+                continue
+            with self._library_lock:
+                self._store_schema(schema_id, schema, digest)
+                self._bundled[schema_id] = created
+            loaded.append(schema_id)
+        LOG.debug("Loaded schemas {} from bundle '{}'"
+                  .format(loaded, filename))
+        return loaded
+
+    def iter_errors(self, descriptor, schema_id):
+        """
+        Lazily iterates over all the schema errors of a descriptor.
+
+        :param descriptor: the descriptor content as a dictionary
+        :param schema_id: the schema template id
+        :return: generator of (JSON path, message) tuples
+        """
+        validator = self.get_validator(schema_id)
+        if not validator:
+            return
+        for error in validator.iter_errors(descriptor):
+            yield json_path(error.absolute_path), error.message
+
+    def validate(self, descriptor, schema_id, max_errors=None):
         """
         Validate a descriptor against a schema template
         :param descriptor:
         :param schema_id:
+        :param max_errors: if set, collect up to this number of errors
+                           in 'errors' instead of reporting only one
         :return:
         """
+        self._errors = []
+        self._errors_truncated = False
         try:
-            schema = self.load_schema(schema_id)
-            if schema:
-                jsonschema.validate(descriptor, schema)
+            validator = self.get_validator(schema_id)
+            if validator:
+                if max_errors:
+                    error = self._collect_errors(validator, descriptor,
+                                                 max_errors)
+                else:
+                    error = best_match(validator.iter_errors(descriptor))
+                if error is not None:
+                    raise error
                 return True
             else:
                 exit(0)
@@ -320,31 +695,80 @@ class SchemaValidator(object):
             LOG.debug(e)
             return
 
+    def _collect_errors(self, validator, descriptor, max_errors):
+        """
+        Collects at most 'max_errors' schema errors of a descriptor,
+        without evaluating the remaining ones.
+
+        :return: the first error found or None if the descriptor is valid
+        """
+        errors = validator.iter_errors(descriptor)
+        first = None
+        for error in islice(errors, max_errors):
+            if first is None:
+                first = error
+            self._errors.append((json_path(error.absolute_path),
+                                 error.message))
+        self._errors_truncated = next(errors, None) is not None
+        return first
+
+    def classify_descriptor(self, descriptor):
+        """
+        Guesses the type of a descriptor from cheap structural
+        fingerprints: the schema file referenced by 'descriptor_schema'
+        or the top-level keys that only one type of descriptor carries.
+
+        :param descriptor: the descriptor content as a dictionary
+        :return: the schema template id or None if undecidable
+        """
+        if not isinstance(descriptor, dict):
+            return
+
+        schema_ref = descriptor.get('descriptor_schema')
+        if isinstance(schema_ref, str):
+            schema_file = schema_ref.rstrip('/').rsplit('/', 1)[-1]
+            if schema_file in self.SCHEMA_FILE_FINGERPRINTS:
+                return self.SCHEMA_FILE_FINGERPRINTS[schema_file]
+
+        candidates = {schema_id for key, schema_id
+                      in self.SCHEMA_KEY_FINGERPRINTS if key in descriptor}
+        if len(candidates) == 1:
+            return candidates.pop()
+
+    @property
+    def descriptor_type_info(self):
+        """
+        Statistics of get_descriptor_type: number of descriptors
+        resolved by the fingerprint classifier and number of fallbacks
+        to trial-and-error validation against every schema.
+        """
+        return dict(self._descriptor_type_stats)
+
     def get_descriptor_type(self, descriptor):
         """
         This function obtains the type of a descriptor.
-        Its methodology is based on trial-error, since it
-        attempts to validate the descriptor against the
-        available schema templates until a success is achieved
-        """
-        # Gather schema templates ids
-        templates = {self.SCHEMA_PACKAGE_DESCRIPTOR,
-                     self.SCHEMA_SERVICE_DESCRIPTOR,
-                     self.SCHEMA_FUNCTION_DESCRIPTOR,
-                     self.SCHEMA_TEST_DESCRIPTOR,
-                     self.SCHEMA_SLICE_DESCRIPTOR,
-                     self.SCHEMA_SLA_DESCRIPTOR,
-                     self.SCHEMA_RP_DESCRIPTOR}
+        The type is guessed from structural fingerprints and confirmed
+        with a single schema validation. Only when the fingerprints are
+        missing or ambiguous it falls back to trial-error, attempting to
+        validate the descriptor against the available schema templates
+        until a success is achieved
+        """
+        schema_id = self.classify_descriptor(descriptor)
+        if schema_id:
+            self._descriptor_type_stats['classified'] += 1
+            templates = (schema_id,)
+        else:
+            self._descriptor_type_stats['fallbacks'] += 1
+            LOG.debug("Descriptor type not identified by its fingerprints,"
+                      " trying all schema templates")
+            templates = self.SCHEMA_TEMPLATES
 
         # Cycle through templates until a success validation is return
         for schema_id in templates:
             try:
-                jsonschema.validate(descriptor, self.load_schema(schema_id))
-                return schema_id
-
-            except ValidationError:
-
-                continue
+                validator = self.get_validator(schema_id)
+                if validator and validator.is_valid(descriptor):
+                    return schema_id
 
             except SchemaError as error_detail:
                 LOG.error("Invalid Schema '{}'".format(schema_id))
@@ -352,6 +776,148 @@ class SchemaValidator(object):
                 return
 
 
+class SchemaCache(object):
+    """
+    Persistent cache of parsed schema files, stored (pickled) in the
+    schemas directory. Entries are keyed by the hash of the schema file
+    content, so a modified file is parsed again. It also keeps the hashes
+    of the schemas known to be valid against their metaschema.
+    """
+    CACHE_FILE = '.schemas-cache.pickle'
+    CACHE_VERSION = 1
+
+    def __init__(self, schemas_root):
+        self._schemas_root = schemas_root
+        self._cache_file = os.path.join(schemas_root, self.CACHE_FILE)
+        self._lock = threading.Lock()
+        self._entries = dict()
+        self._checked = set()
+        self._checked_bundled = set()
+        self._read()
+
+    def _read(self):
+        if not os.path.isfile(self._cache_file):
+            return
+        try:
+            with open(self._cache_file, 'rb') as cache_f:
+                cache = pickle.load(cache_f)
+            if cache.get('version') != self.CACHE_VERSION:
+                return
+            self._entries = cache['entries']
+            self._checked = cache['checked']
+        except Exception as e:
+            LOG.debug("Ignoring schemas cache file '{}': {}"
+                      .format(self._cache_file, e))
+
+    def _write(self):
+        if not os.path.isdir(self._schemas_root):
+            return
+        cache = {'version': self.CACHE_VERSION,
+                 'entries': self._entries,
+                 'checked': self._checked}
+        tmp_file = '{}.{}.tmp'.format(self._cache_file, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as cache_f:
+                pickle.dump(cache, cache_f, pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_file, self._cache_file)
+        except OSError as e:
+            LOG.debug("Could not write schemas cache file '{}': {}"
+                      .format(self._cache_file, e))
+
+    def _key(self, filename):
+        return os.path.relpath(filename, self._schemas_root)
+
+    def load(self, filename):
+        """
+        Loads a schema file, parsing it only if its content is not cached.
+
+        :param filename: the schema file
+        :return: tuple (content hash, schema as a dictionary)
+        """
+        if not os.path.isfile(filename):
+            LOG.warning("Schema file '{}' does not exist.".format(filename))
+            raise FileNotFoundError
+        with open(filename, 'rb') as schema_f:
+            data = schema_f.read()
+        digest = hashlib.sha1(data).hexdigest()
+        key = self._key(filename)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] == digest:
+                return entry
+
+        schema = yaml.load(data, Loader=YAML_LOADER)
+        assert isinstance(schema, dict), "Failed to load schema file '{}'. " \
+                                         "Not a dictionary.".format(filename)
+        with self._lock:
+            self._entries[key] = (digest, schema)
+            self._write()
+        return digest, schema
+
+    def invalidate(self, filename):
+        """
+        Drops the cached content of a schema file.
+        """
+        with self._lock:
+            if self._entries.pop(self._key(filename), None):
+                self._write()
+
+    def is_checked(self, digest, bundled=False):
+        if bundled:
+            return digest in self._checked_bundled
+        return digest in self._checked
+
+    def mark_checked(self, digest, bundled=False):
+        """
+        Remembers that a schema content is valid against its metaschema.
+        The checks of bundled schemas, whose contents are not cached, are
+        only remembered in memory.
+        """
+        with self._lock:
+            if bundled:
+                self._checked_bundled.add(digest)
+                return
+            # forget checks of schema contents no longer cached
+            checked = {entry[0] for entry in self._entries.values()}
+            checked = (self._checked & checked) | {digest}
+            if checked != self._checked:
+                self._checked = checked
+                self._write()
+
+
+_schema_caches = dict()
+_schema_caches_lock = threading.Lock()
+
+
+def get_schema_cache(schemas_root):
+    """
+    Obtains the (process-wide) parsed schemas cache of a schemas directory.
+    :param schemas_root: the schemas directory
+    :return: SchemaCache instance
+    """
+    schemas_root = os.path.abspath(schemas_root)
+    with _schema_caches_lock:
+        if schemas_root not in _schema_caches:
+            _schema_caches[schemas_root] = SchemaCache(schemas_root)
+        return _schema_caches[schemas_root]
+
+
+def json_path(path):
+    """
+    Builds the JSON path of a location inside a descriptor.
+    :param path: sequence of keys and indexes of the location
+    :return: the JSON path, e.g. '$.virtual_deployment_units[0].id'
+    """
+    jpath = '$'
+    for elem in path:
+        if isinstance(elem, int):
+            jpath += '[{}]'.format(elem)
+        else:
+            jpath += '.{}'.format(elem)
+    return jpath
+
+
 def write_local_schema(schemas_root, filename, schema):
     """
     Writes a schema to a local file.
@@ -377,9 +943,15 @@ def write_local_schema(schemas_root, filename, schema):
             if exc.errno != errno.EEXIST:
                 raise
 
-    schema_f = open(filename, 'w')
-    yaml.dump(schema, schema_f)
-    schema_f.close()
+    # write to a temporary file first, the schema may be refreshed in the
+    # background while others read it
+    tmp_file = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(tmp_file, 'w') as schema_f:
+        yaml.dump(schema, schema_f)
+    os.replace(tmp_file, filename)
+
+    # the cached parsed content of the file is no longer valid
+    get_schema_cache(schemas_root).invalidate(filename)
 
 
 def load_local_schema(filename):
@@ -396,7 +968,7 @@ def load_local_schema(filename):
         raise FileNotFoundError
         return
     schema_f = open(filename, 'r')
-    schema = yaml.load(schema_f, Loader=yaml.SafeLoader)
+    schema = yaml.load(schema_f, Loader=YAML_LOADER)
     if schema_f != None:
         schema_f.close()
     assert isinstance(schema, dict), "Failed to load schema file '{}'. " \
@@ -413,6 +985,197 @@ def load_remote_schema(template_url):
     response = requests.get(template_url)
     response.raise_for_status()
     tf = response.text
-    schema = yaml.load(tf, Loader=yaml.SafeLoader)
+    schema = yaml.load(tf, Loader=YAML_LOADER)
     assert isinstance(schema, dict)
     return schema
+
+
+# Timeout (seconds) of the requests for remote schemas
+REMOTE_SCHEMA_TIMEOUT = 30
+
+# File, inside the schemas directory, with the ETag/Last-Modified
+# metadata of the schemas fetched from remote locations
+REMOTE_METADATA_FILE = '.remote-schemas.yml'
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def get_session():
+    """
+    Obtains the HTTP session shared by all remote schema requests, which
+    keeps a pool of connections to the schema servers.
+    """
+    global _session
+    with _session_lock:
+        if _session is None:
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=8)
+            _session = requests.Session()
+            _session.mount('http://', adapter)
+            _session.mount('https://', adapter)
+        return _session
+
+
+def fetch_remote_schema(template_url, etag=None, last_modified=None):
+    """
+    Retrieve a remote schema from the provided URL, unless it wasn't
+    modified since the given ETag or Last-Modified date.
+    :param template_url: The URL of the required schema
+    :param etag: ETag of the stored schema
+    :param last_modified: Last-Modified date of the stored schema
+    :return: tuple (schema as a dictionary or None if not modified,
+             metadata of the remote schema)
+    """
+    headers = dict()
+    if etag:
+        headers['If-None-Match'] = etag
+    if last_modified:
+        headers['If-Modified-Since'] = last_modified
+    response = get_session().get(template_url, headers=headers,
+                                 timeout=REMOTE_SCHEMA_TIMEOUT)
+    meta = {'etag': etag,
+            'last_modified': last_modified,
+            'fetched': time.time()}
+    if response.status_code == requests.codes.not_modified:
+        return None, meta
+    response.raise_for_status()
+    schema = yaml.load(response.text, Loader=YAML_LOADER)
+    assert isinstance(schema, dict)
+    meta['etag'] = response.headers.get('ETag')
+    meta['last_modified'] = response.headers.get('Last-Modified')
+    return schema, meta
+
+
+def read_remote_metadata(schemas_root):
+    """
+    Reads the metadata of the schemas fetched from remote locations.
+    :param schemas_root: The location of schema descriptors
+    :return: dictionary of metadata by schema URL
+    """
+    filename = os.path.join(schemas_root, REMOTE_METADATA_FILE)
+    if not os.path.isfile(filename):
+        return dict()
+    try:
+        with open(filename, 'r') as meta_f:
+            metadata = yaml.load(meta_f, Loader=YAML_LOADER)
+    except yaml.YAMLError as e:
+        LOG.debug("Ignoring remote schemas metadata '{}': {}"
+                  .format(filename, e))
+        return dict()
+    return metadata if isinstance(metadata, dict) else dict()
+
+
+def write_remote_metadata(schemas_root, metadata):
+    """
+    Writes the metadata of the schemas fetched from remote locations. The
+    file is replaced at once, so that readers never see a partial file.
+    Concurrent writers should use 'update_remote_metadata' instead.
+    :param schemas_root: The location of schema descriptors
+    :param metadata: dictionary of metadata by schema URL
+    """
+    if not os.path.isdir(schemas_root):
+        return
+    filename = os.path.join(schemas_root, REMOTE_METADATA_FILE)
+    tmp_file = '{}.{}.{}.tmp'.format(filename, os.getpid(),
+                                     threading.get_ident())
+    with open(tmp_file, 'w') as meta_f:
+        yaml.dump(metadata, meta_f, default_flow_style=False)
+    os.replace(tmp_file, filename)
+
+
+_metadata_lock = threading.Lock()
+
+
+@contextlib.contextmanager
+def remote_metadata_lock(schemas_root):
+    """
+    Holds the lock of the remote schemas metadata, between the threads of
+    this process and, with a lock file, between the processes sharing the
+    schemas directory (e.g. the workers of the service).
+    :param schemas_root: The location of schema descriptors
+    """
+    with _metadata_lock:
+        if fcntl is None or not os.path.isdir(schemas_root):
+            yield
+            return
+        lock_file = os.path.join(schemas_root, REMOTE_METADATA_FILE + '.lock')
+        with open(lock_file, 'a') as lock_f:
+            fcntl.flock(lock_f, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(lock_f, fcntl.LOCK_UN)
+
+
+def update_remote_metadata(schemas_root, updates):
+    """
+    Updates the metadata of some schemas fetched from remote locations,
+    keeping the entries written meanwhile by other refreshes.
+    :param schemas_root: The location of schema descriptors
+    :param updates: dictionary of metadata by schema URL
+    """
+    if not updates:
+        return
+    with remote_metadata_lock(schemas_root):
+        metadata = read_remote_metadata(schemas_root)
+        metadata.update(updates)
+        write_remote_metadata(schemas_root, metadata)
+
+
+# Format identifier and version of schema bundle files
+SCHEMA_BUNDLE_FORMAT = 'tng-schema-bundle'
+SCHEMA_BUNDLE_VERSION = 1
+
+_bundles = dict()
+_bundles_lock = threading.Lock()
+
+
+def write_schema_bundle(filename, schemas):
+    """
+    Writes a schema bundle file (JSON).
+    :param filename: the bundle file
+    :param schemas: dictionary of bundle entries (schema and metadata)
+                    by schema id
+    """
+    for entry in schemas.values():
+        entry['digest'] = hashlib.sha1(json.dumps(
+            entry['schema'], sort_keys=True).encode()).hexdigest()
+    bundle = {'format': SCHEMA_BUNDLE_FORMAT,
+              'bundle_version': SCHEMA_BUNDLE_VERSION,
+              'created': time.time(),
+              'schemas': schemas}
+    dirname = os.path.dirname(filename)
+    if dirname:
+        os.makedirs(dirname, exist_ok=True)
+    tmp_file = '{}.{}.tmp'.format(filename, os.getpid())
+    with open(tmp_file, 'w') as bundle_f:
+        json.dump(bundle, bundle_f)
+    os.replace(tmp_file, filename)
+
+
+def read_schema_bundle(filename):
+    """
+    Reads a schema bundle file. Bundles are kept in memory, so reading
+    an unchanged bundle again is free.
+    :param filename: the bundle file
+    :return: the bundle as a dictionary
+    """
+    stat = os.stat(filename)
+    key = (os.path.abspath(filename), stat.st_mtime_ns, stat.st_size)
+    with _bundles_lock:
+        if key in _bundles:
+            return _bundles[key]
+
+    with open(filename, 'r') as bundle_f:
+        bundle = json.load(bundle_f)
+    if not isinstance(bundle, dict) or \
+            bundle.get('format') != SCHEMA_BUNDLE_FORMAT:
+        raise ValueError("'{}' is not a schema bundle".format(filename))
+    if bundle.get('bundle_version') != SCHEMA_BUNDLE_VERSION:
+        raise ValueError("Unsupported version '{}' of schema bundle '{}'"
+                         .format(bundle.get('bundle_version'), filename))
+    with _bundles_lock:
+        for old_key in [k for k in _bundles if k[0] == key[0]]:
+            del _bundles[old_key]
+        _bundles[key] = bundle
+    return bundle
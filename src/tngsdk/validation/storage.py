@@ -25,8 +25,10 @@
 # partner consortium (www.sonata-nfv.eu).
 
 import os
+import sys
 import logging
 import networkx as nx
+from networkx.readwrite import json_graph
 import validators
 import requests
 from collections import Counter
@@ -35,6 +37,7 @@ from collections import OrderedDict
 # from .event import *
 # import util
 from tngsdk.validation.util import descriptor_id, read_descriptor_file
+from tngsdk.validation.util import file_hash
 # from util import read_descriptor_file, descriptor_id
 from tngsdk.validation import event
 from tngsdk.validation.logger import TangoLogger
@@ -53,6 +56,8 @@ class DescriptorStorage(object):
         self._packages = {}
         self._services = {}
         self._functions = {}
+        # functions by hash of their descriptor file content
+        self._function_hashes = {}
         self._units = {}
         self._tests = {}
         self._slices = {}
@@ -157,19 +162,72 @@ class DescriptorStorage(object):
     def create_function(self, descriptor_file):
         """
         Create and store a function based on the provided descriptor filename.
-        If a function is already stored with the same id, it will return the
-        stored function.
+        If a function is already stored with the same descriptor content or
+        the same id, it will return the stored function, along with its
+        topology graphs and validation results. The first path wins: the
+        filename of the returned function is the one it was stored with,
+        which may differ from 'descriptor_file' (same content, other path).
         :param descriptor_file: function descriptor filename
-        :return: created function object or, if id exists, the stored function.
+        :return: created function object or, if content or id exists, the
+                 stored function.
         """
         if not os.path.isfile(descriptor_file):
             return
+        content_hash = file_hash(descriptor_file)
+        if content_hash in self._function_hashes:
+            return self._function_hashes[content_hash]
         new_function = Function(descriptor_file)
         if new_function.id in self._functions.keys():
             return self._functions[new_function.id]
         self._functions[new_function.id] = new_function
+        self._function_hashes[content_hash] = new_function
         return new_function
 
+    def find_function(self, descriptor_file):
+        """
+        Obtain the stored function with the same descriptor content as the
+        provided file, without loading it.
+        :param descriptor_file: function descriptor filename
+        :return: function object, None if not stored
+        """
+        if not os.path.isfile(descriptor_file):
+            return
+        return self._function_hashes.get(file_hash(descriptor_file))
+
+    def update_function(self, func):
+        """
+        Stores a function, e.g. a copy validated in another process, in
+        place of the stored function with the same descriptor content, also
+        in the associated services.
+        :param func: function object
+        :return: True if stored, False if a function with the same id but
+                 another content is stored
+        """
+        content_hash = file_hash(func.filename)
+        stored = self._functions.get(func.id)
+        if stored is not None and \
+                self._function_hashes.get(content_hash) is not stored:
+            return False
+        self._functions[func.id] = func
+        self._function_hashes[content_hash] = func
+        for service in self._services.values():
+            service.update_function(func)
+        return True
+
+    def merge(self, storage):
+        """
+        Stores the tests, slices, SLAs and runtime policies of another
+        storage, e.g. filled in another process, which are not stored yet.
+        :param storage: descriptor storage
+        """
+        for own, other in ((self._tests, storage._tests),
+                           (self._slices, storage._slices),
+                           (self._slas, storage._slas),
+                           (self._runtime_policies,
+                            storage._runtime_policies)):
+            for did, descriptor in other.items():
+                own.setdefault(did, descriptor)
+
     def test(self, tid):
         """
         Obtain the test for the provided test id
@@ -299,6 +357,9 @@ class DescriptorStorage(object):
         return new_runtime_policy
 
 class Node:
+    # nodes are created for every unit of every function, keep them compact
+    __slots__ = ('_id', '_connection_points', '_version')
+
     def __init__(self, nid):
         """
         Initialize a node object.
@@ -306,7 +367,10 @@ class Node:
         :param nid: node id
         """
         self._id = nid
-        self._connection_points = []
+        # ordered set of connection points (dict keys)
+        self._connection_points = {}
+        # incremented on every change of the node topology
+        self._version = 0
 
     @property
     def id(self):
@@ -319,21 +383,32 @@ class Node:
     @property
     def connection_points(self):
         """
-        Provides a list of interfaces associated with the node.
+        Provides the interfaces associated with the node, in the order they
+        were added.
         :return: interface list
         """
-        return self._connection_points
+        return list(self._connection_points)
 
     @connection_points.setter
     def connection_points(self, value):
-        self._connection_points = value
+        self._connection_points = dict.fromkeys(sys.intern(cp)
+                                                for cp in value)
+        self._version += 1
+
+    def has_connection_point(self, cp):
+        """
+        Indicates whether a connection point is associated with the node.
+        :param cp: connection point ID
+        :return: True if the connection point is associated
+        """
+        return cp in self._connection_points
 
     def add_connection_point(self, cp):
         """
         Associate a new interface to the node.
         :param cp: connection point ID
         """
-        if cp in self.connection_points:
+        if self.has_connection_point(cp):
             evtLOG.log("Duplicate connection point",
                        "The CP id='{0}' is already stored in node "
                        "id='{1}'".format(cp, self.id),
@@ -355,12 +430,15 @@ class Node:
         LOG.debug("Node id='{0}': adding connection point '{1}'"
                   .format(self.id, cp))
 
-        self._connection_points.append(cp)
+        self._connection_points[sys.intern(cp)] = None
+        self._version += 1
 
         return True
 
 
 class VLink:
+    __slots__ = ('_id', '_cpr_pair')
+
     def __init__(self, vl_id, cpr_u, cpr_v):
         """
         Initialize a vlink object.
@@ -370,7 +448,7 @@ class VLink:
         :param cpr_v: connection point reference v
         """
         self._id = vl_id
-        self._cpr_pair = [cpr_u, cpr_v]
+        self._cpr_pair = (sys.intern(cpr_u), sys.intern(cpr_v))
 
     def __repr__(self):
         return self.__str__()
@@ -386,8 +464,8 @@ class VLink:
     def connection_point_refs(self):
         """
         The two connection points references composing the vlink
-        in a list format [u, v]
-        :return: list (size 2) of connection point references
+        in a tuple format (u, v)
+        :return: tuple (size 2) of connection point references
         """
         return self._cpr_pair
 
@@ -407,6 +485,8 @@ class VLink:
 
 
 class VBridge:
+    __slots__ = ('_id', '_cp_refs')
+
     def __init__(self, vb_id, cp_refs):
         """
         Initialize a vbridge object.
@@ -416,7 +496,7 @@ class VBridge:
         assert cp_refs
 
         self._id = vb_id
-        self._cp_refs = cp_refs
+        self._cp_refs = tuple(sys.intern(cpr) for cpr in cp_refs)
 
     def __repr__(self):
         return self.__str__()
@@ -453,8 +533,13 @@ class Descriptor(Node):
         super().__init__(self.id)
         self._complete_graph = None
         self._graph = None
+        # topology graphs built so far, by build parameters
+        self._graph_cache = {}
+        self._graph_cache_version = None
         self._vlinks = {}
         self._vbridges = {}
+        # index of the connection point references of vlinks and vbridges
+        self._cp_ref_links = {}
 
     @property
     def id(self):
@@ -533,6 +618,69 @@ class Descriptor(Node):
             vbridge_cp_references += vb.connection_point_refs
         return vbridge_cp_references
 
+    def cp_ref_links(self, cpr):
+        """
+        Provides the ids of the vlinks and vbridges referencing a connection
+        point reference.
+        :param cpr: connection point reference
+        :return: tuple of link ids, in the order they were added
+        """
+        return self._cp_ref_links.get(cpr, ())
+
+    def is_vlink_cp_ref(self, cpr):
+        """
+        Indicates whether a connection point reference is used by a vlink.
+        """
+        return any(link_id in self._vlinks
+                   for link_id in self.cp_ref_links(cpr))
+
+    def is_vbridge_cp_ref(self, cpr):
+        """
+        Indicates whether a connection point reference is used by a vbridge.
+        """
+        return any(link_id in self._vbridges
+                   for link_id in self.cp_ref_links(cpr))
+
+    def is_cp_referenced(self, cpr):
+        """
+        Indicates whether a connection point reference is used by a vlink or
+        a vbridge.
+        """
+        return cpr in self._cp_ref_links
+
+    @property
+    def topology_version(self):
+        """
+        Changes whenever the connection points or the links of the
+        descriptor change.
+        """
+        return (self._version,)
+
+    def _cached_graph(self, key, build):
+        """
+        Provides a topology graph built with the given parameters, building
+        it only if the topology changed since it was last built. Cached
+        graphs are shared, hence they must not be modified.
+        :param key: tuple of build parameters
+        :param build: function building the graph
+        :return: topology graph (networkx.Graph)
+        """
+        version = self.topology_version
+        if self._graph_cache_version != version:
+            self._graph_cache = {}
+            self._graph_cache_version = version
+        graph = self._graph_cache.get(key)
+        if graph is None:
+            graph = build()
+            if graph is not None:
+                self._graph_cache[key] = graph
+        return graph
+
+    def _index_cp_refs(self, link_id, cp_refs):
+        for cpr in cp_refs:
+            self._cp_ref_links[cpr] = self.cp_ref_links(cpr) + (link_id,)
+        self._version += 1
+
     @property
     def graph(self):
         """
@@ -609,6 +757,7 @@ class Descriptor(Node):
                 return
 
         self._vbridges[vb_id] = VBridge(vb_id, cp_refs)
+        self._index_cp_refs(vb_id, self._vbridges[vb_id].cp_refs)
         return True
 
     def add_vlink(self, vl_id, cp_refs):
@@ -648,6 +797,7 @@ class Descriptor(Node):
                 return
 
         self._vlinks[vl_id] = VLink(vl_id, cp_refs[0], cp_refs[1])
+        self._index_cp_refs(vl_id, self._vlinks[vl_id].connection_point_refs)
         return True
 
     def load_virtual_links(self):
@@ -693,8 +843,7 @@ class Descriptor(Node):
         """
         unused_cps = []
         for cp in self.connection_points:
-            if cp not in self.vlink_cp_refs and \
-                    cp not in self.vbridge_cp_refs:
+            if not self.is_cp_referenced(cp):
                 unused_cps.append(cp)
         return unused_cps
 
@@ -804,6 +953,49 @@ class Service(Descriptor):
     def vnf_id_map(self):
         return self._vnf_id_map
 
+    def _complete_topology_graph(self):
+        return self.build_topology_graph(level=3, bridges=True,
+                                         vdu_inner_connections=False)
+
+    @property
+    def complete_graph(self):
+        """
+        GraphML lines of the complete topology graph of the service (level 3
+        with bridges, without VDU inner connections). It is only serialized
+        when requested, once the topology graph of the service was built.
+        :return: list of GraphML lines, None if not available
+        """
+        if self._complete_graph is not None or self._graph is None:
+            return self._complete_graph
+        try:
+            return self._cached_graph(
+                ('graphml', 'complete'),
+                lambda: list(nx.generate_graphml(
+                    self._complete_topology_graph(),
+                    encoding='utf-8', prettyprint=True)))
+        except nx.exception.NetworkXError:
+            LOG.warning("A problem creating the complete graph of service "
+                        "'{0}' appeared".format(self.id))
+
+    @property
+    def complete_graph_data(self):
+        """
+        Node-link representation of the complete topology graph of the
+        service (see 'complete_graph'), whose links refer to the nodes by
+        their index. It is much smaller than the GraphML representation.
+        :return: JSON serializable dict, None if not available
+        """
+        if self._graph is None:
+            return
+        return self._cached_graph(
+            ('node-link', 'complete'),
+            lambda: json_graph.node_link_data(
+                self._complete_topology_graph()))
+
+    @complete_graph.setter
+    def complete_graph(self, value):
+        self._complete_graph = value
+
     def mapped_function(self, vnf_id):
         """
         Provides the function associated with a 'vnf_id' defined in the
@@ -844,47 +1036,34 @@ class Service(Descriptor):
                 if len(cp_aux) >= 2:
                     loops[vb_id] = cp_aux
         return loops
-    def detect_isolated_vnfs(self):
+
+    def connection_point_usage(self):
+        """
+        Finds, in a single pass over the VNF connection points, the VNFs
+        not connected to any virtual link and the VNF connection points
+        not referenced by any virtual link.
+        :return: tuple (isolated vnf ids, unused 'vnf_id:cp' references)
+        """
         isolated_vnfs = []
-        for function_name, function_id in self.vnf_id_map.items():
-            vnfd_cps = self.functions[function_id].connection_points
+        unused_cps = []
+        for vnf_id, function_id in self.vnf_id_map.items():
             vnfd_is_isolated = True
-            for cp in vnfd_cps:
-                cp_extended = function_name +":"+cp
-                for vl_id, vl in self.vlinks.items():
-                    if cp_extended == vl.cpr_u or cp_extended == vl.cpr_v:
-                            vnfd_is_isolated = False
-                            break
-                if vnfd_is_isolated:
-                    for vb_id, vb in self.vbridges.items():
-                        if cp_extended in vb.cp_refs:
-                            vnfd_is_isolated = False
-                            break
+            for cp in self.functions[function_id].connection_points:
+                cpr = vnf_id + ":" + cp
+                if self.is_cp_referenced(cpr):
+                    vnfd_is_isolated = False
+                else:
+                    unused_cps.append(cpr)
             if vnfd_is_isolated:
-                isolated_vnfs.append(function_name)
-        return isolated_vnfs
+                isolated_vnfs.append(vnf_id)
+        return isolated_vnfs, unused_cps
+
+    def detect_isolated_vnfs(self):
+        return self.connection_point_usage()[0]
 
     def detect_unnused_cps(self):
-        #986812400
-        unnused_cps = []
-        for function_name, function_id in self.vnf_id_map.items():
-            for cp in self.functions[function_id].connection_points:
-                cp_extended = function_name+":"+cp
-                cp_is_used = False
-                for vl_id, vl in self.vlinks.items():
-                    if vl.cpr_u == cp_extended or vl.cpr_v == cp_extended:
-                        cp_is_used = True
-                        break
-                if not cp_is_used:
-                    for vb_id, vb in self._vbridges.items():
-                        if not cp_is_used:
-                            for cp in vb.cp_refs:
-                                if cp == cp_extended:
-                                    cp_is_used = True
-                                    break
-                if not cp_is_used:
-                    unnused_cps.append(cp_extended)
-        return unnused_cps
+        return self.connection_point_usage()[1]
+
     def vnf_id(self, func):
         """
         Provides the vnf id associated with the provided function.
@@ -917,10 +1096,46 @@ class Service(Descriptor):
 
         self._functions[func.id] = func
         self._vnf_id_map[vnf_id] = func.id
+        self._version += 1
+
+    def update_function(self, func):
+        """
+        Replaces the associated function with the same id.
+        :param func: function object
+        """
+        if func.id in self._functions:
+            self._functions[func.id] = func
+            self._version += 1
+
+    @property
+    def topology_version(self):
+        return (self._version,) + tuple(func.topology_version
+                                        for func in self._functions.values())
 
     def build_topology_graph(self, level=1, bridges=False,
                              vdu_inner_connections=True):
         """
+        Provides the network topology graph of the service, see
+        '_build_topology_graph'. The graph (and the graphs of the functions
+        it is built from) is only built once for each set of parameters
+        while the topology is unchanged, it must not be modified.
+        """
+        graph = self._cached_graph(
+            (level, bridges, vdu_inner_connections),
+            lambda: self._build_topology_graph(level, bridges,
+                                               vdu_inner_connections))
+        # as when built, leave the graph of each function it is based on
+        for fid, func in self.functions.items():
+            func.graph = func.build_topology_graph(
+                parent_id=self.id,
+                bridges=bridges,
+                level=0 if level <= 2 else 1,
+                vdu_inner_connections=vdu_inner_connections)
+        return graph
+
+    def _build_topology_graph(self, level=1, bridges=False,
+                              vdu_inner_connections=True):
+        """
         Build the network topology graph of the service.
         :param level: indicates the granulariy of the graph
                     0: service level (does not show VNF interfaces)
@@ -971,9 +1186,9 @@ class Service(Descriptor):
 
             node_attrs['label'] = s_cpr[1] if len(s_cpr) > 1 else cpr
 
-            if cpr in self.vlink_cp_refs:
+            if self.is_vlink_cp_ref(cpr):
                 node_attrs['type'] = 'iface'
-            elif cpr in self.vbridge_cp_refs:
+            elif self.is_vbridge_cp_ref(cpr):
                 node_attrs['type'] = 'br-iface'
 
             graph.add_node(cpr, attr_dict=node_attrs)
@@ -1028,7 +1243,7 @@ class Service(Descriptor):
             elif level == 3:
                 for node in func.graph.nodes():
                     s_node = node.split(':')
-                    if node in func.connection_points and len(s_node) > 1:
+                    if func.has_connection_point(node) and len(s_node) > 1:
                         prefix_map[node] = node
                     else:
                         prefix_map[node] = prefix + ':' + node
@@ -1100,43 +1315,57 @@ class Service(Descriptor):
 
         # inter-connect VNF interfaces
         if level == 1:
-            for node_u in graph.nodes():
-                node_u_tokens = node_u.split(':')
-
-                if len(node_u_tokens) > 1 and node_u_tokens[0] in prefixes:
-
-                    for node_v in graph.nodes():
-                        if node_u == node_v:
-                            continue
-                        node_v_tokens = node_v.split(':')
-                        if len(node_v_tokens) > 1 and \
-                                node_v_tokens[0] == node_u_tokens[0]:
-
-                            # verify if these interfaces are connected
-                            func = self.mapped_function(node_v_tokens[0])
-
-                            if func.graph.has_node(node_u_tokens[1]):
-                                node_u_c = node_u_tokens[1]
-                            elif func.graph.has_node(node_u):
-                                node_u_c = node_u
-                            else:
-                                continue
+            self._interconnect_function_ifaces(graph, prefixes,
+                                               def_link_attrs)
+        return graph
 
-                            if func.graph.has_node(node_v_tokens[1]):
-                                node_v_c = node_v_tokens[1]
-                            elif func.graph.has_node(node_v):
-                                node_v_c = node_v
-                            else:
-                                continue
+    def _interconnect_function_ifaces(self, graph, prefixes, link_attrs):
+        """
+        Connects each pair of interfaces of a VNF in the service graph
+        (level 1) that are connected inside the graph of the VNF. The
+        connectivity is given by the connected components of each function
+        graph, computed once. Edges are added in the same order as a
+        pairwise check over the nodes of the service graph would.
+        :param graph: service topology graph
+        :param prefixes: vnf ids of the functions in the graph
+        :param link_attrs: attributes of the added edges
+        """
+        nodes = graph.nodes()
+        components = {}
+        # interfaces of each VNF component, in the order of the graph nodes
+        members = {}
+        node_components = {}
+        for node in nodes:
+            node_tokens = node.split(':')
+            if len(node_tokens) < 2 or node_tokens[0] not in prefixes:
+                continue
+            func = self.mapped_function(node_tokens[0])
+            if node_tokens[0] not in components:
+                components[node_tokens[0]] = {
+                    f_node: idx for idx, component in
+                    enumerate(nx.connected_components(func.graph))
+                    for f_node in component}
+            f_components = components[node_tokens[0]]
+            if func.graph.has_node(node_tokens[1]):
+                node_c = node_tokens[1]
+            elif func.graph.has_node(node):
+                node_c = node
+            else:
+                continue
+            key = (node_tokens[0], f_components[node_c])
+            node_components[node] = key
+            members.setdefault(key, []).append(node)
 
-                            if nx.has_path(func.graph, node_u_c, node_v_c):
-                                link_attrs = def_link_attrs
-                                link_attrs['label'] = node_u + '-' + node_v
-                                link_attrs['level'] = 1
-                                link_attrs['type'] = 'iface'
-                                graph.add_edge(node_u, node_v,
-                                               attr_dict=link_attrs)
-        return graph
+        for node_u in nodes:
+            if node_u not in node_components:
+                continue
+            for node_v in members[node_components[node_u]]:
+                if node_u == node_v:
+                    continue
+                link_attrs['label'] = node_u + '-' + node_v
+                link_attrs['level'] = 1
+                link_attrs['type'] = 'iface'
+                graph.add_edge(node_u, node_v, attr_dict=link_attrs)
 
     def load_forwarding_graphs(self):
         """
@@ -1158,7 +1387,7 @@ class Service(Descriptor):
                     s_cpr = cpr.split(':')
                     pos = cp['position']
 
-                    if len(s_cpr) == 1 and cpr not in self.connection_points:
+                    if len(s_cpr) == 1 and not self.has_connection_point(cpr):
                         evtLOG.log("Undefined connection point",
                                    "Connection point '{0}' of forwarding path "
                                    "'{1}' is not defined"
@@ -1169,8 +1398,8 @@ class Service(Descriptor):
                     elif len(s_cpr) == 2:
                         # get corresponding function
                         func = self.mapped_function(s_cpr[0])
-                        if not func or (func and s_cpr[1]
-                                        not in func.connection_points):
+                        if not func or (func and not
+                                        func.has_connection_point(s_cpr[1])):
                             evtLOG.log("Undefined connection point",
                                        "Connection point '{0}' of forwarding "
                                        "path '{1}' is not defined"
@@ -1269,11 +1498,11 @@ class Service(Descriptor):
         undeclared_cps = []
         for cpr in target_cp_refs:
             cpr_split = cpr.split(':')
-            if len(cpr_split) == 1 and cpr not in self.connection_points:
+            if len(cpr_split) == 1 and not self.has_connection_point(cpr):
                 undeclared_cps.append(cpr)
             else:
                 f = self.mapped_function(cpr_split[0])
-                if f and cpr_split[1] not in f.connection_points:
+                if f and not f.has_connection_point(cpr_split[1]):
                     undeclared_cps.append(cpr)
 
         return undeclared_cps
@@ -1288,6 +1517,18 @@ class Function(Descriptor):
         """
         super().__init__(descriptor_file)
         self._units = {}
+        # results of the validations of the function, by validation options
+        self._validation_results = {}
+
+    @property
+    def validation_results(self):
+        """
+        Results of the validations already performed on the function, by
+        validation options.
+        :return: dictionary of tuples (validation result, events, custom
+                 rules errors)
+        """
+        return self._validation_results
 
     @property
     def units(self):
@@ -1306,7 +1547,7 @@ class Function(Descriptor):
             return
 
         if unit.id in self.units:
-            if isinstance(unit,VDU_unit):
+            if isinstance(unit, VDU_Unit):
                 LOG.error("The unit (VDU) id='{0}' is already associated with "
                           "function (VNF) id='{1}'".format(unit.id, self.id))
             else:
@@ -1315,6 +1556,7 @@ class Function(Descriptor):
             return
 
         self._units[unit.id] = unit
+        self._version += 1
         return True
 
     def load_units(self):
@@ -1440,21 +1682,16 @@ class Function(Descriptor):
                 else:
                     selfloops[vl_id].append([vl.cpr_u,vl.cpr_v])
         for vb_id, vb in self.vbridges.items():
-            for i in range(0,len(vb.connection_point_refs)):
-                if vb_id in selfloops.keys():
-                    continue
-                cp = vb.connection_point_refs[i].split(":")
-                id = cp[0]
-                for j in range(0,len(vb.connection_point_refs)):
-                    if i==j:
-                        continue
-                    cp_aux = vb.connection_point_refs[j].split(":")
-                    id_aux = cp_aux[0]
-                    if id==id_aux:
-                        if vb_id not in selfloops.keys():
-                            selfloops[vb_id]=[vb.connection_point_refs[i],vb.connection_point_refs[j]]
-                        else:
-                            selfloops[vb_id].append(vb.connection_point_refs[j])
+            # references grouped by unit, the loop is reported for the
+            # first reference whose unit is referenced again
+            unit_refs = {}
+            for cpr in vb.connection_point_refs:
+                unit_refs.setdefault(cpr.split(":")[0], []).append(cpr)
+            for cpr in vb.connection_point_refs:
+                refs = unit_refs[cpr.split(":")[0]]
+                if len(refs) > 1:
+                    selfloops[vb_id] = list(refs)
+                    break
         return selfloops
 
     def detect_disconnected_units(self):
@@ -1464,21 +1701,8 @@ class Function(Descriptor):
         """
         unused_units = []
         for unit_id, unit in self.units.items():
-            cp_used_unit = []
-            cp_used_unit = []
-            for cp in unit.connection_points:
-                cp_extended = unit_id+":"+cp
-                unit_is_isolated = True
-                for vl_id, vl in self.vlinks.items():
-                    if cp_extended in vl.connection_point_refs and cp not in cp_used_unit:
-                        cp_used_unit.append(cp)
-                        break
-                for vb_id, vb in self.vbridges.items():
-                    if cp_extended in vb.connection_point_refs and cp not in cp_used_unit:
-                        cp_used_unit.append(cp)
-                        break
-            if len(cp_used_unit)==0:
-
+            if not any(self.is_cp_referenced(unit_id + ":" + cp)
+                       for cp in unit.connection_points):
                 unused_units.append(unit_id)
         return unused_units
 
@@ -1508,24 +1732,32 @@ class Function(Descriptor):
         unnused_cps = []
         for unit_id, unit in self.units.items():
             for cp in unit.connection_points:
-                cp_is_used = False
-                cp_extended = unit_id+":"+cp
-                for vl_id, vl in self.vlinks.items():
-                    if cp_extended in vl.connection_point_refs:
-                        cp_is_used = True
-                        break
-                if not cp_is_used:
-                    for vb_id, vb in self.vbridges.items():
-                        if cp_extended in vb.cp_refs:
-                            cp_is_used = True
-                            break
-                if not cp_is_used:
-                    unnused_cps.append(cp_extended)
+                cpr = unit_id + ":" + cp
+                if not self.is_cp_referenced(cpr):
+                    unnused_cps.append(cpr)
         return unnused_cps
 
+    @property
+    def topology_version(self):
+        return (self._version,) + tuple(unit._version
+                                        for unit in self._units.values())
+
     def build_topology_graph(self, bridges=False, parent_id='', level=0,
                              vdu_inner_connections=True):
         """
+        Provides the network topology graph of the function, see
+        '_build_topology_graph'. The graph is only built once for each set
+        of parameters while the topology is unchanged, it must not be
+        modified.
+        """
+        return self._cached_graph(
+            (bridges, parent_id, level, vdu_inner_connections),
+            lambda: self._build_topology_graph(bridges, parent_id, level,
+                                               vdu_inner_connections))
+
+    def _build_topology_graph(self, bridges=False, parent_id='', level=0,
+                              vdu_inner_connections=True):
+        """
         Build the network topology graph of the function.
         :param bridges: indicates if bridges should be included in the graph
         :param parent_id: identify the parent service of this function
@@ -1567,9 +1799,9 @@ class Function(Descriptor):
                 node_attrs['node_label'] = self.content['name']
             node_attrs['label'] = s_cpr[1] if len(s_cpr) > 1 else cpr
 
-            if cpr in self.vlink_cp_refs:
+            if self.is_vlink_cp_ref(cpr):
                 node_attrs['type'] = 'iface'
-            elif cpr in self.vbridge_cp_refs:
+            elif self.is_vbridge_cp_ref(cpr):
                 node_attrs['type'] = 'br-iface'
             graph.add_node(cpr, attr_dict=node_attrs)
         for vl_id, vl in self.vlinks.items():
@@ -1579,12 +1811,14 @@ class Function(Descriptor):
             cpr_v = vl.cpr_v.split(':')
 
             if level == 0:
-                if vl.cpr_u not in self.connection_points and len(cpr_u) > 1:
+                if not self.has_connection_point(vl.cpr_u) and \
+                        len(cpr_u) > 1:
                     cpr_u = cpr_u[0]
                 else:
                     cpr_u = vl.cpr_u
 
-                if vl.cpr_v not in self.connection_points and len(cpr_v) > 1:
+                if not self.has_connection_point(vl.cpr_v) and \
+                        len(cpr_v) > 1:
                     cpr_v = cpr_v[0]
                 else:
                     cpr_v = vl.cpr_v
@@ -1620,8 +1854,8 @@ class Function(Descriptor):
                             if graph.has_edge(u_cp, v_cp):
                                 continue
                             if not bridges and (
-                                    u_cp in self.vbridge_cp_refs or
-                                    v_cp in self.vbridge_cp_refs):
+                                    self.is_vbridge_cp_ref(u_cp) or
+                                    self.is_vbridge_cp_ref(v_cp)):
                                 continue
                             edge_attrs['level'] = 2
                             edge_attrs['label'] = 'VDU_IN'
@@ -1659,18 +1893,20 @@ class Function(Descriptor):
         undeclared_cps = []
         for cpr in target_cp_refs:
             cpr_split = cpr.split(':')
-            if len(cpr_split) == 1 and cpr not in self.connection_points:
+            if len(cpr_split) == 1 and not self.has_connection_point(cpr):
                 undeclared_cps.append(cpr)
             elif len(cpr_split) == 2:
                 if not cpr_split[0] in self.units:
                     undeclared_cps.append(cpr)
                 else:
                     vdu = self.units[cpr_split[0]]
-                    if cpr_split[1] not in vdu.connection_points:
+                    if not vdu.has_connection_point(cpr_split[1]):
                         undeclared_cps.append(cpr)
         return undeclared_cps
 
 class Unit(Node):
+    __slots__ = ()
+
     def __init__(self, uid):
         """
         Initialize a unit object. This inherits the node object.
@@ -1679,6 +1915,8 @@ class Unit(Node):
         super().__init__(uid)
 
 class VDU_Unit(Unit):
+    __slots__ = ()
+
     def __init__(self, uid):
         """
         Initialize an vdu_unit object.
@@ -1687,6 +1925,8 @@ class VDU_Unit(Unit):
         super().__init__(uid)
 
 class CDU_Unit(Unit):
+    __slots__ = ('_ports', '_k8s_deployment', '_k8s_service', '_env')
+
     def __init__(self, uid):
         """
         Initialize an cdu_unit object.
@@ -44,6 +44,9 @@ from requests.exceptions import RequestException
 # from tngsdk.validation.rest import app, on_unpackaging_done,
 #                                    on_packaging_done
 from tngsdk.validation.rest import app
+from tngsdk.validation.rest import get_validation, set_validation
+from tngsdk.validation.rest import validators
+from tngsdk.validation.validator import Validator
 
 SAMPLES_DIR = os.path.join('src', 'tngsdk', 'validation', 'samples')
 
@@ -230,6 +233,45 @@ class TngSdkValidationRestTest(unittest.TestCase):
         self.assertEqual(d['result']['error_count'], 0)
         self.app.delete('/api/v1/validations')
         self.app.delete('/api/v1/resources')
+
+    def test_rest_validation_service_net_topology(self):
+        self.app.post('/api/v1/validations?sync=true&syntax=true&' +
+                      'integrity=true&topology=true&service=true' +
+                      '&path=' + SAMPLES_DIR +
+                      '/services/valid-son/valid.yml&dpath=' +
+                      SAMPLES_DIR +
+                      '/functions/valid-son/&dext=yml' +
+                      '&source=local')
+        validations = json.loads(
+            self.app.get('/api/v1/validations').data.decode('utf-8'))
+        url = '/api/v1/validations/{}/topology'.format(
+            list(validations.keys())[0])
+        # the topology is available as soon as the validation is reported
+        r = self.app.get(url)
+        self.assertEqual(r.status_code, 200)
+        topology = json.loads(r.data.decode('utf-8'))
+        self.assertTrue(topology['nodes'])
+        self.assertTrue(topology['links'])
+
+        r = self.app.get(url + '?format=graphml')
+        self.assertEqual(r.mimetype, 'application/graphml+xml')
+        self.assertIn('<graphml', r.data.decode('utf-8'))
+        self.assertEqual(r.data.decode('utf-8').count('<node '),
+                         len(topology['nodes']))
+        r = self.app.get(url,
+                         headers={'Accept': 'application/graphml+xml'})
+        self.assertIn('<graphml', r.data.decode('utf-8'))
+
+        # the topology is also reported with the validation, and kept when
+        # other validations are stored
+        vid = list(validations.keys())[0]
+        self.assertEqual(validations[vid]['net_topology'], topology)
+        set_validation('other', 'rid', 'path', 'function', True, False,
+                       False, False, 'hash')
+        self.assertEqual(get_validation(vid)['net_topology'], topology)
+        self.app.delete('/api/v1/validations')
+        self.app.delete('/api/v1/resources')
+        self.assertEqual(self.app.get(url).status_code, 404)
     """
     def test_rest_validation_service_topology_ko(self):
         r = self.app.post('/api/v1/validations?sync=true&syntax=true&' +
@@ -412,6 +454,21 @@ class TngSdkValidationRestTest(unittest.TestCase):
         validations_post_delete = self.app.get('/api/v1/validations')
         self.assertEqual(validations_post_delete.status_code, 404)
 
+    def test_rest_validation_error_releases_validator(self):
+        validators.clear()
+        with patch.object(Validator, 'validate_function',
+                          side_effect=RuntimeError('validation failure')):
+            with self.assertRaises(RuntimeError):
+                self.app.post('/api/v1/validations?sync=true&syntax=true&' +
+                              'function=true&path=' + SAMPLES_DIR +
+                              '/functions/' +
+                              'valid-syntax-tng/default-vnfd-tng.yml&' +
+                              'source=local')
+        # the validator is given back to the pool despite the failure
+        self.assertEqual(validators.size, 1)
+        self.app.delete('/api/v1/validations')
+        self.app.delete('/api/v1/resources')
+
 
 if __name__ == "__main__":
     unittest.main()
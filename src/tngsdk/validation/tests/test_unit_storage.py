@@ -0,0 +1,194 @@
+#  Copyright (c) 2015 SONATA-NFV, 5GTANGO, UBIWHERE, QUOBIS SL.
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, 5GTANGO, UBIWHERE, QUOBIS SL.
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+#
+# This work has also been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number 761493 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.5gtango.eu).
+
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+from tngsdk.validation import event
+from tngsdk.validation.storage import DescriptorStorage, Function
+
+
+VNFD = {
+    'vendor': 'eu.5gtango', 'name': 'vnf', 'version': '0.1',
+    'connection_points': [{'id': 'mgmt'}, {'id': 'input'}, {'id': 'unused'}],
+    'virtual_deployment_units': [
+        {'id': 'vdu01', 'vm_image': 'image',
+         'connection_points': [{'id': 'eth0'}, {'id': 'eth1'}]}],
+    'virtual_links': [
+        {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+         'connection_points_reference': ['vdu01:eth0', 'mgmt']},
+        {'id': 'input', 'connectivity_type': 'E-Line',
+         'connection_points_reference': ['input', 'vdu01:eth1']},
+        {'id': 'other', 'connectivity_type': 'E-Line',
+         'connection_points_reference': ['vdu01:eth1', 'undeclared']}]
+}
+
+
+class TngSdkValidationStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.evtLOG = event.get_logger('validator.events')
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def write_descriptor(self, name, content):
+        filename = os.path.join(self.tmp_dir, name)
+        with open(filename, 'w') as _f:
+            yaml.dump(content, _f)
+        return filename
+
+    def load_function(self, content):
+        func = Function(self.write_descriptor('vnfd.yml', content))
+        self.assertTrue(func.load_connection_points())
+        self.assertTrue(func.load_units())
+        self.assertTrue(func.load_unit_connection_points())
+        self.assertTrue(func.load_virtual_links())
+        return func
+
+    def test_cp_ref_index(self):
+        """
+        Tests the connection point references index of descriptors
+        """
+        func = self.load_function(VNFD)
+        self.assertEqual(func.cp_ref_links('vdu01:eth1'), ('input', 'other'))
+        self.assertEqual(func.cp_ref_links('vdu01:eth2'), ())
+        self.assertTrue(func.is_vbridge_cp_ref('mgmt'))
+        self.assertFalse(func.is_vlink_cp_ref('mgmt'))
+        self.assertTrue(func.is_vlink_cp_ref('input'))
+        self.assertTrue(func.has_connection_point('unused'))
+        self.assertFalse(func.has_connection_point('vdu01:eth0'))
+
+        self.assertEqual(func.unused_connection_points(), ['unused'])
+        self.assertEqual(func.undeclared_connection_points(), ['undeclared'])
+        graph = func.build_topology_graph(bridges=True, level=1)
+        self.assertEqual(graph.node['mgmt']['type'], 'br-iface')
+        self.assertEqual(graph.node['input']['type'], 'iface')
+
+    def test_topology_graph_cache(self):
+        """
+        Tests that topology graphs are built once per set of parameters
+        while the topology is unchanged
+        """
+        func = self.load_function(VNFD)
+        graph = func.build_topology_graph(bridges=True, level=1)
+        self.assertIs(func.build_topology_graph(bridges=True, level=1), graph)
+        self.assertIsNot(func.build_topology_graph(bridges=False, level=1),
+                         graph)
+
+        func.units['vdu01'].add_connection_point('eth2')
+        new_graph = func.build_topology_graph(bridges=True, level=1)
+        self.assertIsNot(new_graph, graph)
+        func.add_vlink('new', ['vdu01:eth2', 'unused'])
+        self.assertTrue(func.build_topology_graph(bridges=True, level=1)
+                        .has_edge('vdu01:eth2', 'unused'))
+
+    def test_function_unit_checks(self):
+        """
+        Tests the detection of loops, disconnected units and unused unit
+        connection points
+        """
+        vnfd = dict(VNFD)
+        vnfd['virtual_deployment_units'] = VNFD['virtual_deployment_units'] + [
+            {'id': 'vdu02', 'vm_image': 'image',
+             'connection_points': [{'id': 'eth0'}]},
+            {'id': 'vdu03', 'vm_image': 'image',
+             'connection_points': [{'id': 'eth0'}, {'id': 'eth1'},
+                                   {'id': 'eth2'}]}]
+        vnfd['virtual_links'] = VNFD['virtual_links'] + [
+            {'id': 'lan', 'connectivity_type': 'E-LAN',
+             'connection_points_reference': ['vdu01:eth1', 'vdu03:eth0',
+                                             'mgmt', 'vdu03:eth1',
+                                             'vdu01:eth0']}]
+        func = self.load_function(vnfd)
+        self.assertEqual(func.detect_disconnected_units(), ['vdu02'])
+        self.assertEqual(func.detect_unnused_cps_units(),
+                         ['vdu02:eth0', 'vdu03:eth2'])
+        self.assertEqual(func.detect_loops(),
+                         {'lan': ['vdu01:eth1', 'vdu01:eth0']})
+
+    def test_service_connection_point_usage(self):
+        """
+        Tests the detection of isolated VNFs and unused VNF connection points
+        """
+        storage = DescriptorStorage()
+        nsd = {'vendor': 'eu.5gtango', 'name': 'ns', 'version': '0.1',
+               'connection_points': [{'id': 'input'}],
+               'virtual_links': [
+                   {'id': 'input', 'connectivity_type': 'E-Line',
+                    'connection_points_reference': ['input', 'vnf1:in']},
+                   {'id': 'mgmt', 'connectivity_type': 'E-LAN',
+                    'connection_points_reference': ['vnf1:mgmt',
+                                                    'vnf2:mgmt']}]}
+        service = storage.create_service(self.write_descriptor('nsd.yml',
+                                                               nsd))
+        for vnf_id in ('vnf1', 'vnf2', 'vnf3'):
+            vnfd = {'vendor': 'eu.5gtango', 'name': vnf_id, 'version': '0.1',
+                    'connection_points': [{'id': 'mgmt'}, {'id': 'in'}]}
+            func = storage.create_function(
+                self.write_descriptor(vnf_id + '.yml', vnfd))
+            func.load_connection_points()
+            service.associate_function(func, vnf_id)
+        self.assertTrue(service.load_virtual_links())
+
+        self.assertTrue(service.is_cp_referenced('vnf1:mgmt'))
+        self.assertEqual(service.connection_point_usage(),
+                         (['vnf3'], ['vnf2:in', 'vnf3:mgmt', 'vnf3:in']))
+        self.assertEqual(service.detect_isolated_vnfs(), ['vnf3'])
+
+        # links added afterwards are taken into account
+        service.add_vlink('vnf3', ['vnf3:in', 'input'])
+        self.assertEqual(service.detect_isolated_vnfs(), [])
+
+    def test_create_function_shared(self):
+        """
+        Tests that functions with the same descriptor content are shared
+        """
+        storage = DescriptorStorage()
+        func = storage.create_function(self.write_descriptor('a.yml', VNFD))
+        self.assertIs(storage.create_function(
+            self.write_descriptor('b.yml', VNFD)), func)
+        # the first path wins
+        self.assertEqual(os.path.basename(func.filename), 'a.yml')
+        self.assertEqual(list(storage.functions.values()), [func])
+
+        vnfd = dict(VNFD, name='other')
+        other = storage.create_function(self.write_descriptor('c.yml', vnfd))
+        self.assertIsNot(other, func)
+        self.assertEqual(len(storage.functions), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,233 @@
+#  Copyright (c) 2015 SONATA-NFV, 5GTANGO, UBIWHERE, QUOBIS SL.
+# ALL RIGHTS RESERVED.
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+#
+# Neither the name of the SONATA-NFV, 5GTANGO, UBIWHERE, QUOBIS SL.
+# nor the names of its contributors may be used to endorse or promote
+# products derived from this software without specific prior written
+# permission.
+#
+# This work has been performed in the framework of the SONATA project,
+# funded by the European Commission under Grant number 671517 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.sonata-nfv.eu).
+#
+# This work has also been performed in the framework of the 5GTANGO project,
+# funded by the European Commission under Grant number 761493 through
+# the Horizon 2020 and 5G-PPP programmes. The authors would like to
+# acknowledge the contributions of their colleagues of the SONATA
+# partner consortium (www.5gtango.eu).
+
+import os
+import shutil
+import tempfile
+import unittest
+import yaml
+import networkx as nx
+from tngsdk.validation import event
+from unittest import mock
+from tngsdk.validation.util import read_descriptor_file, descriptor_cache
+from tngsdk.validation.util import read_descriptor_header
+from tngsdk.validation.util import _parse_descriptor_header
+from tngsdk.validation.util import index_descriptor_files
+from tngsdk.validation.util import read_descriptor_files
+from tngsdk.validation.util import find_cycles
+
+
+class TngSdkValidationUtilTest(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.evtLOG = event.get_logger('validator.events')
+        descriptor_cache.clear()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+        descriptor_cache.configure(maxsize=512, check_hash=False)
+
+    def write_file(self, name, content):
+        filename = os.path.join(self.tmp_dir, name)
+        with open(filename, 'w') as _f:
+            _f.write(content)
+        return filename
+
+    def test_read_descriptor_file_parse_error(self):
+        """
+        Tests that parse errors are reported as by the pure Python loader
+        """
+        filename = self.write_file('bad.yml',
+                                   "vendor: v\nlist:\n  - a\n  name: n\n")
+        self.assertIsNone(read_descriptor_file(filename))
+
+        with open(filename, 'r') as _f:
+            with self.assertRaises(yaml.YAMLError) as expected:
+                yaml.load(_f, Loader=yaml.SafeLoader)
+        errors = self.evtLOG.errors
+        self.assertEqual(len(errors), 1)
+        self.assertEqual(errors[0]['event_code'], 'evt_invalid_descriptor')
+        self.assertEqual(errors[0]['detail'][0]['message'],
+                         "Error parsing descriptor file: {0}"
+                         .format(expected.exception))
+
+    def test_read_descriptor_file_cache(self):
+        """
+        Tests that descriptors are parsed once while their files
+        are unchanged
+        """
+        filename = self.write_file('vnfd.yml',
+                                   "vendor: v\nname: n\nversion: '1'\n")
+        descriptor = read_descriptor_file(filename)
+        with mock.patch("tngsdk.validation.util.load_yaml") as m_load:
+            self.assertIs(read_descriptor_file(filename), descriptor)
+            self.assertFalse(m_load.called)
+
+        # a modified file is parsed again
+        self.write_file('vnfd.yml', "vendor: v\nname: n\nversion: '1.1'\n")
+        self.assertEqual(read_descriptor_file(filename)['version'], '1.1')
+        self.assertEqual((descriptor_cache.hits, descriptor_cache.misses),
+                         (1, 2))
+
+        # the cache is bounded, least recently used entries are evicted
+        descriptor_cache.configure(maxsize=1, check_hash=True)
+        other = self.write_file('other.yml',
+                                "vendor: v\nname: o\nversion: '1'\n")
+        read_descriptor_file(other)
+        read_descriptor_file(filename)
+        read_descriptor_file(other)
+        self.assertEqual(descriptor_cache.hits, 1)
+
+    def test_read_descriptor_header(self):
+        """
+        Tests that the identity of descriptors is read without parsing
+        the rest of the file, falling back to a full parse when needed
+        """
+        filename = self.write_file(
+            'vnfd.yml', "vendor: v\nname: n\nversion: '1.0'\n"
+                        "units:\n  - id: a\n  - id: b\n  name: c\n")
+        with mock.patch("tngsdk.validation.util.read_descriptor_file") \
+                as m_read:
+            self.assertEqual(read_descriptor_header(filename),
+                             {'vendor': 'v', 'name': 'n', 'version': '1.0'})
+            self.assertFalse(m_read.called)
+        # errors after the header are not reported
+        self.assertEqual(self.evtLOG.errors, [])
+
+        # plain scalars that are not strings need a full parse
+        filename = self.write_file(
+            'vnfd2.yml', "version: 1.0\nvendor: v\nname: n\n")
+        with mock.patch("tngsdk.validation.util.read_descriptor_file",
+                        return_value={'vendor': 'v', 'name': 'n',
+                                      'version': 1.0}) as m_read:
+            self.assertEqual(read_descriptor_header(filename)['version'], 1.0)
+            m_read.assert_called_once_with(filename)
+
+        filename = self.write_file('vnfd3.yml', "vendor: v\nname: n\n")
+        self.assertIsNone(read_descriptor_header(filename))
+
+    def test_read_descriptor_files_parallel(self):
+        """
+        Tests that parallel reads give the same result as serial ones
+        """
+        files = [self.write_file('{}.yml'.format(idx),
+                                 "vendor: v\nname: n{}\nversion: '1'\n"
+                                 .format(idx % 3))
+                 for idx in range(8)]
+        files.append(self.write_file('bad.yml', "vendor: [v\n"))
+        expected = {'v.n0.1': files[0], 'v.n1.1': files[1],
+                    'v.n2.1': files[2]}
+        for use_threads in (True, False):
+            descriptor_cache.clear()
+            self.evtLOG.reset()
+            with mock.patch("tngsdk.validation.util.LOG") as m_log:
+                self.assertEqual(read_descriptor_files(
+                    files, jobs=3, use_threads=use_threads), expected)
+            self.assertEqual(
+                [call[0][0] for call in m_log.error.call_args_list],
+                ["Duplicate descriptor in files: '{0}' <==> '{1}'"
+                 .format(file, files[idx % 3])
+                 for idx, file in enumerate(files[3:8], 3)])
+            self.assertEqual(len(self.evtLOG.errors), 1)
+            self.assertEqual(self.evtLOG.errors[0]['source_id'], files[-1])
+
+    def test_index_descriptor_files(self):
+        """
+        Tests that the persistent index is reused and only updated for
+        changed files
+        """
+        index_file = os.path.join(self.tmp_dir, 'cache', 'index.json')
+        files = [self.write_file('{}.yml'.format(name),
+                                 "vendor: v\nname: {}\nversion: '1'\n"
+                                 .format(name))
+                 for name in ('a', 'b')]
+        files.append(self.write_file('c.yml', "vendor: v\nname: a\n"
+                                              "version: '1'\n"))
+        expected = {'v.a.1': files[0], 'v.b.1': files[1]}
+        self.assertEqual(index_descriptor_files(files, index_file), expected)
+        self.assertTrue(os.path.isfile(index_file))
+
+        with mock.patch("tngsdk.validation.util._parse_descriptor_header") \
+                as m_header:
+            self.assertEqual(index_descriptor_files(files, index_file),
+                             expected)
+            self.assertFalse(m_header.called)
+
+        self.write_file('b.yml', "vendor: v\nname: b\nversion: '2.0'\n")
+        with mock.patch("tngsdk.validation.util._parse_descriptor_header",
+                        wraps=_parse_descriptor_header) as m_header:
+            self.assertEqual(index_descriptor_files(files, index_file),
+                             {'v.a.1': files[0], 'v.b.2.0': files[1]})
+            m_header.assert_called_once_with(files[1])
+
+    def test_find_cycles(self):
+        graph = nx.DiGraph()
+        graph.add_edges_from([(1, 2), (2, 1), (2, 3), (3, 4), (4, 2),
+                              (4, 5), (5, 5), (5, 6)])
+        cycles, truncated = find_cycles(graph)
+        self.assertEqual(sorted(sorted(c) for c in cycles),
+                         [[1, 2], [2, 3, 4], [5]])
+        self.assertFalse(truncated)
+        cycles, truncated = find_cycles(graph, min_length=3)
+        self.assertEqual([sorted(c) for c in cycles], [[2, 3, 4]])
+        self.assertFalse(truncated)
+        # the cycle [2, 3, 4] is longer than 2 nodes
+        cycles, limits = find_cycles(graph, max_length=2, min_length=2)
+        self.assertEqual([sorted(c) for c in cycles], [[1, 2]])
+        self.assertEqual(limits, {'length'})
+        # no path is cut in components of at most 'max_length' nodes
+        cycles, limits = find_cycles(graph, max_length=4)
+        self.assertEqual(len(cycles), 3)
+        self.assertFalse(limits)
+        self.assertEqual(find_cycles(nx.DiGraph([(1, 2), (2, 3)])),
+                         ([], set()))
+
+    def test_find_cycles_bounded(self):
+        # the complete graph of 12 nodes has billions of simple cycles
+        graph = nx.complete_graph(12, create_using=nx.DiGraph())
+        cycles, limits = find_cycles(graph, max_cycles=50)
+        self.assertEqual(len(cycles), 50)
+        self.assertEqual(limits, {'cycles'})
+        cycles, limits = find_cycles(graph, time_budget=0.2)
+        self.assertEqual(limits, {'time'})
+        # the search does not go deeper than the longest accepted cycle
+        cycles, limits = find_cycles(graph, max_length=2, time_budget=10)
+        self.assertEqual(len(cycles), 66)
+        self.assertEqual(limits, {'length'})
+        cycles, limits = find_cycles(graph, max_length=3, min_length=3)
+        self.assertEqual(len(cycles), 440)
+        self.assertEqual(limits, {'length'})
+
+
+if __name__ == "__main__":
+    unittest.main()
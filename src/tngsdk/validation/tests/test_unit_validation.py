@@ -32,8 +32,13 @@
 
 import unittest
 import os
+import shutil
+import tempfile
+import concurrent.futures
+from unittest import mock
 from tngsdk.validation.cli import parse_args
-from tngsdk.validation.validator import Validator
+from tngsdk.validation.validator import Validator, ValidatorPool
+from tngsdk.validation.validator import evtLOG
 
 
 SAMPLES_DIR = os.path.join('src', 'tngsdk', 'validation', 'samples')
@@ -68,6 +73,39 @@ class TngSdkValidationTest(unittest.TestCase):
         self.assertEqual(validator.error_count, 0)
         self.assertEqual(validator.warning_count, 0)
 
+    def test_validate_service_topology_graphs(self):
+        """
+        Tests that the topology graphs are only written when requested
+        """
+        service_path = os.path.join(SAMPLES_DIR, 'services', 'valid-son',
+                                    'valid.yml')
+        functions_path = os.path.join(SAMPLES_DIR, 'functions', 'valid-son')
+        graphs_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, graphs_dir)
+
+        validator = Validator()
+        validator.configure(syntax=True, integrity=True, topology=True,
+                            dpath=functions_path)
+        validator.validate_service(service_path)
+        self.assertEqual(os.listdir(graphs_dir), [])
+        service = list(validator.storage.services.values())[0]
+        self.assertTrue(service.complete_graph)
+
+        validator = Validator()
+        validator.configure(syntax=True, integrity=True, topology=True,
+                            dpath=functions_path,
+                            graphs_dir=os.path.join(graphs_dir, 'vid'),
+                            graph_levels=[1, 3])
+        validator.validate_service(service_path)
+        self.assertEqual(validator.error_count, 0)
+        service = list(validator.storage.services.values())[0]
+        self.assertEqual(
+            sorted(os.listdir(os.path.join(graphs_dir, 'vid'))),
+            sorted(name.format(service.id)
+                   for name in ('{}-lvl1.graphml', '{}-lvl1-br.graphml',
+                                '{}-lvl3.graphml', '{}-lvl3-br.graphml',
+                                '{}-lvl3-complete.graphml')))
+
     # def test_validate_service_topology_invalid(self):
     #     """
     #     Tests the incorrect validation of a service topology
@@ -127,6 +165,166 @@ class TngSdkValidationTest(unittest.TestCase):
         self.assertEqual(validator.error_count, 0)
         self.assertEqual(validator.warning_count, 0)
 
+    def test_validate_functions_once(self):
+        """
+        Tests that each function is validated once with the same options
+        """
+        service_path = os.path.join(SAMPLES_DIR, 'services', 'valid-son',
+                                    'valid.yml')
+        functions_path = os.path.join(SAMPLES_DIR, 'functions', 'valid-son')
+
+        validator = Validator()
+        validator.configure(syntax=True, integrity=True, topology=True,
+                            dpath=functions_path)
+        with mock.patch.object(validator, '_validate_function_syntax',
+                               wraps=validator._validate_function_syntax) \
+                as m_syntax:
+            self.assertTrue(validator.validate_function(functions_path))
+            validated = m_syntax.call_count
+            self.assertTrue(validator.validate_service(service_path))
+            self.assertEqual(m_syntax.call_count, validated)
+        self.assertEqual(validator.error_count, 0)
+
+    def test_validate_functions_once_events(self):
+        """
+        Tests that the events of a function validated once are reported
+        again when it is validated again
+        """
+        functions_path = os.path.join(SAMPLES_DIR, 'functions',
+                                      'invalid_integrity-son')
+        validator = Validator()
+        validator.configure(syntax=True, integrity=True, topology=True)
+        validator.validate_function(functions_path)
+        events = validator.event_logger.export()
+        self.assertTrue(validator.errors)
+
+        validator.event_logger.clear()
+        with mock.patch.object(validator, '_validate_function_syntax') \
+                as m_syntax:
+            validator.validate_function(functions_path)
+        self.assertFalse(m_syntax.called)
+        self.assertEqual(validator.event_logger.export(), events)
+
+    def test_validate_functions_parallel(self):
+        """
+        Tests that functions validated in parallel processes report the
+        same events as a serial validation
+        """
+        service_path = os.path.join(SAMPLES_DIR, 'services', 'valid-son',
+                                    'valid.yml')
+        reports = []
+        for jobs in (None, 2):
+            validator = Validator()
+            validator.configure(syntax=True, integrity=True, topology=True,
+                                dpath=os.path.join(SAMPLES_DIR, 'functions',
+                                                   'valid-son'),
+                                jobs=jobs)
+            self.assertTrue(validator.validate_function(
+                os.path.join(SAMPLES_DIR, 'functions',
+                             'invalid_integrity-son')))
+            self.assertTrue(validator.validate_service(service_path))
+            reports.append((validator.errors, validator.warnings))
+        self.assertTrue(reports[0][0])
+        self.assertEqual(reports[0], reports[1])
+
+    def test_validate_concurrent_validators(self):
+        """
+        Tests that validators running concurrently in threads report their
+        own events only
+        """
+        functions = [os.path.join(SAMPLES_DIR, 'functions', name)
+                     for name in ('invalid_integrity-son', 'valid-son')]
+
+        def validate(functions_path):
+            validator = Validator()
+            validator.configure(syntax=True, integrity=True, topology=True)
+            validator.validate_function(functions_path)
+            return validator.errors, validator.warnings
+
+        serial = [validate(path) for path in functions]
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as pool:
+            results = list(pool.map(validate, functions))
+        self.assertTrue(serial[0][0])
+        self.assertEqual(serial[1], ([], []))
+        self.assertEqual(serial, results)
+
+    def test_validator_pool(self):
+        """
+        Tests that the validators of a pool are reused and reset, and that
+        the idle validators are bounded
+        """
+        functions_path = os.path.join(SAMPLES_DIR, 'functions',
+                                      'invalid_integrity-son')
+        pool = ValidatorPool(maxsize=1)
+        with pool.borrow() as validator:
+            validator.configure(syntax=True, integrity=False,
+                                topology=False)
+            validator.validate_function(functions_path)
+            self.assertEqual(validator.errors, [])
+            self.assertTrue(validator.storage.functions)
+        self.assertEqual(pool.size, 1)
+
+        reused = pool.acquire()
+        self.assertIs(reused, validator)
+        self.assertEqual(pool.size, 0)
+        self.assertEqual(reused.errors, [])
+        self.assertEqual(reused.storage.functions, {})
+        # integrity is validated again by default
+        reused.validate_function(functions_path)
+        self.assertTrue(reused.errors)
+
+        other = pool.acquire()
+        self.assertIsNot(other, reused)
+        # the events logged outside of the validations are dropped too
+        evtLOG.log("Invalid function descriptor", "", 'vnf',
+                   'evt_function_invalid_descriptor')
+        self.assertTrue(evtLOG.default.errors)
+        pool.release(other)
+        self.assertEqual(evtLOG.default.errors, [])
+        pool.release(reused)
+        self.assertEqual(pool.size, 1)
+
+    def test_validate_project_parallel(self):
+        """
+        Tests that the descriptors of a project validated in parallel
+        processes report the same events as a serial validation, with the
+        time of each descriptor
+        """
+        path = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, path)
+        workspace_path = os.path.join(path, 'workspace')
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'projects', 'workspace'),
+                        workspace_path)
+        with open(os.path.join(workspace_path, 'workspace.yml'), 'a') as _f:
+            _f.write("projects_config: {}\n".format(
+                os.path.join(workspace_path, 'projects', 'config.yml')))
+        project_path = os.path.join(path, 'project')
+        shutil.copytree(os.path.join(SAMPLES_DIR, 'projects', 'test_pv'),
+                        project_path)
+        tstd_files = []
+        for name in ('test-1.yml', 'test-2.yml'):
+            # unreadable test descriptors
+            with open(os.path.join(project_path, name), 'w') as _f:
+                _f.write("name: [{}\n".format(name))
+            tstd_files.append(os.path.join(project_path, name))
+            with open(os.path.join(project_path, 'project.yml'), 'a') as _f:
+                _f.write("- path: {}\n"
+                         "  type: application/vnd.5gtango.tstd\n"
+                         .format(name))
+        reports = []
+        for jobs in (None, 2):
+            validator = Validator()
+            validator.configure(syntax=True, integrity=True, topology=True,
+                                workspace_path=workspace_path, jobs=jobs)
+            self.assertFalse(validator.validate_project(project_path))
+            reports.append((validator.errors, validator.warnings))
+            self.assertEqual(
+                list(validator.timings),
+                tstd_files + [os.path.join(project_path, 'sources', 'nsd',
+                                           'valid.yml')])
+        self.assertEqual(len(reports[0][0]), 4)
+        self.assertEqual(reports[0], reports[1])
+
     def test_validate_service_integrity_invalid(self):
         """
         Tests the incorrect validation of a service integrity
@@ -230,6 +428,26 @@ class TngSdkValidationTest(unittest.TestCase):
         self.assertEqual(validator.error_count, 1)
         self.assertEqual(validator.warning_count, 0)
 
+    def test_validate_service_syntax_invalid_all_errors(self):
+        """
+        Tests that all the schema errors are reported, with their JSON
+        path, when max_errors is configured
+        """
+        service_path = os.path.join(SAMPLES_DIR, 'services',
+                                    'invalid-syntax-tng',
+                                    'required_properties.yml')
+
+        validator = Validator()
+        validator.configure(syntax=True, integrity=False, topology=False,
+                            max_errors=50)
+        validator.validate_service(service_path)
+
+        self.assertEqual(validator.error_count, 1)
+        details = validator.errors[0]['detail']
+        self.assertTrue(details)
+        for detail in details:
+            self.assertIn("': $", detail['message'])
+
     def test_validate_function_syntax_valid(self):
         """
         Tests the syntax validation of a valid 5GTANGO function.
@@ -35,8 +35,10 @@ import unittest
 import tempfile
 import shutil
 import os
+from unittest import mock
 from tngsdk.validation import cli
 from tngsdk.validation.validator import Validator
+from tngsdk.validation.util import descriptor_cache, list_files
 
 
 SAMPLE_DIR = os.path.join('src', 'tngsdk', 'validation/')
@@ -358,6 +360,45 @@ class TngSdkValidationCliTest(unittest.TestCase):
         result_validator = cli.dispatch(args, validator)
         self.assertEqual(len(result_validator.customErrors), 4)
 
+    def test_cli_validation_service_integrity_duplicates_jobs(self):
+        functions_dir = SAMPLE_DIR + 'samples/functions/valid-son/'
+        for jobs in ('1', '2'):
+            # each function along with a duplicate whose identity is only
+            # read by a full parse (its 'name' key is repeated)
+            dpath = tempfile.mkdtemp()
+            for name in os.listdir(functions_dir):
+                with open(os.path.join(functions_dir, name)) as _file:
+                    content = _file.read()
+                shutil.copy(os.path.join(functions_dir, name), dpath)
+                with open(os.path.join(dpath, 'copy-' + name), 'w') as _file:
+                    _file.write(content.replace('\nname:',
+                                                '\nname: "copy"\nname:', 1))
+            # the first file of each function is loaded, as in a serial read
+            first = {}
+            for file in list_files(dpath, 'yml'):
+                first.setdefault(os.path.basename(file).replace('copy-', ''),
+                                 file)
+
+            descriptor_cache.clear()
+            validator = Validator()
+            input_args = ['--integrity', '--service',
+                          SAMPLE_DIR + 'samples/services/valid-son/valid.yml',
+                          '--dpath', dpath, '--dext', 'yml', '--jobs', jobs]
+            args = cli.parse_args(input_args)
+            self.assertTrue(cli.check_args(args))
+            with mock.patch("tngsdk.validation.util.LOG") as m_log:
+                result_validator = cli.dispatch(args, validator)
+            self.assertEqual(result_validator.error_count, 0)
+            self.assertEqual(len(m_log.error.call_args_list), 3)
+            service = list(result_validator.storage.services.values())[0]
+            self.assertEqual(sorted(func.filename for func in
+                                    service.functions.values()),
+                             sorted(first.values()))
+            index_file = validator._descriptor_index_file(dpath)
+            if os.path.isfile(index_file):
+                os.remove(index_file)
+            shutil.rmtree(dpath)
+
 
 if __name__ == "__main__":
     unittest.main()
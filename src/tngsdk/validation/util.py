@@ -25,8 +25,15 @@
 # partner consortium (www.5gtango.eu).
 
 import os
+import json
+import hashlib
+import threading
+import concurrent.futures
+import time
 import yaml
+import networkx as nx
 import logging
+from collections import OrderedDict
 from tngsdk.validation import event
 # import event
 
@@ -34,21 +41,59 @@ from tngsdk.validation.logger import TangoLogger
 LOG = TangoLogger.getLogger(__name__)
 evtLOG = event.get_logger('validator.events')
 
+# Use the LibYAML based loader when available, it is much faster
+YAML_LOADER = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
 
-def read_descriptor_files(files):
+
+def load_yaml(stream):
+    """
+    Parses a YAML document with the fastest safe loader available.
+    Documents that fail to parse are parsed again with the pure Python
+    loader, so the reported errors (and their marks) are the same
+    whether LibYAML is available or not.
+    :param stream: YAML document, as a string or an open file
+    :return: the parsed document
+    """
+    if YAML_LOADER is yaml.SafeLoader:
+        return yaml.load(stream, Loader=yaml.SafeLoader)
+    position = stream.tell() if hasattr(stream, 'seek') else None
+    try:
+        return yaml.load(stream, Loader=YAML_LOADER)
+    except yaml.YAMLError:
+        if position is not None:
+            stream.seek(position)
+        return yaml.load(stream, Loader=yaml.SafeLoader)
+
+
+def read_descriptor_files(files, jobs=None, use_threads=False):
     """
     Loads the VNF descriptors provided in the file list. It builds a
     dictionary of the loaded descriptor files. Each entry has the
     key of the VNF combo ID, in the format 'vendor.name.version'.
     :param files: filename list of descriptors
+    :param jobs: number of files parsed in parallel (see 'map_files')
+    :param use_threads: parse files in threads instead of processes
     :return: Dictionary of descriptors. None if unsuccessful.
     """
+    contents = read_descriptor_file_list(files, jobs=jobs,
+                                         use_threads=use_threads)
+    return _map_descriptor_files(files, [content and descriptor_id(content)
+                                         for content in contents])
+
+
+def _map_descriptor_files(files, ids):
+    """
+    Builds the dictionary of descriptor files by descriptor id. Duplicates
+    are resolved in the order of 'files', as in a serial read, whatever
+    the order in which the files were read.
+    :param files: filename list of descriptors
+    :param ids: descriptor id of each file (None if unsuccessful)
+    :return: Dictionary of descriptors
+    """
     descriptors = {}
-    for file in files:
-        content = read_descriptor_file(file)
-        if not content:
+    for file, did in zip(files, ids):
+        if not did:
             continue
-        did = descriptor_id(content)
         if did in descriptors.keys():
             LOG.error("Duplicate descriptor in files: '{0}' <==> '{1}'"
                       .format(file, descriptors[did]))
@@ -56,38 +101,451 @@ def read_descriptor_files(files):
         descriptors[did] = file
     return descriptors
 
+
+def map_files(func, files, jobs=None, use_threads=False, initializer=None,
+              initargs=()):
+    """
+    Applies a function to each file of a list, in parallel if requested.
+    :param func: function taking a filename, it must be picklable (i.e.
+                 defined at module level) unless 'use_threads' is set
+    :param files: filename list
+    :param jobs: number of parallel workers, 0 for one per CPU. None or 1
+                 to apply the function serially.
+    :param use_threads: use a thread pool instead of a process pool
+    :param initializer: function called with 'initargs' when each worker
+                        starts, or once before a serial run
+    :return: list of results, in the order of 'files'
+    """
+    jobs = min(pool_size(jobs), len(files))
+    if jobs <= 1:
+        if initializer:
+            initializer(*initargs)
+        return [func(file) for file in files]
+    if use_threads:
+        pool = concurrent.futures.ThreadPoolExecutor(
+            max_workers=jobs, initializer=initializer, initargs=initargs)
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=jobs, initializer=initializer, initargs=initargs)
+    with pool:
+        chunksize = max(1, len(files) // (jobs * 4))
+        return list(pool.map(func, files, chunksize=chunksize))
+
+
+def pool_size(jobs):
+    """
+    Provides the number of parallel workers for a 'jobs' setting.
+    :param jobs: number of workers, 0 for one per CPU, None for serial
+    :return: number of workers (1 when serial)
+    """
+    if jobs == 0:
+        return os.cpu_count() or 1
+    return jobs or 1
+
+
+def read_descriptor_file_list(files, jobs=None, use_threads=False):
+    """
+    Reads a list of descriptor files, parsing the files which are not in
+    'descriptor_cache' in parallel if requested (see 'map_files'). Problems
+    are reported in the same way and order as in a serial read.
+    :param files: filename list of descriptors
+    :return: list of descriptor dictionaries (None for invalid files), in
+             the order of 'files'
+    """
+    stats = []
+    contents = []
+    for file in files:
+        try:
+            stat = os.stat(file)
+        except OSError:
+            stat = None
+        stats.append(stat)
+        contents.append(descriptor_cache.get(file, stat) if stat else None)
+
+    pending = [file for file, content in zip(files, contents)
+               if content is None]
+    parsed = iter(map_files(_parse_descriptor_file, pending, jobs=jobs,
+                            use_threads=use_threads))
+    for idx, file in enumerate(files):
+        if contents[idx] is None:
+            contents[idx] = _check_descriptor(file, stats[idx], *next(parsed))
+    return contents
+
+
+class DescriptorCache(object):
+    """
+    Size-bounded LRU cache of parsed descriptor files, shared by the whole
+    process. An entry is only valid while the modification time and size
+    of its file are unchanged and, if 'check_hash' is set, while the hash
+    of its content is the same. Cached descriptors are shared between
+    readers, hence they must not be modified.
+    """
+    def __init__(self, maxsize=512, check_hash=False):
+        self._maxsize = maxsize
+        self._check_hash = check_hash
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def configure(self, maxsize=None, check_hash=None):
+        """
+        :param maxsize: maximum number of cached descriptors (0 disables
+                        the cache)
+        :param check_hash: also validate entries by the hash of the file
+                           content
+        """
+        with self._lock:
+            if maxsize is not None:
+                self._maxsize = maxsize
+            if check_hash is not None:
+                self._check_hash = check_hash
+            self._evict()
+
+    def _evict(self):
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _signature(self, stat, file):
+        digest = file_hash(file) if self._check_hash else None
+        return stat.st_mtime_ns, stat.st_size, digest
+
+    def get(self, file, stat):
+        """
+        Obtains the cached descriptor of a file.
+        :param file: descriptor filename
+        :param stat: current os.stat() of the file
+        :return: descriptor dictionary or None if not cached
+        """
+        key = os.path.abspath(file)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and entry[0] == self._signature(stat, file):
+            with self._lock:
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                self.hits += 1
+            return entry[1]
+        with self._lock:
+            self.misses += 1
+
+    def put(self, file, stat, descriptor):
+        """
+        Caches the descriptor of a file.
+        :param file: descriptor filename
+        :param stat: os.stat() of the file taken before reading it
+        :param descriptor: descriptor dictionary
+        """
+        if not self._maxsize:
+            return
+        key = os.path.abspath(file)
+        signature = self._signature(stat, file)
+        with self._lock:
+            self._entries[key] = (signature, descriptor)
+            self._entries.move_to_end(key)
+            self._evict()
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+
+# parsed descriptors cache used by read_descriptor_file
+descriptor_cache = DescriptorCache()
+
+
+def file_hash(file):
+    """
+    Calculates the SHA-1 hash of a file content.
+    :param file: filename
+    :return: hex digest
+    """
+    sha1 = hashlib.sha1()
+    with open(file, 'rb') as _file:
+        for chunk in iter(lambda: _file.read(65536), b''):
+            sha1.update(chunk)
+    return sha1.hexdigest()
+
+
 def read_descriptor_file(file):
     """
-    Reads a SONATA descriptor from a file.
+    Reads a SONATA descriptor from a file. Parsed descriptors are kept in
+    'descriptor_cache' and must not be modified.
     :param file: descriptor filename
     :return: descriptor dictionary
     """
+    try:
+        stat = os.stat(file)
+    except OSError:
+        stat = None
+    if stat:
+        descriptor = descriptor_cache.get(file, stat)
+        if descriptor is not None:
+            return descriptor
+    return _check_descriptor(file, stat, *_parse_descriptor_file(file))
+
+
+def _parse_descriptor_file(file):
+    """
+    Parses a descriptor file without reporting any problem, so that it can
+    run in a worker process.
+    :param file: descriptor filename
+    :return: tuple (descriptor or None, error message or None)
+    """
     with open(file, 'r') as _file:
         try:
-            descriptor = yaml.load(_file, Loader=yaml.SafeLoader)
+            descriptor = load_yaml(_file)
         except yaml.YAMLError as exc:
-            evtLOG.log("Invalid descriptor",
-                       "Error parsing descriptor file: {0}".format(exc),
-                       file,
-                       'evt_invalid_descriptor')
-            return
+            return None, "Error parsing descriptor file: {0}".format(exc)
+    if not descriptor:
+        return None, "Couldn't read descriptor file: '{0}'".format(file)
+    return descriptor, None
+
+
+def _check_descriptor(file, stat, descriptor, error):
+    """
+    Reports the problems of a parsed descriptor file and caches it if valid.
+    :param file: descriptor filename
+    :param stat: os.stat() of the file taken before parsing it
+    :return: descriptor dictionary. None if invalid.
+    """
+    if error:
+        evtLOG.log("Invalid descriptor",
+                   error,
+                   file,
+                   'evt_invalid_descriptor')
+        return
+
+    if 'vendor' not in descriptor or \
+            'name' not in descriptor or \
+            'version' not in descriptor:
+        LOG.warning("Invalid SONATA descriptor file: '{0}'. Missing "
+                    "'vendor', 'name' or 'version'. Ignoring."
+                    .format(file))
+        return
+
+    if stat:
+        descriptor_cache.put(file, stat, descriptor)
+    return descriptor
+
+
+# keys identifying a descriptor
+IDENTITY_KEYS = ('vendor', 'name', 'version')
+
 
+def read_descriptor_header(file):
+    """
+    Reads the identity ('vendor', 'name' and 'version') of a descriptor
+    file, parsing it only until the three keys are found. Files whose
+    identity can't be read this way (e.g. missing keys or values that are
+    not plain strings) are fully read with 'read_descriptor_file'.
+    :param file: descriptor filename
+    :return: dictionary with the identity keys. None if unsuccessful.
+    """
+    header = _parse_descriptor_header(file)
+    if header is None:
+        descriptor = read_descriptor_file(file)
         if not descriptor:
-            evtLOG.log("Invalid descriptor",
-                       "Couldn't read descriptor file: '{0}'".format(file),
-                       file,
-                       'evt_invalid_descriptor')
             return
+        header = {key: descriptor[key] for key in IDENTITY_KEYS}
+    return header
+
+
+def _parse_descriptor_header(file):
+    """
+    Looks for the identity keys in the top-level mapping of a YAML file,
+    using the parser events so that the rest of the file is not read.
+    :return: dictionary with the identity keys or None if not found
+    """
+    header = {}
+    resolver = yaml.resolver.Resolver()
+    depth = 0
+    key = None
+    expect_key = True
+    try:
+        with open(file, 'r') as _file:
+            for evt in yaml.parse(_file, Loader=YAML_LOADER):
+                if isinstance(evt, (yaml.StreamStartEvent,
+                                    yaml.DocumentStartEvent)):
+                    continue
+                if isinstance(evt, yaml.CollectionStartEvent):
+                    if depth == 0 and \
+                            not isinstance(evt, yaml.MappingStartEvent):
+                        return
+                    if depth == 1 and (expect_key or key in IDENTITY_KEYS):
+                        return
+                    depth += 1
+                elif isinstance(evt, yaml.CollectionEndEvent):
+                    depth -= 1
+                    if depth < 1:
+                        return
+                    if depth == 1:
+                        expect_key = True
+                elif isinstance(evt, yaml.ScalarEvent) and depth == 1:
+                    if expect_key:
+                        key = evt.value
+                        expect_key = False
+                        continue
+                    expect_key = True
+                    if key not in IDENTITY_KEYS:
+                        continue
+                    tag = evt.tag
+                    if tag in (None, '!'):
+                        tag = resolver.resolve(yaml.ScalarNode, evt.value,
+                                               evt.implicit)
+                    if key in header or tag != resolver.DEFAULT_SCALAR_TAG:
+                        return
+                    header[key] = evt.value
+                    if len(header) == len(IDENTITY_KEYS):
+                        return header
+                elif isinstance(evt, yaml.ScalarEvent) and depth > 1:
+                    continue
+                elif isinstance(evt, yaml.AliasEvent) and depth > 1:
+                    continue
+                else:
+                    return
+    except (yaml.YAMLError, OSError, UnicodeDecodeError):
+        return
+
+
+class DescriptorIndex(object):
+    """
+    Persistent index of the descriptor ids of a set of files, stored as JSON
+    in 'index_file'. Files are only read again (header only) when their
+    modification time or size changed.
+    """
+    INDEX_VERSION = 1
+
+    def __init__(self, index_file=None):
+        self._index_file = index_file
+        self._entries = dict()
+        self._dirty = False
+        self._read()
 
-        if 'vendor' not in descriptor or \
-                'name' not in descriptor or \
-                'version' not in descriptor:
-            LOG.warning("Invalid SONATA descriptor file: '{0}'. Missing "
-                        "'vendor', 'name' or 'version'. Ignoring."
-                        .format(file))
+    def _read(self):
+        if not self._index_file or not os.path.isfile(self._index_file):
             return
+        try:
+            with open(self._index_file, 'r') as index_f:
+                index = json.load(index_f)
+            if index.get('version') != self.INDEX_VERSION:
+                return
+            self._entries = index['files']
+        except (OSError, ValueError, KeyError) as e:
+            LOG.debug("Ignoring descriptor index file '{}': {}"
+                      .format(self._index_file, e))
+
+    def _write(self):
+        index = {'version': self.INDEX_VERSION,
+                 'files': self._entries}
+        tmp_file = '{}.{}.{}.tmp'.format(self._index_file, os.getpid(),
+                                         threading.get_ident())
+        try:
+            os.makedirs(os.path.dirname(self._index_file), exist_ok=True)
+            with open(tmp_file, 'w') as index_f:
+                json.dump(index, index_f)
+            os.replace(tmp_file, self._index_file)
+        except OSError as e:
+            LOG.debug("Could not write descriptor index file '{}': {}"
+                      .format(self._index_file, e))
+
+    def descriptor_ids(self, files, jobs=None, use_threads=False):
+        """
+        Provides the descriptor ids of a list of files, reading the header of
+        those which are not indexed or changed since they were indexed (in
+        parallel if requested, see 'map_files').
+        :param files: filename list of descriptors
+        :return: list of descriptor ids (None if unsuccessful), in the order
+                 of 'files'
+        """
+        keys = [os.path.abspath(file) for file in files]
+        signatures = []
+        ids = []
+        for file, key in zip(files, keys):
+            try:
+                stat = os.stat(file)
+            except OSError:
+                stat = None
+            signature = [stat.st_mtime_ns, stat.st_size] if stat else None
+            entry = self._entries.get(key)
+            signatures.append(signature)
+            ids.append(entry[2] if signature and entry and
+                       entry[:2] == signature else None)
+
+        pending = [file for file, did in zip(files, ids) if did is None]
+        headers = map_files(_parse_descriptor_header, pending, jobs=jobs,
+                            use_threads=use_threads)
+        # files whose header can't be read this way are fully read, as in
+        # 'read_descriptor_header'
+        contents = iter(read_descriptor_file_list(
+            [file for file, header in zip(pending, headers) if header is None],
+            jobs=jobs, use_threads=use_threads))
+        headers = iter(headers)
+        for idx, file in enumerate(files):
+            if ids[idx] is not None:
+                continue
+            header = next(headers)
+            if header is None:
+                descriptor = next(contents)
+                header = descriptor and {key: descriptor[key]
+                                         for key in IDENTITY_KEYS}
+            if not header:
+                # not indexed, so that its errors are reported on every scan
+                if self._entries.pop(keys[idx], None):
+                    self._dirty = True
+                continue
+            ids[idx] = descriptor_id(header)
+            if signatures[idx]:
+                self._entries[keys[idx]] = signatures[idx] + [ids[idx]]
+                self._dirty = True
+        return ids
+
+    def descriptor_id(self, file):
+        """
+        Provides the descriptor id of a file (see 'descriptor_ids').
+        :param file: descriptor filename
+        :return: descriptor id. None if unsuccessful.
+        """
+        return self.descriptor_ids([file])[0]
+
+    def prune(self, files):
+        """
+        Drops the entries of the files not in the provided list.
+        :param files: filename list of descriptors
+        """
+        keep = set(os.path.abspath(file) for file in files)
+        for key in list(self._entries.keys()):
+            if key not in keep:
+                del self._entries[key]
+                self._dirty = True
+
+    def save(self):
+        if self._dirty and self._index_file:
+            self._write()
+            self._dirty = False
+
+
+def index_descriptor_files(files, index_file=None, jobs=None,
+                           use_threads=False):
+    """
+    Same as 'read_descriptor_files' but only reading the identity of the
+    descriptors. Ids are kept in the persistent index 'index_file' (if
+    provided), so unchanged files are not read again on subsequent calls.
+    :param files: filename list of descriptors
+    :param index_file: filename of the index of these files
+    :param jobs: number of files read in parallel (see 'map_files')
+    :param use_threads: read files in threads instead of processes
+    :return: Dictionary of descriptors. None if unsuccessful.
+    """
+    index = DescriptorIndex(index_file)
+    descriptors = _map_descriptor_files(
+        files, index.descriptor_ids(files, jobs=jobs, use_threads=use_threads))
+    index.prune(files)
+    index.save()
+    return descriptors
 
-        return descriptor
 
 def descriptor_id(descriptor):
     """
@@ -136,6 +594,84 @@ def strip_root(path):
     return path[1:] if path[0] == '/' else path
 
 
+def _simple_cycles(graph, nodes, limits, max_length=None, deadline=None):
+    """
+    Depth-first enumeration of the simple cycles through the given nodes,
+    each one found from its first node in 'nodes'. The limits reached are
+    added to 'limits': 'length' when a path is not extended beyond
+    'max_length' nodes, and 'time' when the deadline, checked at every
+    step, has passed, which stops the enumeration.
+    """
+    order = {node: i for i, node in enumerate(nodes)}
+    for start in nodes:
+        path = [start]
+        on_path = {start}
+        stack = [iter(graph.successors(start))]
+        while stack:
+            if deadline is not None and time.monotonic() > deadline:
+                limits.add('time')
+                return
+            node = next(stack[-1], None)
+            if node is None:
+                stack.pop()
+                on_path.discard(path.pop())
+                continue
+            if node == start:
+                yield list(path)
+            elif node not in on_path and order.get(node, -1) > order[start]:
+                if max_length is not None and len(path) >= max_length:
+                    # longer cycles may go through this node
+                    limits.add('length')
+                    continue
+                path.append(node)
+                on_path.add(node)
+                stack.append(iter(graph.successors(node)))
+
+
+def find_cycles(graph, max_cycles=None, max_length=None, time_budget=None,
+                min_length=1):
+    """
+    Finds the simple cycles of a directed graph within bounds, since their
+    number may grow exponentially with the size of the graph. Only the
+    strongly connected components of at least 'min_length' nodes may hold
+    the searched cycles, the others are skipped.
+    :param graph: directed graph (networkx.DiGraph)
+    :param max_cycles: maximum number of cycles to find
+    :param max_length: cycles longer than this number of nodes are not
+                       searched
+    :param time_budget: maximum search time, in seconds
+    :param min_length: cycles shorter than this number of nodes are ignored
+    :return: tuple (list of cycles, set of the limits reached: 'cycles',
+             'time' and/or 'length'). The list may be incomplete if the
+             set is not empty.
+    """
+    deadline = None
+    if time_budget is not None:
+        deadline = time.monotonic() + time_budget
+    cycles = []
+    limits = set()
+    for component in nx.strongly_connected_components(graph):
+        if len(component) < min_length:
+            continue
+        if len(component) == 1:
+            # a single node is only a cycle along with a self-loop
+            node = next(iter(component))
+            if not graph.has_edge(node, node):
+                continue
+        for cycle in _simple_cycles(graph.subgraph(component),
+                                    list(component), limits, max_length,
+                                    deadline):
+            if len(cycle) < min_length:
+                continue
+            if max_cycles is not None and len(cycles) >= max_cycles:
+                limits.add('cycles')
+                return cycles, limits
+            cycles.append(cycle)
+        if 'time' in limits:
+            break
+    return cycles, limits
+
+
 class CountCalls(object):
     """Decorator to determine number of calls for a method"""
 
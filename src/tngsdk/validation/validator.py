@@ -32,6 +32,7 @@
 # Python packages imports
 import logging
 import os
+import hashlib
 import uuid
 # from .event import *
 import coloredlogs
@@ -42,7 +43,11 @@ import shutil
 import atexit
 import errno
 import yaml
-import inspect
+import functools
+import threading
+import contextlib
+import concurrent.futures
+from collections import OrderedDict, deque
 # Sonata and 55GTANGO imports
 from tngsdk.project.workspace import Workspace
 from tngsdk.project.project import Project
@@ -52,8 +57,10 @@ from tngsdk.validation.storage import DescriptorStorage, Test, Phase, Step, Prob
 # from son.validate.util import strip_root, build_descriptor_id
 # from util import read_descriptor_files, list_files, strip_root
 # from util import build_descriptor_id
-from tngsdk.validation.util import read_descriptor_files, list_files
+from tngsdk.validation.util import list_files
+from tngsdk.validation.util import index_descriptor_files, read_descriptor_file
 from tngsdk.validation.util import strip_root, build_descriptor_id
+from tngsdk.validation.util import find_cycles, map_files, pool_size
 from tngsdk.validation.schema.validator import SchemaValidator
 from tngsdk.validation import event
 from tngsdk.validation.custom_rules import validator_custom_rules
@@ -64,11 +71,105 @@ LOG = TangoLogger.getLogger(__name__)
 evtLOG = event.get_logger('validator.events')
 
 
+# validator of the worker processes
+_worker = None
+
+
+def _init_worker(workspace, settings, schemas):
+    global _worker
+    _worker = Validator(workspace)
+    _worker.configure(**settings)
+    # the schemas are provided by the parent process
+    _worker.schema_validator.configure(offline=True)
+    _worker.schema_validator.import_schemas(schemas)
+
+
+def _reset_worker():
+    _worker._storage = DescriptorStorage()
+    _worker.customErrors = []
+    _worker.event_logger.clear()
+    return _worker
+
+
+def _validate_function_job(vnfd_path):
+    """
+    Validates a function in a worker process.
+    :param vnfd_path: function descriptor filename
+    :return: tuple (validation result, validated function, events, custom
+             rules errors)
+    """
+    validator = _reset_worker()
+    result = validator.validate_function(vnfd_path)
+    return (result, validator.storage.find_function(vnfd_path),
+            validator.event_logger.export(), validator.customErrors)
+
+
+def _validate_descriptor_job(method, path):
+    """
+    Validates a project descriptor in a worker process.
+    :param method: name of the validation method, e.g. 'validate_test'
+    :param path: descriptor filename
+    :return: tuple (validation result, storage of the descriptor, events,
+             validation time)
+    """
+    validator = _reset_worker()
+    start = time.perf_counter()
+    result = getattr(validator, method)(path)
+    return (result, validator.storage, validator.event_logger.export(),
+            time.perf_counter() - start)
+
+
+def _log_events(method):
+    """
+    Decorates a validation method of 'Validator' to log the events of the
+    validation, including those of the storage, util and custom rules
+    modules, into the event logger of the validator. This allows several
+    validators to run concurrently in threads or asyncio tasks.
+    """
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._evtLOG.activate():
+            return method(self, *args, **kwargs)
+    return wrapper
+
+
 class Validator(object):
+    # bounds of the search of cycles in forwarding graphs
+    DEFAULT_MAX_CYCLES = 100
+    DEFAULT_CYCLES_TIME_BUDGET = 5.0
+    # validations whose configuration is checked by '_assert_configuration'
+    VALIDATION_SCOPES = ('package', 'project', 'service', 'function')
+
     def __init__(self, workspace=None):
 
-        # by default all the tests are performed
         self._workspace = workspace
+        # create "virtual" workspace if not provided (don't actually create
+        # file structure)
+        if not self._workspace:
+            self._workspace = Workspace('.', log_level='info')
+        # # for package signature validation
+        # self._pkg_signature = None
+        # self._pkg_pubkey = None
+        #
+        # # configure logs
+        # coloredlogs.install(level=self._log_level)
+
+        # syntax validation
+        self._schema_validator = SchemaValidator(self._workspace, preload=True)
+
+        # events of the validations of this validator, see '_log_events'
+        self._evtLOG = event.EventLogger('validator.events')
+
+        self.reset()
+
+    def reset(self):
+        """
+        Restores the default configuration and drops the descriptors and
+        events of the previous validations, keeping the workspace and the
+        loaded schemas. A reset validator behaves like a new one, e.g. when
+        it is reused from a 'ValidatorPool'.
+        """
+        # by default all the tests are performed
         self._syntax = True
         self._integrity = True
         self._topology = True
@@ -76,45 +177,49 @@ class Validator(object):
 
         # Variable to delete, only to check custom rules errors
         self._customErrors = []
-        # create "virtual" workspace if not provided (don't actually create
-        # file structure)
-        if not self._workspace:
-            self._workspace = Workspace('.', log_level='info')
         # load configurations from workspace
         self._dext = self._workspace.default_descriptor_extension
         self._dpath = '.'
         self._log_level = self._workspace.log_level
         self._cfile = '.'
         self._workspace_path = os.path.expanduser('~/.tng-workspace/')
-        # # for package signature validation
-        # self._pkg_signature = None
-        # self._pkg_pubkey = None
-        #
-        # # configure logs
-        # coloredlogs.install(level=self._log_level)
-
-        # descriptors storage
+        # report only the first schema error of each descriptor by default
+        self._max_errors = None
+        # descriptor files are read serially by default
+        self._jobs = None
+        self._timings = OrderedDict()
+        self._job_threads = False
+        # topology graphs are only exported on demand
+        self._graphs_dir = None
+        self._graph_levels = None
+        self._max_cycles = self.DEFAULT_MAX_CYCLES
+        self._max_cycle_length = None
+        self._cycles_time_budget = self.DEFAULT_CYCLES_TIME_BUDGET
+
+        # descriptors storage, along with the results of the validations
+        # of its functions
         self._storage = DescriptorStorage()
 
-        # syntax validation
-        self._schema_validator = SchemaValidator(self._workspace, preload=True)
-
-        # reset event logger
-        evtLOG.reset()
+        self._evtLOG.clear()
+        # events logged outside of the validations (e.g. by the REST helpers)
+        # go to the process-wide logger, which is not reported, drop them
+        evtLOG.default.clear()
 
         # ANTON: what's this?
         self.source_id = None
         # forwarding graphs of the NS which is going to be validated
         self._fwgraphs = dict()
 
-        pass
-
     @property
     def schema_validator(self):
         return self._schema_validator
     @property
+    def event_logger(self):
+        return self._evtLOG
+
+    @property
     def errors(self):
-        return evtLOG.errors
+        return self._evtLOG.errors
 
     @property
     def error_count(self):
@@ -125,7 +230,7 @@ class Validator(object):
 
     @property
     def warnings(self):
-        return evtLOG.warnings
+        return self._evtLOG.warnings
 
     @property
     def warning_count(self):
@@ -141,6 +246,14 @@ class Validator(object):
         """
         return self._storage
 
+    @property
+    def timings(self):
+        """
+        Provides the validation time, in seconds, of each descriptor of the
+        last validated project, by filename.
+        """
+        return self._timings
+
     @property
     def dpath(self):
         return self._dpath
@@ -160,7 +273,10 @@ class Validator(object):
     def configure(self, syntax=None, integrity=None, topology=None,
                   custom=None, dpath=None, dext=None, debug=None,
                   cfile=None, pkg_signature=None, pkg_pubkey=None,
-                  workspace_path=None):
+                  workspace_path=None, max_errors=None, jobs=None,
+                  job_threads=None, graphs_dir=None, graph_levels=None,
+                  max_cycles=None, max_cycle_length=None,
+                  cycles_time_budget=None):
         """
         Configure parameters for validation. It is recommended to call this
         function before performing a validation.
@@ -174,6 +290,29 @@ class Validator(object):
         ANTON do we have to validate the signatures of the packages??
         :param pkg_signature: String package signature to be validated
         :param pkg_pubkey: String package public key to verify signature
+        :param max_errors: report up to this number of schema errors per
+                           descriptor instead of only the first one (0 to
+                           disable)
+        :param jobs: number of descriptor files read, and of functions and
+                     project descriptors validated, in parallel (0 for one
+                     per CPU)
+        :param job_threads: read descriptor files in threads instead of
+                            processes (functions are always validated in
+                            processes)
+        :param graphs_dir: directory where the topology graphs of the
+                           validated services are written (GraphML), they
+                           are not exported if not set
+        :param graph_levels: levels of the exported topology graphs
+                             (default: all of them)
+        :param max_cycles: maximum number of cycles reported for each
+                           forwarding graph (default: 100)
+        :param max_cycle_length: do not search the cycles of forwarding
+                                 graphs longer than this number of VNFs,
+                                 the search is then reported as truncated
+                                 if longer ones may exist
+        :param cycles_time_budget: maximum time, in seconds, spent searching
+                                   the cycles of each forwarding graph
+                                   (default: 5)
         """
         # assign parameters
         if workspace_path is not None:
@@ -202,22 +341,32 @@ class Validator(object):
             self._pkg_signature = pkg_signature
         if pkg_pubkey is not None:
             self._pkg_pubkey = pkg_pubkey
-
-    def _assert_configuration(self):
+        if max_errors is not None:
+            self._max_errors = max_errors
+        if jobs is not None:
+            self._jobs = jobs
+        if job_threads is not None:
+            self._job_threads = job_threads
+        if graphs_dir is not None:
+            self._graphs_dir = graphs_dir
+        if graph_levels is not None:
+            self._graph_levels = graph_levels
+        if max_cycles is not None:
+            self._max_cycles = max_cycles
+        if max_cycle_length is not None:
+            self._max_cycle_length = max_cycle_length
+        if cycles_time_budget is not None:
+            self._cycles_time_budget = cycles_time_budget
+
+    def _assert_configuration(self, scope):
         """
         Ensures that the current configuration is compatible with the
         validation to perform. If issues are found the application is
         interrupted with the appropriate error.
-        This is an internal function which must be invoked only by:
-        - 'validate_package'
-        - 'validate_project'
-        - 'validate_service'
-        - 'validate_function'
-        """
-        # ensure this function is called by specific functions
-        caller = inspect.stack()[1][3]
-        if (caller != 'validate_function' and caller != 'validate_service' and
-                caller != 'validate_project' and caller != 'validate_package'):
+        :param scope: validation to perform, one of 'VALIDATION_SCOPES'
+        :return: True if the configuration is correct, None otherwise
+        """
+        if scope not in self.VALIDATION_SCOPES:
             LOG.error("Cannot assert a correct configuration." +
                       " Validation scope couldn't be determined. Aborting")
             return
@@ -241,11 +390,11 @@ class Validator(object):
             LOG.error("Nothing to validate. Aborting.")
             return
 
-        if caller == 'validate_package':
+        if scope == 'package':
             pass
-        elif caller == 'validate_project':
+        elif scope == 'project':
             pass
-        elif caller == 'validate_service':
+        elif scope == 'service':
             # check SERVICE validation parameters
             if ((self._integrity or self._topology) and not
                     (self._dpath and self._dext)):
@@ -261,10 +410,11 @@ class Validator(object):
                           "both' --dpath' and '--dext' parameters must be "
                           "specified (to validate the topology/integrity) and "
                           "'--cfile' must be specified")
-        elif caller == 'validate_function':
+        elif scope == 'function':
             pass
         return True
 
+    @_log_events
     def validate_project(self, project):
         """
         Validate a SONATA project.
@@ -273,7 +423,7 @@ class Validator(object):
         :param project: SONATA project
         :return: True if all validations were successful, False otherwise
         """
-        if not self._assert_configuration():
+        if not self._assert_configuration('project'):
             return
         if project.endswith('/'):
             project_path = project
@@ -316,33 +466,100 @@ class Validator(object):
         rpd_files = project.get_rpds()
         sla_files = project.get_slads()
         descriptors_files = tstd_files + slice_files + rpd_files + sla_files
-        descriptors_ok = True
-
-        for _file in tstd_files:
-            if not self.validate_test(os.path.join(project_path,_file)):
-                descriptors_ok = False
-        for _file in slice_files:
-            if not self.validate_slice(os.path.join(project_path,_file)):
-                descriptors_ok = False
-        for _file in rpd_files:
-            if not self.validate_runtime_policy(os.path.join(project_path,_file)):
-                descriptors_ok = False
-        for _file in sla_files:
-            if not self.validate_sla(os.path.join(project_path,_file)):
-                descriptors_ok = False
+        descriptors = (
+            [('validate_test', _file) for _file in tstd_files] +
+            [('validate_slice', _file) for _file in slice_files] +
+            [('validate_runtime_policy', _file) for _file in rpd_files] +
+            [('validate_sla', _file) for _file in sla_files])
+        descriptors = [(method, os.path.join(project_path, _file))
+                       for method, _file in descriptors]
+        if nsd_file:
+            nsd_file = os.path.join(project_path, nsd_file)
+        self._timings = OrderedDict()
+
+        if pool_size(self._jobs) > 1 and descriptors:
+            results = self._validate_project_parallel(descriptors,
+                                                      nsd_file)
+        else:
+            results = [self._timed(getattr(self, method), path)
+                       for method, path in descriptors]
+            if nsd_file:
+                results.append(self._timed(self.validate_service, nsd_file))
+        for path, elapsed in self._timings.items():
+            LOG.info("Validated descriptor '{0}' in {1:.3f} s"
+                     .format(path, elapsed))
+        descriptors_ok = all(results[:len(descriptors)])
 
         if nsd_file and descriptors_files:
-            nsd_file = os.path.join(project_path, nsd_file)
-            return self.validate_service(nsd_file) and descriptors_ok
+            return results[-1] and descriptors_ok
         elif not(nsd_file) and descriptors_files:
             return descriptors_ok
         elif nsd_file and not(descriptors_files):
-            nsd_file = os.path.join(project_path, nsd_file)
-            return self.validate_service(nsd_file)
+            return results[-1]
         else:
             LOG.info("No descriptors. There are not 5GTANGO descriptors in this project ")
             return True
 
+    def _timed(self, validate, path):
+        """
+        Runs a validation method and records its time in 'timings'.
+        :param validate: validation method taking a descriptor filename
+        :param path: descriptor filename
+        :return: result of the validation method
+        """
+        start = time.perf_counter()
+        result = validate(path)
+        self._timings[path] = time.perf_counter() - start
+        return result
+
+    def _validate_project_parallel(self, descriptors, nsd_file):
+        """
+        Validates the test, slice, runtime policy and SLA descriptors of a
+        project in a pool of worker processes, while the service is
+        validated in this process. Events are reported in the same order
+        as in a serial validation.
+        :param descriptors: list of (validation method name, descriptor
+                            filename)
+        :param nsd_file: service descriptor filename, if any
+        :return: list of validation results, in the order of 'descriptors',
+                 followed by the result of the service validation
+        """
+        schemas = {'validate_test': SchemaValidator.SCHEMA_TEST_DESCRIPTOR,
+                   'validate_slice': SchemaValidator.SCHEMA_SLICE_DESCRIPTOR,
+                   'validate_runtime_policy':
+                       SchemaValidator.SCHEMA_RP_DESCRIPTOR,
+                   'validate_sla': SchemaValidator.SCHEMA_SLA_DESCRIPTOR}
+        initargs = self._worker_initargs(
+            *OrderedDict((schemas[method], None) for method, _ in descriptors))
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(pool_size(self._jobs), len(descriptors)),
+            initializer=_init_worker, initargs=initargs)
+        with pool:
+            futures = [pool.submit(_validate_descriptor_job, method, path)
+                       for method, path in descriptors]
+            if nsd_file:
+                # keep the service events apart to report them last
+                events = evtLOG.export()
+                evtLOG.clear()
+                nsd_result = self._timed(self.validate_service, nsd_file)
+                nsd_events = evtLOG.export()
+                evtLOG.clear()
+                evtLOG.merge(events)
+            results = []
+            for (method, path), future in zip(descriptors, futures):
+                result, storage, events, elapsed = future.result()
+                self._storage.merge(storage)
+                evtLOG.merge(events)
+                self._timings[path] = elapsed
+                results.append(result)
+        if nsd_file:
+            evtLOG.merge(nsd_events)
+            results.append(nsd_result)
+        # report the timings in the serial order
+        if nsd_file:
+            self._timings.move_to_end(nsd_file)
+        return results
+
     @staticmethod
     def _load_project_service_file(project):
         """
@@ -368,6 +585,7 @@ class Validator(object):
 
         return nsd_file[0]
 
+    @_log_events
     def validate_service(self, nsd_file):
         """
         Validate a 5GTANGO service.
@@ -376,7 +594,7 @@ class Validator(object):
         :param nsd_file: service descriptor path
         :return: True if all validations were successful, False otherwise
         """
-        if not self._assert_configuration():
+        if not self._assert_configuration('service'):
             return
         LOG.info("Validating service descriptor '{0}'".format(nsd_file))
         LOG.info("... syntax: {0}, integrity: {1}, topology: {2}"
@@ -407,7 +625,7 @@ class Validator(object):
         """
         LOG.info("Validating topology of service descriptor '{0}'".format(service.id))
 
-        isolated_vnf = service.detect_isolated_vnfs()
+        isolated_vnf, unnused_vnf_cps = service.connection_point_usage()
         if isolated_vnf:
             evtLOG.log("Invalid topology",
                        "The following VNF(s) are isolated in service descriptor {}: {}"
@@ -424,7 +642,6 @@ class Validator(object):
                        'evt_nsd_top_topgraph_loops_in_vnfd')
             return
 
-        unnused_vnf_cps = service.detect_unnused_cps()
         if unnused_vnf_cps:
             evtLOG.log("Invalid topology",
                        "The following CP(s) are unnused in service {}: {}"
@@ -445,8 +662,10 @@ class Validator(object):
         LOG.debug("Built topology graph of service descriptor '{0}': {1}"
                   .format(service.id, service.graph.edges()))
 
-        # write service graphs with different levels and options
-        self.write_service_graphs(service)
+        # export service graphs with different levels and options
+        if self._graphs_dir:
+            self.write_service_graphs(service, self._graphs_dir,
+                                      self._graph_levels)
 
         if nx.is_connected(service.graph):
             LOG.debug("Topology graph of service descriptor '{0}' is connected"
@@ -598,14 +817,33 @@ class Validator(object):
                 # remove 'path' from fw_path (not needed anymore)
                 fw_path.pop('path')
 
-            # find cycles
-            complete_cycles = list(nx.simple_cycles(fpg))
-
-            # remove 1-hop cycles
-            cycles = []
-            for cycle in complete_cycles:
-                if len(cycle) > 2:
-                    cycles.append(cycle)
+            # find cycles, except 1-hop ones
+            cycles, limits = find_cycles(
+                fpg, max_cycles=self._max_cycles,
+                max_length=self._max_cycle_length,
+                time_budget=self._cycles_time_budget,
+                min_length=3)
+            if limits:
+                reached = []
+                if 'cycles' in limits:
+                    reached.append("max. cycles: {0}"
+                                   .format(self._max_cycles))
+                if 'length' in limits:
+                    reached.append("max. length: {0}"
+                                   .format(self._max_cycle_length))
+                if 'time' in limits:
+                    reached.append("time budget: {0}s"
+                                   .format(self._cycles_time_budget))
+                evtLOG.log("Cycle search truncated (fg_id='{0}')"
+                           .format(fw_graph['fg_id']),
+                           "The search of cycles in the forwarding graph "
+                           "fg_id='{0}' reached its limits ({1}), only {2} "
+                           "cycle(s) are reported"
+                           .format(fw_graph['fg_id'], ', '.join(reached),
+                                   len(cycles)),
+                           source_id,
+                           'evt_nsd_top_fwgraph_cycles_truncated')
+                fw_graph['cycles_truncated'] = True
 
             # build cycles representative connection point structure
             cycles_list = []
@@ -648,42 +886,82 @@ class Validator(object):
                                event_id=evtid,
                                detail_event_id=cycle['cycle_id'])
                 fw_graph['cycles'] = cycles_list
-                fw_graph['event_id'] = evtiddocker
+                fw_graph['event_id'] = evtid
         return True
 
     @staticmethod
-    def write_service_graphs(service):
-        graphsdir = '/tmp/graphs'
-        #CHECK: Graphs isn't eliminated in different executions. Graph folder is always the same.
+    def write_service_graphs(service, graphsdir, levels=None):
+        """
+        Writes the topology graphs of a service as GraphML files, with and
+        without bridges, named '<service id>-lvl<level>[-br].graphml'. The
+        complete graph ('<service id>-lvl3-complete.graphml') is written
+        along with level 3.
+        :param service: service whose graphs are written
+        :param graphsdir: output directory, created if needed
+        :param levels: levels of the written graphs (default: 0 to 3)
+        :return: list of written files
+        """
+        if levels is None:
+            levels = range(0, 4)
         try:
             os.makedirs(graphsdir)
         except OSError as exc:
-            if exc.errno == errno.EEXIST and os.path.isdir(graphsdir):
-                pass
+            if not (exc.errno == errno.EEXIST and os.path.isdir(graphsdir)):
+                LOG.warning("Couldn't create graphs directory '{0}': {1}"
+                            .format(graphsdir, exc))
+                return []
 
-        service.build_topology_graph(level=3, bridges=False)
+        files = []
         try:
-            for lvl in range(0, 4):
-                g = service.build_topology_graph(level=lvl, bridges=False)
-                nx.write_graphml(g, os.path.join(graphsdir,
-                                                 "{0}-lvl{1}.graphml"
-                                                 .format(service.id, lvl)))
-
-                g = service.build_topology_graph(level=lvl, bridges=True)
-                nx.write_graphml(g, os.path.join(graphsdir,
-                                                 "{0}-lvl{1}-br.graphml"
-                                                 .format(service.id, lvl)))
-
-            g = service.build_topology_graph(level=3, bridges=True,
-                                             vdu_inner_connections=False)
-            service.complete_graph = nx.generate_graphml(g, encoding='utf-8',
-                                                         prettyprint=True)
-            nx.write_graphml(g, os.path.join(graphsdir,
-                                             "{0}-lvl3-complete.graphml"
-                                             .format(service.id)))
+            for lvl in levels:
+                for bridges, suffix in ((False, ''), (True, '-br')):
+                    g = service.build_topology_graph(level=lvl,
+                                                     bridges=bridges)
+                    files.append(os.path.join(
+                        graphsdir, "{0}-lvl{1}{2}.graphml"
+                        .format(service.id, lvl, suffix)))
+                    nx.write_graphml(g, files[-1])
+
+            if 3 in levels:
+                g = service.build_topology_graph(level=3, bridges=True,
+                                                 vdu_inner_connections=False)
+                files.append(os.path.join(
+                    graphsdir, "{0}-lvl3-complete.graphml"
+                    .format(service.id)))
+                nx.write_graphml(g, files[-1])
         except nx.exception.NetworkXError:
             LOG.warning("A problem creating the graph images appeared")
-            #LOG.info(nx.__file__)
+        return files
+
+    def _log_syntax_errors(self, header, msg, source_id, event_code):
+        """
+        Logs the result of a failed syntax validation as an event: the
+        first schema error or, when 'max_errors' is configured, every
+        collected error along with its JSON path.
+        :param header: header of the event
+        :param msg: message format, filled with the source id and error
+        :param source_id: id of the invalid descriptor
+        :param event_code: code of the event
+        """
+        errors = self._schema_validator.errors
+        if not self._max_errors or not errors:
+            evtLOG.log(header,
+                       msg.format(source_id, self._schema_validator.error_msg),
+                       source_id,
+                       event_code)
+            return
+        for path, error in errors:
+            evtLOG.log(header,
+                       msg.format(source_id, "{0}: {1}".format(path, error)),
+                       source_id,
+                       event_code)
+        if self._schema_validator.errors_truncated:
+            evtLOG.log(header,
+                       msg.format(source_id,
+                                  "more errors found, only the first {0} "
+                                  "are reported".format(len(errors))),
+                       source_id,
+                       event_code)
 
     def _validate_service_syntax(self, service):
         """
@@ -693,12 +971,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of service descriptor'{0}'".format(service.id))
         if not self._schema_validator.validate(
-              service.content, SchemaValidator.SCHEMA_SERVICE_DESCRIPTOR):
-            evtLOG.log("Invalid NSD syntax",
-                       "Invalid syntax in service descriptor'{0}': {1}"
-                       .format(service.id, self._schema_validator.error_msg),
-                       service.id,
-                       'evt_nsd_stx_invalid')
+                service.content, SchemaValidator.SCHEMA_SERVICE_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid NSD syntax",
+                "Invalid syntax in service descriptor'{0}': {1}",
+                service.id,
+                'evt_nsd_stx_invalid')
             return
         return True
 
@@ -723,14 +1002,15 @@ class Validator(object):
             return
 
         # validate service function descriptors (VNFDs)
-        for fid, f in service.functions.items():
-            if not self.validate_function(f.filename):
-                evtLOG.log("Invalid function descriptor",
-                           "Failed to validate function descriptor '{0}'"
-                           .format(f.filename),
-                           service.id,
-                           'evt_nsd_itg_function_invalid')
-                return
+        vnfd_files = [f.filename for f in service.functions.values()]
+        validated = self._validate_functions(vnfd_files)
+        if not all(validated):
+            evtLOG.log("Invalid function descriptor",
+                       "Failed to validate function descriptor '{0}'"
+                       .format(vnfd_files[len(validated) - 1]),
+                       service.id,
+                       'evt_nsd_itg_function_invalid')
+            return
         # load service connection points
         if not service.load_connection_points():
             evtLOG.log("Bad section 'connection_points'",
@@ -773,7 +1053,7 @@ class Validator(object):
         for vl_id, vl in service.vlinks.items():
             for cpr in vl.connection_point_refs:
                 s_cpr = cpr.split(':')
-                if len(s_cpr) == 1 and cpr not in service.connection_points:
+                if len(s_cpr) == 1 and not service.has_connection_point(cpr):
                     evtLOG.log("Undefined connection point",
                                "Connection point '{0}' in virtual link "
                                "'{1}' is not defined"
@@ -783,7 +1063,7 @@ class Validator(object):
                     return
                 elif len(s_cpr) == 2:
                     func = service.mapped_function(s_cpr[0])
-                    if not func or s_cpr[1] not in func.connection_points:
+                    if not func or not func.has_connection_point(s_cpr[1]):
                         evtLOG.log("Undefined connection point",
                                    "Function descriptor (VNFD) of vnf_id='{0}' declared "
                                    "in connection point '{0}' in virtual link "
@@ -806,14 +1086,18 @@ class Validator(object):
         # # get VNFD file list from provided dpath
         if not self._dpath:
             return
+        index_file = None
         if type(self._dpath) is list:
             vnfd_files = list(self._dpath)
         else:
             vnfd_files = list_files(self._dpath, self._dext)
             LOG.debug("Found {0} descriptors in dpath='{2}': {1}"
                       .format(len(vnfd_files), vnfd_files, self._dpath))
-        # load all VNFDs
-        path_vnfs = read_descriptor_files(vnfd_files)
+            index_file = self._descriptor_index_file(self._dpath)
+        # index all VNFDs, only the referenced ones are fully loaded
+        path_vnfs = index_descriptor_files(vnfd_files, index_file=index_file,
+                                           jobs=self._jobs,
+                                           use_threads=self._job_threads)
 
         # check for errors
         if 'network_functions' not in service.content:
@@ -835,7 +1119,8 @@ class Validator(object):
             fid = build_descriptor_id(func['vnf_vendor'],
                                       func['vnf_name'],
                                       func['vnf_version'])
-            if fid not in path_vnfs.keys():
+            if fid not in path_vnfs.keys() or \
+                    not read_descriptor_file(path_vnfs[fid]):
                 evtLOG.log("VNF not found",
                            "Referenced function descriptor id='{0}' couldn't "
                            "be loaded".format(fid),
@@ -850,27 +1135,40 @@ class Validator(object):
 
         return True
 
+    def _descriptor_index_file(self, dpath):
+        """
+        Provides the filename of the persistent descriptor index of a
+        directory, kept in the cache directory of the workspace.
+        :param dpath: descriptors directory
+        :return: index filename
+        """
+        digest = hashlib.sha1(os.path.abspath(dpath).encode('utf-8'))
+        return os.path.join(self._workspace_path, 'cache',
+                            'descriptors-{}.json'.format(digest.hexdigest()))
+
+    @_log_events
     def validate_function(self, vnfd_path):
         """
         Validate one or multiple 5GTANGO functions (VNFs/CNFs).
         By default, it performs the following validations: syntax, integrity
         and network topology.
+        A function is only validated once with the same options until the
+        validator is reset: validating it again, even from another path
+        with the same content, returns the first result and reports its
+        events again.
         :param function_path: function descriptor (VNFD/CNFD) filename or
                           a directory to search for functions
         :return: True if all validations were successful, False otherwise
         """
-        # if not self._assert_configuration():
+        # if not self._assert_configuration('function'):
         #    return
 
         # validate multiple VNFs
         if os.path.isdir(vnfd_path):
             LOG.info("Validating function descriptors in path '{0}'".format(vnfd_path))
             vnfd_files = list_files(vnfd_path, self._dext)
-            for vnfd_file in vnfd_files:
-                LOG.info("Detected file {0} order validation..."
-                         .format(vnfd_file))
-                if not self.validate_function(vnfd_file):
-                    return
+            if not all(self._validate_functions(vnfd_files)):
+                return
             return True
 
         LOG.info("Validating function descriptor '{0}'".format(vnfd_path))
@@ -885,6 +1183,125 @@ class Validator(object):
                        vnfd_path,
                        'evt_function_invalid_descriptor')
             return
+        # each function is only validated once with the same options, the
+        # events of the validation are reported again afterwards
+        options = self._function_options()
+        if options not in func.validation_results:
+            checkpoint = self._evtLOG.checkpoint()
+            custom_errors = len(self._customErrors)
+            result = self._validate_function(func, vnfd_path)
+            func.validation_results[options] = (
+                result, self._evtLOG.export(since=checkpoint),
+                self._customErrors[custom_errors:])
+            return result
+        LOG.debug("Function descriptor '{0}' was already validated"
+                  .format(func.id))
+        result, events, custom_errors = func.validation_results[options]
+        self._evtLOG.merge(events)
+        self._customErrors.extend(custom_errors)
+        return result
+
+    def _function_options(self):
+        """
+        Provides the options a function validation depends on.
+        :return: tuple of options
+        """
+        return (self._syntax, self._integrity, self._topology,
+                self._custom, self._cfile if self._custom else None)
+
+    def _validate_functions(self, vnfd_files):
+        """
+        Validate several functions, stopping at the first one which can't
+        be validated. If 'jobs' is configured, the functions are validated
+        in parallel processes and their events are merged back in the
+        order of a serial validation.
+        :param vnfd_files: function descriptor filenames
+        :return: list of validation results, up to the first function which
+                 couldn't be validated
+        """
+        options = self._function_options()
+        pending = []
+        for vnfd_file in vnfd_files:
+            func = self._storage.find_function(vnfd_file)
+            if vnfd_file not in pending and \
+                    not (func and options in func.validation_results):
+                pending.append(vnfd_file)
+
+        results = {}
+        if pool_size(self._jobs) > 1 and len(pending) > 1:
+            LOG.info("Validating {0} function descriptors with {1} parallel "
+                     "jobs".format(len(pending), pool_size(self._jobs)))
+            results = dict(zip(pending, map_files(
+                _validate_function_job, pending, jobs=self._jobs,
+                initializer=_init_worker,
+                initargs=self._worker_initargs(
+                    SchemaValidator.SCHEMA_FUNCTION_DESCRIPTOR))))
+
+        validated = []
+        for vnfd_file in vnfd_files:
+            LOG.info("Detected file {0} order validation..."
+                     .format(vnfd_file))
+            job = results.get(vnfd_file)
+            if job and self._merge_function_job(vnfd_file, job):
+                result = job[0]
+            else:
+                result = self.validate_function(vnfd_file)
+            validated.append(result)
+            if not result:
+                break
+        return validated
+
+    def _worker_initargs(self, *schema_ids):
+        """
+        Provides the arguments of '_init_worker' to validate descriptors in
+        worker processes like this validator does.
+        :param schema_ids: schemas used by the workers, they are obtained
+                           once for all the workers
+        :return: tuple of arguments
+        """
+        if self._syntax:
+            for schema_id in schema_ids:
+                self._schema_validator.load_schema(schema_id)
+        settings = {'syntax': self._syntax,
+                    'integrity': self._integrity,
+                    'topology': self._topology,
+                    'custom': self._custom,
+                    'cfile': self._cfile,
+                    'dext': self._dext,
+                    'max_errors': self._max_errors,
+                    'max_cycles': self._max_cycles,
+                    'max_cycle_length': self._max_cycle_length,
+                    'cycles_time_budget': self._cycles_time_budget}
+        return (self._workspace, settings,
+                self._schema_validator.export_schemas())
+
+    def _merge_function_job(self, vnfd_file, job):
+        """
+        Merges the validation of a function performed by a worker process,
+        unless the function was validated meanwhile (e.g. with the same
+        content from another file) or another function with the same id is
+        stored.
+        :param vnfd_file: function descriptor filename
+        :param job: result of '_validate_function_job'
+        :return: True if merged
+        """
+        result, func, events, custom_errors = job
+        stored = self._storage.find_function(vnfd_file)
+        if stored and self._function_options() in stored.validation_results:
+            return False
+        if func is not None and not self._storage.update_function(func):
+            return False
+        evtLOG.merge(events)
+        self._customErrors.extend(custom_errors)
+        return True
+
+    def _validate_function(self, func, vnfd_path):
+        """
+        Validate a function according to the configured validation options.
+        :param func: function
+        :param vnfd_path: function descriptor filename
+        :return: True, the result of each validation is reported as events
+        """
         if self._syntax and not self._validate_function_syntax(func):
             return True
         if self._integrity and not self._validate_function_integrity(func):
@@ -920,12 +1337,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of function descriptor '{0}'".format(func.id))
         if not self._schema_validator.validate(
-                func.content, SchemaValidator.SCHEMA_FUNCTION_DESCRIPTOR):
-            evtLOG.log("Invalid VNFD syntax",
-                       "Invalid syntax in function descriptor'{0}': {1}"
-                       .format(func.id, self._schema_validator.error_msg),
-                       func.id,
-                       'evt_vnfd_stx_invalid')
+                func.content, SchemaValidator.SCHEMA_FUNCTION_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid VNFD syntax",
+                "Invalid syntax in function descriptor'{0}': {1}",
+                func.id,
+                'evt_vnfd_stx_invalid')
             return
         return True
 
@@ -1004,7 +1422,7 @@ class Validator(object):
         for vl_id, vl in func.vlinks.items():
             for cpr in vl.connection_point_refs:
                 s_cpr = cpr.split(':')
-                if len(s_cpr) == 1 and cpr not in func.connection_points:
+                if len(s_cpr) == 1 and not func.has_connection_point(cpr):
                     evtLOG.log("Undefined connection point",
                                "Connection point '{0}' in virtual link "
                                "'{1}' is not defined"
@@ -1014,7 +1432,7 @@ class Validator(object):
                     return
                 elif len(s_cpr) == 2:
                     unit = func.units[s_cpr[0]]
-                    if not unit or s_cpr[1] not in unit.connection_points:
+                    if not unit or not unit.has_connection_point(s_cpr[1]):
 
                         evtLOG.log("Undefined connection point(s)",
                                    "Invalid connection point id='{0}' "
@@ -1099,7 +1517,7 @@ class Validator(object):
     def workspace(self):
         LOG.warning("workspace not implemented")
 
-
+    @_log_events
     def validate_test(self, test_path):
         """
         Validate one or multiple 5GTANGO tests (TSTD).
@@ -1143,12 +1561,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of test descriptor '{0}'".format(test.id))
         if not self._schema_validator.validate(
-                test.content, SchemaValidator.SCHEMA_TEST_DESCRIPTOR):
-            evtLOG.log("Invalid TSTD syntax",
-                       "Invalid syntax in test descriptor'{0}': {1}"
-                       .format(test.id, self._schema_validator.error_msg),
-                       test.id,
-                       'evt_tstd_stx_invalid')
+                test.content, SchemaValidator.SCHEMA_TEST_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid TSTD syntax",
+                "Invalid syntax in test descriptor'{0}': {1}",
+                test.id,
+                'evt_tstd_stx_invalid')
             return
         return True
     def _validate_test_integrity(self, test):
@@ -1177,6 +1596,7 @@ class Validator(object):
                 LOG.error("Missing steps in phases")
         return True
 
+    @_log_events
     def validate_slice(self, slice_path):
         """
         Validate one or multiple 5GTANGO slices (NSTD).
@@ -1219,12 +1639,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of slice descriptor '{0}'".format(slice.id))
         if not self._schema_validator.validate(
-                slice.content, SchemaValidator.SCHEMA_SLICE_DESCRIPTOR):
-            evtLOG.log("Invalid NSTD syntax",
-                       "Invalid syntax in slice descriptor'{0}': {1}"
-                       .format(slice.id, self._schema_validator.error_msg),
-                       slice.id,
-                       'evt_nstd_stx_invalid')
+                slice.content, SchemaValidator.SCHEMA_SLICE_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid NSTD syntax",
+                "Invalid syntax in slice descriptor'{0}': {1}",
+                slice.id,
+                'evt_nstd_stx_invalid')
             return
         return True
     def _validate_slice_integrity(self, slice):
@@ -1263,6 +1684,7 @@ class Validator(object):
             slice.load_vld(vld)
         return True
 
+    @_log_events
     def validate_sla(self, sla_path):
         """
         Validate one or multiple 5GTANGO sla (SLAD) descriptors.
@@ -1306,12 +1728,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of sla descriptor '{0}'".format(sla.id))
         if not self._schema_validator.validate(
-                sla.content, SchemaValidator.SCHEMA_SLA_DESCRIPTOR):
-            evtLOG.log("Invalid SLAD syntax",
-                       "Invalid syntax in sla descriptor'{0}': {1}"
-                       .format(sla.id, self._schema_validator.error_msg),
-                       sla.id,
-                       'evt_slad_stx_invalid')
+                sla.content, SchemaValidator.SCHEMA_SLA_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid SLAD syntax",
+                "Invalid syntax in sla descriptor'{0}': {1}",
+                sla.id,
+                'evt_slad_stx_invalid')
             return
         return True
     def _validate_sla_integrity(self, sla):
@@ -1328,7 +1751,7 @@ class Validator(object):
         sla.load_license_values()
         return True
 
-
+    @_log_events
     def validate_runtime_policy(self, rp_path):
         """
         Validate one or multiple 5GTANGO runtime policy (RPD) descriptors.
@@ -1374,12 +1797,13 @@ class Validator(object):
         """
         LOG.info("Validating syntax of runtime policy descriptor '{0}'".format(rp.id))
         if not self._schema_validator.validate(
-                rp.content, SchemaValidator.SCHEMA_RP_DESCRIPTOR):
-            evtLOG.log("Invalid RPD syntax",
-                       "Invalid syntax in rp descriptor'{0}': {1}"
-                       .format(rp.id, self._schema_validator.error_msg),
-                       rp.id,
-                       'evt_rpd_stx_invalid')
+                rp.content, SchemaValidator.SCHEMA_RP_DESCRIPTOR,
+                max_errors=self._max_errors):
+            self._log_syntax_errors(
+                "Invalid RPD syntax",
+                "Invalid syntax in rp descriptor'{0}': {1}",
+                rp.id,
+                'evt_rpd_stx_invalid')
             return
         return True
     def _validate_runtime_policy_integrity(self, rp):
@@ -1392,3 +1816,80 @@ class Validator(object):
         LOG.info("Validating integrity of RP descriptor '{0}'"
                  .format(rp.id))
         return True
+
+
+class ValidatorPool(object):
+    """
+    Pool of reusable validators, sparing each validation the creation of a
+    workspace and the loading of the schemas of a new validator. Borrowed
+    validators are reset when they are returned; the idle validators
+    beyond 'maxsize' are dropped.
+    """
+
+    def __init__(self, maxsize=4, factory=Validator):
+        """
+        :param maxsize: maximum number of idle validators kept
+        :param factory: callable creating a new validator
+        """
+        self._maxsize = maxsize
+        self._factory = factory
+        self._idle = deque()
+        self._lock = threading.Lock()
+
+    @property
+    def size(self):
+        """
+        Provides the number of idle validators.
+        """
+        return len(self._idle)
+
+    def prewarm(self, count=None):
+        """
+        Creates idle validators in advance.
+        :param count: number of idle validators to reach, 'maxsize' by
+                      default
+        """
+        count = self._maxsize if count is None else min(count, self._maxsize)
+        while self.size < count:
+            self.release(self._factory())
+
+    def acquire(self):
+        """
+        Takes an idle validator from the pool, or creates a new one if none
+        is idle. It must be given back with 'release'.
+        :return: validator, with its default configuration
+        """
+        with self._lock:
+            if self._idle:
+                # the most recently used validator has the warmest caches
+                return self._idle.pop()
+        return self._factory()
+
+    def release(self, validator):
+        """
+        Gives back a validator taken with 'acquire'.
+        :param validator: validator, which must not be used afterwards
+        """
+        validator.reset()
+        with self._lock:
+            if len(self._idle) < self._maxsize:
+                self._idle.append(validator)
+
+    @contextlib.contextmanager
+    def borrow(self):
+        """
+        Provides a validator of the pool for the duration of a 'with'
+        block.
+        """
+        validator = self.acquire()
+        try:
+            yield validator
+        finally:
+            self.release(validator)
+
+    def clear(self):
+        """
+        Drops the idle validators, e.g. after a configuration change.
+        """
+        with self._lock:
+            self._idle.clear()